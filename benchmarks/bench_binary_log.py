@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Compare stage-to-stage I/O through JSON lines and the binary format.
+
+For full synthetic events and for reduced ones (the fields kept by
+`examples/reduce_vault_log.py`), each case writes the entries with
+`VaultLogWriter` and reads them back with `VaultLogReader`:
+
+- json: JSON lines (fastest installed codec for reading)
+- binary: marshal blocks (`binary=True`)
+- binary dedupe: marshal blocks with shared repeated strings
+
+Usage:
+  python benchmarks/bench_binary_log.py [--events N] [--repeat R]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from synthetic_corpus import make_events
+
+from vault_audit_lib import VaultFieldProjection, VaultLogReader, VaultLogWriter
+
+REDUCED_FIELDS = [
+    "time",
+    "type",
+    "request.id",
+    "request.namespace.path",
+    "request.mount_type",
+    "request.path",
+    "auth.entity_id",
+    "auth.client_token",
+]
+
+
+def _best(repeat: int, run: Any) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _bench(label: str, events: List[Any], repeat: int) -> None:
+    cases: List[Dict[str, Any]] = [
+        {"name": "json", "suffix": ".log", "options": {}},
+        {"name": "binary", "suffix": ".vbin", "options": {}},
+        {"name": "binary dedupe", "suffix": ".vbin", "options": {"dedupe": True}},
+    ]
+    n = len(events)
+    print(f"{label} ({n} events)")
+    base = None
+    for case in cases:
+        fd, path = tempfile.mkstemp(suffix=case["suffix"])
+        os.close(fd)
+        try:
+
+            def write() -> None:
+                with VaultLogWriter(path, mode="w", **case["options"]) as w:
+                    w.writelines(events)
+
+            write_s = _best(repeat, write)
+            read_s = _best(repeat, lambda: sum(1 for _ in VaultLogReader(path)))
+            assert list(VaultLogReader(path)) == events
+            total = write_s + read_s
+            base = base or total
+            print(
+                f"  {case['name']:14s} write {n / write_s:10,.0f}/s"
+                f"  read {n / read_s:10,.0f}/s"
+                f"  write+read x{base / total:4.1f}"
+                f"  {os.path.getsize(path) / 1e6:7.1f} MB"
+            )
+        finally:
+            os.remove(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the binary log format")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # events as a reader would produce them (distinct string objects)
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        with VaultLogWriter(path, mode="w") as w:
+            w.writelines(make_events(args.events))
+        full = list(VaultLogReader(path))
+        reduced = list(VaultLogReader(path, fields=REDUCED_FIELDS))
+    finally:
+        os.remove(path)
+    projection = VaultFieldProjection(REDUCED_FIELDS)
+    assert reduced[:10] == [projection.project(e) for e in full[:10]]
+
+    _bench("full events", full, args.repeat)
+    _bench("reduced events", reduced, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
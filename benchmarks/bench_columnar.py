@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare re-reading projected events from JSON lines and a columnar file.
+
+The corpus is projected to the fields of `examples/reduce_vault_log.py`
+and stored twice: as JSON lines (what the example writes) and with
+`VaultColumnWriter`. Then the same analysis, requests per mount type,
+runs on each:
+
+- json: `VaultLogReader` over the reduced log, counting `mount_type`
+- columnar rows: iterate `VaultColumnReader` (decodes every column)
+- columnar codes: count the int32 codes of one column per chunk and
+  decode only the dictionary
+
+File sizes are printed as well.
+
+Usage:
+  python benchmarks/bench_columnar.py [--events N] [--repeat R]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Callable, Dict
+
+from synthetic_corpus import make_events
+
+from vault_audit_lib import (
+    VaultColumnReader,
+    VaultColumnWriter,
+    VaultLogReader,
+    VaultLogWriter,
+)
+from vault_audit_lib.vault_columnar import DEFAULT_COLUMNS
+
+# the reduce example's flat records, keyed by column name
+FLAT_COLUMNS = [(name, name, kind) for name, _key, kind in DEFAULT_COLUMNS]
+
+
+def _get(ev: Any, key: str) -> Any:
+    for part in key.split("."):
+        if not isinstance(ev, dict):
+            return None
+        ev = ev.get(part)
+    return ev
+
+
+def _project(ev: Any) -> Dict[str, Any]:
+    return {name: _get(ev, key) for name, key, _kind in DEFAULT_COLUMNS}
+
+
+def _rate(count: int, repeat: int, run: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return count / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark columnar export")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    tmp = tempfile.mkdtemp()
+    json_path = os.path.join(tmp, "reduced.log")
+    col_path = os.path.join(tmp, "reduced.vcol")
+    try:
+        flat = [_project(ev) for ev in events]
+        with VaultLogWriter(json_path, mode="w") as writer:
+            writer.writelines(flat)
+        with VaultColumnWriter(col_path, columns=FLAT_COLUMNS) as out:
+            out.writelines(flat)
+        n = len(events)
+
+        def json_counts() -> Dict[str, int]:
+            return Counter(e["mount_type"] for e in VaultLogReader(json_path))
+
+        def row_counts() -> Dict[str, int]:
+            with VaultColumnReader(col_path) as cols:
+                return Counter(row["mount_type"] for row in cols)
+
+        def code_counts() -> Dict[str, int]:
+            with VaultColumnReader(col_path) as cols:
+                counts: Counter = Counter()
+                for chunk in cols.chunks():
+                    counts.update(chunk.values("mount_type"))
+                names = cols.dictionary("mount_type")
+                return {names[c] if c >= 0 else None: k for c, k in counts.items()}
+
+        assert json_counts() == row_counts() == code_counts()
+        cases = [
+            ("json", json_path, json_counts),
+            ("columnar rows", col_path, row_counts),
+            ("columnar codes", col_path, code_counts),
+        ]
+        base = None
+        for name, path, run in cases:
+            rate = _rate(n, args.repeat, run)
+            base = base or rate
+            size = os.path.getsize(path) / 1e6
+            print(
+                f"{name:16s} {rate:12,.0f} events/s (x{rate / base:.1f})"
+                f"  file {size:7.1f} MB"
+            )
+        print(f"columns: {', '.join(name for name, _k, _kind in DEFAULT_COLUMNS)}")
+    finally:
+        for p in (json_path, col_path):
+            if os.path.exists(p):
+                os.remove(p)
+        os.rmdir(tmp)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
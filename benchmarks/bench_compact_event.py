@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Compare event representations for transaction copy pipelines.
+
+Cases: decoded dicts (default), `RawEvent`s (`keep_raw=True`) and
+`CompactEvent`s (`compact=True`).
+
+For a synthetic corpus written as JSON lines:
+
+- memory: bytes allocated (tracemalloc) to hold every event of the file,
+  as transactions buffered by a reader would hold them
+- read+group+write: `VaultTransactionReader` into
+  `VaultTransactionWriter`, the round trip of the split/filter examples
+
+Usage:
+  python benchmarks/bench_compact_event.py [--events N] [--repeat R]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict
+
+from synthetic_corpus import write_corpus
+
+from vault_audit_lib import (
+    VaultLogReader,
+    VaultTransactionReader,
+    VaultTransactionWriter,
+)
+
+
+def _held_bytes(path: str, options: Dict[str, Any]) -> int:
+    tracemalloc.start()
+    try:
+        events = list(VaultLogReader(path, **options))
+        size, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del events
+    return size
+
+
+def _best(repeat: int, run: Any) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CompactEvent")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    fd, out = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        write_corpus(path, args.events)
+        print(f"{args.events} events, {os.path.getsize(path) / 1e6:.1f} MB of JSON")
+        base = None
+        cases = [
+            ("dict", {}),
+            ("raw", {"keep_raw": True}),
+            ("compact", {"compact": True}),
+        ]
+        for name, options in cases:
+            held = _held_bytes(path, options)
+
+            def round_trip() -> None:
+                with VaultTransactionWriter(out, mode="w") as writer:
+                    for rid, events in VaultTransactionReader(path, **options):
+                        writer.write_transaction(rid, events)
+
+            seconds = _best(args.repeat, round_trip)
+            base = base or seconds
+            print(
+                f"  {name:8s} memory {held / 1e6:7.1f} MB"
+                f"  ({held / args.events:6.0f} B/event)"
+                f"  read+group+write {args.events / seconds:9,.0f}/s"
+                f"  x{base / seconds:4.1f}"
+            )
+    finally:
+        os.remove(path)
+        os.remove(out)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Compare event filter throughput: compiled filters vs the previous class.
+
+Runs the `reduce_vault_log.py` predicate (`type == "response"` and no
+`error`) over a synthetic corpus three ways:
+
+- legacy: the pre-compilation `VaultEventFilter`, two separate matches
+- compiled: two compiled filters matched separately
+- combined: a single `filt & nerr` matcher
+
+Usage:
+  python benchmarks/bench_event_filter.py [--events N] [--repeat R]
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Any, Callable, List, Optional
+
+from synthetic_corpus import make_events
+
+from vault_audit_lib import VaultEventFilter
+
+
+class LegacyVaultEventFilter:
+    """The per-event dispatching implementation, kept for comparison."""
+
+    def __init__(self, key: str, value: Any):
+        self.key = key
+        self.value = value
+
+    def _lookup(self, entry: Any) -> Optional[Any]:
+        if not isinstance(entry, dict):
+            return None
+        cur: Any = entry
+        for part in self.key.split("."):
+            if not isinstance(cur, dict):
+                return None
+            cur = cur.get(part)
+        return cur
+
+    def match(self, entry: Any) -> bool:
+        found = self._lookup(entry)
+        if callable(self.value):
+            try:
+                return bool(self.value(found))
+            except Exception:
+                return False
+        if isinstance(self.value, re.Pattern):
+            if found is None:
+                return False
+            try:
+                return self.value.search(str(found)) is not None
+            except Exception:
+                return False
+        return found == self.value
+
+
+def _rate(events: List[Any], repeat: int, predicate: Callable[[Any], bool]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for ev in events:
+            predicate(ev)
+        best = min(best, time.perf_counter() - t0)
+    return len(events) / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark VaultEventFilter")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+
+    lf = LegacyVaultEventFilter("type", "response")
+    ln = LegacyVaultEventFilter("error", lambda v: v is None)
+    cf = VaultEventFilter("type", "response")
+    cn = VaultEventFilter("error", lambda v: v is None)
+    combined = cf & cn
+
+    cases = [
+        ("legacy (2 filters)", lambda e: lf.match(e) and ln.match(e)),
+        ("compiled (2 filters)", lambda e: cf.match(e) and cn.match(e)),
+        ("compiled (filt & nerr)", combined.match),
+    ]
+    baseline = None
+    for name, pred in cases:
+        rate = _rate(events, args.repeat, pred)
+        baseline = baseline or rate
+        print(f"{name:24s} {rate:14,.0f} events/s  x{rate / baseline:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Compare JSON codec throughput on a synthetic Vault audit corpus.
+
+For every installed backend (see `vault_audit_lib.available_codecs`):
+
+- loads: decode each line (as `bytes`, like the mmap reader)
+- dumps: encode each event; the stable encoder is shared by all backends,
+  so this is compared against a plain `json.dumps(entry, default=str)`
+- reader: `VaultLogReader(path, codec=...)` end to end on a temp file
+
+The dumps output of every codec is checked to be byte-identical to
+`json.dumps(entry, default=str)`.
+
+Usage:
+  python benchmarks/bench_json_codec.py [--events N] [--repeat R]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Iterable
+
+from synthetic_corpus import make_events
+
+from vault_audit_lib import VaultLogReader, available_codecs, get_codec
+
+
+def _rate(count: int, repeat: int, run: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return count / best
+
+
+def _consume(it: Iterable[Any]) -> None:
+    for _ in it:
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    lines = [json.dumps(ev, default=str) for ev in events]
+    raw = [line.encode("utf-8") for line in lines]
+    n = len(events)
+
+    fd, path = tempfile.mkstemp(suffix=".private_log")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+
+        def plain_dumps() -> None:
+            for ev in events:
+                json.dumps(ev, default=str)
+
+        dumps_base = _rate(n, args.repeat, plain_dumps)
+        print(f"{'json.dumps(default=str)':24s} dumps {dumps_base:12,.0f} events/s")
+
+        loads_base = reader_base = None
+        for name in available_codecs():
+            codec = get_codec(name)
+            loads, dumps = codec.loads, codec.dumps
+            assert [dumps(ev) for ev in events[:1000]] == lines[:1000]
+
+            loads_rate = _rate(n, args.repeat, lambda: _consume(map(loads, raw)))
+            dumps_rate = _rate(n, args.repeat, lambda: _consume(map(dumps, events)))
+            reader_rate = _rate(
+                n, args.repeat, lambda: _consume(VaultLogReader(path, codec=codec))
+            )
+            loads_base = loads_base or loads_rate
+            reader_base = reader_base or reader_rate
+            print(
+                f"{name:24s} loads {loads_rate:12,.0f} events/s"
+                f"  dumps {dumps_rate:12,.0f} events/s (x{dumps_rate / dumps_base:.2f})"
+                f"  reader {reader_rate:12,.0f} events/s"
+            )
+        print("(backends are listed fastest-first by preference; the first is default)")
+    finally:
+        os.remove(path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
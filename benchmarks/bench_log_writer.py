@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Compare VaultLogWriter throughput for per-entry and batched writes.
+
+Writes a synthetic corpus to a temporary plain and `.gz` file with:
+
+- unbuffered: one `write()` per entry (the default)
+- writelines: one call, joined in batches internally
+- buffered: `write()` per entry with `buffer_size=64 KiB`
+- buffered, level 6: as above with `compresslevel=6` (gzip only)
+- background: `write()` per entry, serialized and written on a thread
+
+Usage:
+  python benchmarks/bench_log_writer.py [--events N] [--repeat R]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from synthetic_corpus import make_events
+
+from vault_audit_lib import VaultLogWriter
+
+
+def _per_entry(writer: VaultLogWriter, events: List[Any]) -> None:
+    for ev in events:
+        writer.write(ev)
+
+
+def _rate(
+    path: str,
+    events: List[Any],
+    repeat: int,
+    options: Dict[str, Any],
+    run: Callable[[VaultLogWriter, List[Any]], None],
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        with VaultLogWriter(path, mode="w", **options) as writer:
+            run(writer, events)
+        best = min(best, time.perf_counter() - t0)
+    return len(events) / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark VaultLogWriter")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    buffered = {"buffer_size": 64 * 1024}
+    cases = [
+        ("unbuffered", {}, _per_entry),
+        ("writelines", {}, VaultLogWriter.writelines),
+        ("buffered", buffered, _per_entry),
+        ("buffered, level 6", dict(buffered, compresslevel=6), _per_entry),
+        ("background", {"background": True}, _per_entry),
+    ]
+    tmp = tempfile.mkdtemp()
+    try:
+        for suffix in (".log", ".log.gz"):
+            path = os.path.join(tmp, "out" + suffix)
+            baseline = None
+            for name, options, run in cases:
+                if "compresslevel" in options and not suffix.endswith(".gz"):
+                    continue
+                rate = _rate(path, events, args.repeat, options, run)
+                baseline = baseline or rate
+                label = f"{suffix} {name}"
+                print(f"{label:26s} {rate:12,.0f} events/s  x{rate / baseline:.2f}")
+            os.remove(path)
+    finally:
+        os.rmdir(tmp)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+"""Synthetic Vault audit events for the benchmarks in this directory.
+
+Events mimic the shape of real `file` audit device output: a `request`
+event followed by a `response` event per request id, HMAC'd tokens,
+nested `auth`/`request`/`response` objects and occasional errors.
+"""
+from __future__ import annotations
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+_PATHS = [
+    "secret/data/app/config",
+    "secret/data/app/db",
+    "auth/token/lookup-self",
+    "sys/health",
+    "pki/issue/web",
+    "database/creds/readonly",
+    "transit/encrypt/orders",
+]
+_MOUNTS = {"secret": "kv", "auth": "token", "sys": "system", "pki": "pki"}
+
+
+def _hmac(rng: random.Random) -> str:
+    return "hmac-sha256:" + "".join(rng.choice("0123456789abcdef") for _ in range(64))
+
+
+def make_events(count: int, seed: int = 0, tokens: int = 200) -> List[Dict[str, Any]]:
+    """Return `count` events (request/response pairs) in time order."""
+    rng = random.Random(seed)
+    token_pool = [_hmac(rng) for _ in range(tokens)]
+    entity_pool = [f"entity-{i:05d}" for i in range(tokens // 2 or 1)]
+    start = datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events: List[Dict[str, Any]] = []
+    n = 0
+    while len(events) < count:
+        n += 1
+        path = rng.choice(_PATHS)
+        token = rng.choice(token_pool)
+        auth = {
+            "client_token": token,
+            "accessor": _hmac(rng),
+            "display_name": "approle",
+            "policies": ["default", "app"],
+            "token_policies": ["default", "app"],
+            "metadata": {"role_name": "app"},
+            "entity_id": rng.choice(entity_pool),
+            "token_type": "service",
+        }
+        request = {
+            "id": f"{n:08x}-0000-4000-8000-{rng.getrandbits(48):012x}",
+            "operation": rng.choice(["read", "update", "list"]),
+            "mount_type": _MOUNTS.get(path.split("/")[0], "kv"),
+            "client_token": token,
+            "namespace": {"id": "root"},
+            "path": path,
+            "data": {"value": _hmac(rng)} if rng.random() < 0.3 else None,
+            "remote_address": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+        }
+        t = start + timedelta(microseconds=n * 1500 + rng.randrange(1000))
+        ts = t.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        events.append({"time": ts, "type": "request", "auth": auth, "request": request})
+        response: Dict[str, Any] = {
+            "time": (t + timedelta(microseconds=rng.randrange(5000))).strftime(
+                "%Y-%m-%dT%H:%M:%S.%fZ"
+            ),
+            "type": "response",
+            "auth": auth,
+            "request": request,
+            "response": {
+                "mount_type": request["mount_type"],
+                "data": {"keys": [_hmac(rng) for _ in range(rng.randrange(4))]},
+            },
+        }
+        if rng.random() < 0.05:
+            response["error"] = "1 error occurred:\n\t* permission denied\n\n"
+        events.append(response)
+    return events[:count]
+
+
+def write_corpus(path: str, count: int, seed: int = 0) -> None:
+    """Write `count` synthetic events to `path` as JSON lines."""
+    with open(path, "w", encoding="utf-8") as fh:
+        for ev in make_events(count, seed=seed):
+            fh.write(json.dumps(ev) + "\n")
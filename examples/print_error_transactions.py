@@ -2,7 +2,9 @@
 """Print transactions that contain any event with `error` present.
 
 For each matching transaction the script prints the `request_id` and
-each event from the transaction that contains an `error` value.
+each event from the transaction that contains an `error` value. With
+`--out` the matching transactions are copied with their original lines
+(`keep_raw=True`), so the output is byte-identical to the source.
 """
 from __future__ import annotations
 
@@ -26,7 +28,7 @@ def main() -> int:
     )
     args = parser.parse_args()
 
-    reader = VaultTransactionReader(args.path)
+    reader = VaultTransactionReader(args.path, keep_raw=bool(args.out))
     filt = VaultEventFilter("error", lambda v: v is not None)
 
     if args.out:
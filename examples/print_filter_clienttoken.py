@@ -4,7 +4,9 @@
 hmac-sha256:07d70acf82b6e9c3adaccd6fae8f6ec72c7ebe752367a4567c92ac8098e593f9
 
 For each matching transaction the script prints the `request_id` and
-each event from the transaction that contains an `error` value.
+each event from the transaction that contains an `error` value. With
+`--out` the matching transactions are copied with their original lines
+(`keep_raw=True`), so the output is byte-identical to the source.
 """
 from __future__ import annotations
 
@@ -13,10 +15,16 @@ import json
 
 from vault_audit_lib import (
     VaultEventFilter,
+    VaultLogIndex,
+    VaultLogReader,
     VaultTransactionReader,
     VaultTransactionWriter,
 )
 
+CLIENT_TOKEN = (
+    "hmac-sha256:07d70acf82b6e9c3adaccd6fae8f6ec72c7ebe752367a4567c92ac8098e593f9"
+)
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(
@@ -26,14 +34,25 @@ def main() -> int:
     parser.add_argument(
         "--out", "-o", help="Optional destination file to write matching transactions"
     )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Use a sidecar index (<path>.idx, built if missing or stale) "
+        "to read only the matching transactions",
+    )
     args = parser.parse_args()
 
-    reader = VaultTransactionReader(args.path)
+    keep_raw = bool(args.out)
+    if args.index:
+        idx = VaultLogIndex(args.path).ensure()
+        offsets = idx.transaction_offsets("auth.client_token", CLIENT_TOKEN)
+        reader = VaultTransactionReader(
+            VaultLogReader(args.path, offsets=offsets, keep_raw=keep_raw)
+        )
+    else:
+        reader = VaultTransactionReader(args.path, keep_raw=keep_raw)
 
-    filt = VaultEventFilter(
-        "auth.client_token",
-        "hmac-sha256:07d70acf82b6e9c3adaccd6fae8f6ec72c7ebe752367a4567c92ac8098e593f9",
-    )
+    filt = VaultEventFilter("auth.client_token", CLIENT_TOKEN)
 
     if args.out:
         written = 0
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Print request statistics for one or more audit logs.
+
+Counts per path / mount type / entity, error rates, distinct entities and
+tokens, and request -> response latency percentiles are computed in one
+pass with bounded memory; several files are aggregated in parallel and
+merged.
+
+Usage:
+  python examples/print_stats.py audit-1.log audit-2.log.gz --workers 2 --top 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+
+from vault_audit_lib import aggregate
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Print audit log statistics")
+    parser.add_argument("paths", nargs="+", help="Audit log files (path or .gz)")
+    parser.add_argument("--top", type=int, default=10, help="Values listed per field")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel files")
+    parser.add_argument(
+        "--latency-by",
+        default="request.mount_type",
+        help="Field to break latency down by (default: request.mount_type)",
+    )
+    args = parser.parse_args()
+
+    agg = aggregate(args.paths, workers=args.workers, latency_by=args.latency_by)
+    print(json.dumps(agg.summary(top=args.top), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
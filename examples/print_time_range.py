@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Example: print the events of a time window using `read_range`.
+
+The file is bisected by byte offset instead of being read in full, so
+this stays fast on large, roughly time-ordered logs (gzip logs need a
+`GzipCheckpointIndex` sidecar for that).
+
+Usage:
+  python examples/print_time_range.py audit.log 2024-05-01T14:02:00Z 2024-05-01T14:07:00Z
+"""
+from __future__ import annotations
+
+import argparse
+import json
+
+from vault_audit_lib import VaultLogReader
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Print events in a time window")
+    parser.add_argument("path", help="Path to the audit log file (path or .gz)")
+    parser.add_argument("start", help="Window start (RFC3339, inclusive)")
+    parser.add_argument("end", help="Window end (RFC3339, exclusive)")
+    parser.add_argument(
+        "--slack",
+        type=float,
+        default=5.0,
+        help="Seconds by which the log may be out of order (default: 5)",
+    )
+    args = parser.parse_args()
+
+    reader = VaultLogReader(args.path)
+    for entry in reader.read_range(args.start, args.end, slack=args.slack):
+        print(json.dumps(entry, ensure_ascii=False))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
-"""Simple example: group Vault log events into transactions and print them."""
+"""Simple example: group Vault log events into transactions and print them.
+
+Several paths, directories or glob patterns (rotated files, one log per
+node) are merged by event time, so transactions spanning files are still
+grouped:
+
+  read_vault_transactions.py 'node-*/audit.log*' --workers 4
+"""
 from __future__ import annotations
 
 import argparse
 import json
+import os
 
-from vault_audit_lib import VaultLogReader, VaultTransactionReader
+from vault_audit_lib import (
+    VaultLogReader,
+    VaultMultiLogReader,
+    VaultTransactionReader,
+)
 
 
 def main() -> int:
@@ -13,11 +25,21 @@ def main() -> int:
         description="Read a Vault audit log and print transactions grouped by request.id"
     )
     parser.add_argument(
-        "path", help="Path to the audit log file (.private_log or .private_log.gz)"
+        "paths",
+        nargs="+",
+        help="Audit log files (.private_log or .private_log.gz), directories "
+        "or glob patterns",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Parse files in worker processes"
     )
     args = parser.parse_args()
 
-    reader = VaultLogReader(args.path)
+    reader = (
+        VaultLogReader(args.paths[0])
+        if len(args.paths) == 1 and os.path.isfile(args.paths[0])
+        else VaultMultiLogReader(args.paths, workers=args.workers)
+    )
     txn_reader = VaultTransactionReader(reader)
 
     for request_id, events in txn_reader:
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Receive events from a Vault `socket` audit device and write transactions.
+
+Enable the device in Vault, e.g.
+  vault audit enable socket address=127.0.0.1:9090 socket_type=tcp
+
+Events are grouped into transactions as they arrive; transactions with an
+event matching `--error-only` (any `error` value) or all transactions are
+written to `--out` in time order. Counters are printed on exit (Ctrl-C).
+
+Usage:
+  python examples/receive_vault_socket.py --port 9090 --out received.log
+  python examples/receive_vault_socket.py --protocol unix --path /tmp/vault.sock
+"""
+from __future__ import annotations
+
+import argparse
+import json
+
+from vault_audit_lib import (
+    VaultSocketReceiver,
+    VaultTransactionReader,
+    VaultTransactionWriter,
+    field,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Receive a Vault socket audit device")
+    parser.add_argument("--protocol", choices=("tcp", "udp", "unix"), default="tcp")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--path", help="Unix socket path (with --protocol unix)")
+    parser.add_argument("--out", "-o", default="received.log", help="Output log")
+    parser.add_argument(
+        "--error-only",
+        action="store_true",
+        help="Only write transactions containing an event with `error`",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=300.0,
+        help="Seconds after which an unanswered request is written (default: 300)",
+    )
+    args = parser.parse_args()
+
+    keep = field("error").exists() if args.error_only else None
+    receiver = VaultSocketReceiver(
+        host=args.host, port=args.port, path=args.path, protocol=args.protocol
+    )
+    written = 0
+    with receiver, VaultTransactionWriter(args.out, mode="a") as writer:
+        print(f"Listening on {receiver.address} ({args.protocol})")
+        try:
+            for request_id, entries in VaultTransactionReader(
+                receiver, max_age=args.max_age
+            ):
+                if keep is None or keep.match(entries):
+                    writer.write_transaction(request_id, entries)
+                    written += 1
+        except KeyboardInterrupt:
+            pass
+    print(f"Wrote {written} transactions to {args.out}")
+    print(json.dumps(receiver.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,46 @@
 #!/usr/bin/env python3
 """Read a Vault audit log and write entries to a new file.
 
+With a `.vcol` destination the projected fields are written as a
+columnar file (`VaultColumnWriter`) that later analyses can memory-map
+instead of parsing JSON again.
+
+With `--rotate-window` and/or `--rotate-entries` JSON output is written
+as gzip-compressed segments plus a manifest of their time ranges
+(`VaultRotatingWriter`) instead of one growing file.
+
 Usage:
   python examples/read_and_write_vault_log.py input.private_log output.private_log
+  python examples/reduce_vault_log.py input.private_log output.vcol
+  python examples/reduce_vault_log.py input.private_log out/reduced.log \
+      --rotate-window 3600
 """
 from __future__ import annotations
 
 import argparse
 
-from vault_audit_lib import VaultEventFilter, VaultLogReader, VaultLogWriter
+from vault_audit_lib import (
+    VaultColumnWriter,
+    VaultEventFilter,
+    VaultLogReader,
+    VaultLogWriter,
+    VaultRotatingWriter,
+)
+from vault_audit_lib.vault_columnar import DEFAULT_COLUMNS
+
+
+# Fields read by `map` and the filters below; the reader skips everything else.
+FIELDS = [
+    "time",
+    "type",
+    "error",
+    "request.id",
+    "request.namespace.path",
+    "request.mount_type",
+    "request.path",
+    "auth.entity_id",
+    "auth.client_token",
+]
 
 
 # Map function to extract relevant fields
@@ -32,17 +64,41 @@ def main() -> int:
     )
     parser.add_argument("src", help="Source audit log file (.private_log or .gz)")
     parser.add_argument("dst", help="Destination file to write entries to")
+    parser.add_argument(
+        "--rotate-window",
+        type=float,
+        help="Start a new segment every this many seconds of event time",
+    )
+    parser.add_argument(
+        "--rotate-entries", type=int, help="Start a new segment after this many entries"
+    )
     args = parser.parse_args()
 
-    reader = VaultLogReader(args.src)
+    reader = VaultLogReader(args.src, fields=FIELDS)
     nerr = VaultEventFilter("error", lambda v: v is None)
     filt = VaultEventFilter("type", "response")
+    # only write entries that are of type "response" and have no error
+    keep = filt & nerr
 
-    with VaultLogWriter(args.dst, mode="w") as writer:
-        for entry in reader:
-            # only write entries that are of type "response" and have no error
-            if filt.match(entry) and nerr.match(entry):
-                writer.write(map(entry))
+    if args.dst.endswith(".vcol"):
+        # same projection as `map`, stored as typed, dictionary-encoded columns
+        with VaultColumnWriter(args.dst, columns=DEFAULT_COLUMNS) as columns:
+            columns.writelines(entry for entry in reader if keep.match(entry))
+    elif args.rotate_window or args.rotate_entries:
+        with VaultRotatingWriter(
+            args.dst,
+            mode="w",
+            window=args.rotate_window,
+            max_entries=args.rotate_entries,
+        ) as segments:
+            for entry in reader:
+                if keep.match(entry):
+                    segments.write(map(entry))
+    else:
+        with VaultLogWriter(args.dst, mode="w") as writer:
+            for entry in reader:
+                if keep.match(entry):
+                    writer.write(map(entry))
 
     print(f"Wrote entries from {args.src} to {args.dst}")
     return 0
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Replay an audit log to a socket audit endpoint, as Vault would send it.
+
+Useful for exercising `receive_vault_socket.py` or any other consumer of
+the Vault `socket` audit device without a Vault server.
+
+Usage:
+  python examples/replay_vault_log.py audit.log --port 9090 --rate 5000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from vault_audit_lib import replay_log
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a log to a socket")
+    parser.add_argument("log", help="Path to the audit log file (path or .gz)")
+    parser.add_argument("--protocol", choices=("tcp", "udp", "unix"), default="tcp")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--path", help="Unix socket path (with --protocol unix)")
+    parser.add_argument(
+        "--rate", type=float, help="Events per second (default: unthrottled)"
+    )
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    sent = replay_log(
+        args.log,
+        host=args.host,
+        port=args.port,
+        path=args.path,
+        protocol=args.protocol,
+        rate=args.rate,
+    )
+    elapsed = time.perf_counter() - t0
+    print(f"Sent {sent} events in {elapsed:.2f}s ({sent / max(elapsed, 1e-9):,.0f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,6 +6,7 @@ entries merged by `time` using `VaultTransactionWriter`.
 
 Usage:
   python examples/transaction_write_example.py input.private_log out.private_log
+  python examples/transaction_write_example.py big.log.gz out.log --run-size 500000
 """
 from __future__ import annotations
 
@@ -25,12 +26,26 @@ def main() -> int:
         default="time",
         help="Key name for entry timestamp (default: time)",
     )
+    parser.add_argument(
+        "--run-size",
+        type=int,
+        default=None,
+        help="Sort on disk in runs of this many entries (bounded memory)",
+    )
+    parser.add_argument(
+        "--tmp-dir", default=None, help="Directory for sort runs (default: $TMPDIR)"
+    )
     args = parser.parse_args()
 
     reader = VaultTransactionReader(args.src)
 
     with VaultTransactionWriter(args.dst, mode="w") as writer:
-        writer.write_transactions(reader, time_key=args.time_key)
+        writer.write_transactions(
+            reader,
+            time_key=args.time_key,
+            run_size=args.run_size,
+            tmp_dir=args.tmp_dir,
+        )
 
     print(f"Wrote merged transactions from {args.src} -> {args.dst}")
     return 0
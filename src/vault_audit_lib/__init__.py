@@ -1,7 +1,42 @@
-from .vault_event_filter import VaultEventFilter
+from .vault_async import (
+    AsyncVaultAuditServer,
+    AsyncVaultLogReader,
+    AsyncVaultLogWriter,
+    AsyncVaultTransactionReader,
+)
+from .vault_aggregate import (
+    CountMinSketch,
+    HyperLogLog,
+    SpaceSaving,
+    TDigest,
+    TransactionAggregator,
+    aggregate,
+)
+from .vault_checkpoint import ScanCheckpoint
+from .vault_columnar import ColumnChunk, VaultColumnReader, VaultColumnWriter
+from .vault_compact_event import CompactEvent
+from .vault_event_filter import (
+    FieldPredicate,
+    VaultEventFilter,
+    all_of,
+    any_of,
+    field,
+    not_,
+)
+from .vault_field_projection import VaultFieldProjection
+from .vault_gzip import BlockGzipWriter, GzipCheckpointIndex
+from .vault_json_codec import JSONCodec, available_codecs, get_codec
+from .vault_log_follower import VaultLogFollower
+from .vault_log_index import VaultLogIndex
 from .vault_log_reader import VaultLogReader
 from .vault_log_writer import VaultLogWriter
-from .vault_transaction_reader import VaultTransactionReader
+from .vault_multi_reader import VaultMultiLogReader, expand_log_paths
+from .vault_raw_event import RawEvent
+from .vault_rotating_writer import VaultRotatingWriter, load_manifest, manifest_paths
+from .vault_socket import VaultSocketReceiver, replay_log
+from .vault_split import sanitized_filename, split_by, transaction_key
+from .vault_time import event_time_ns, parse_time_ns, parse_times_ns, time_range
+from .vault_transaction_reader import IncompleteTransaction, VaultTransactionReader
 from .vault_transaction_writer import VaultTransactionWriter
 
 __all__ = [
@@ -10,4 +45,48 @@ __all__ = [
     "VaultLogWriter",
     "VaultTransactionWriter",
     "VaultEventFilter",
+    "VaultFieldProjection",
+    "IncompleteTransaction",
+    "FieldPredicate",
+    "field",
+    "all_of",
+    "any_of",
+    "not_",
+    "VaultLogIndex",
+    "GzipCheckpointIndex",
+    "BlockGzipWriter",
+    "JSONCodec",
+    "get_codec",
+    "available_codecs",
+    "parse_time_ns",
+    "parse_times_ns",
+    "event_time_ns",
+    "time_range",
+    "VaultLogFollower",
+    "AsyncVaultLogReader",
+    "AsyncVaultTransactionReader",
+    "AsyncVaultLogWriter",
+    "AsyncVaultAuditServer",
+    "VaultSocketReceiver",
+    "replay_log",
+    "split_by",
+    "transaction_key",
+    "sanitized_filename",
+    "TransactionAggregator",
+    "aggregate",
+    "CountMinSketch",
+    "SpaceSaving",
+    "HyperLogLog",
+    "TDigest",
+    "VaultColumnWriter",
+    "VaultColumnReader",
+    "ColumnChunk",
+    "CompactEvent",
+    "RawEvent",
+    "VaultMultiLogReader",
+    "expand_log_paths",
+    "VaultRotatingWriter",
+    "load_manifest",
+    "manifest_paths",
+    "ScanCheckpoint",
 ]
@@ -0,0 +1,532 @@
+"""Streaming statistics over audit transactions in bounded memory.
+
+`TransactionAggregator` computes in one pass over `(request_id, entries)`
+transactions:
+
+- group-by counts and top-K values per field (`SpaceSaving`, exact while
+  a field has fewer distinct values than `top_k`), plus a `CountMinSketch`
+  for point estimates of any value;
+- transaction and error counts, and top-K values among errored
+  transactions;
+- distinct counts per field (`HyperLogLog`);
+- request -> response latency percentiles (`TDigest`), overall and per
+  value of `latency_by`.
+
+Every structure has a fixed size and a `merge()` method, and pickles
+cleanly, so aggregates of several files or processes combine into one:
+
+    agg = TransactionAggregator().update(VaultTransactionReader(path))
+    agg.merge(other_agg)
+    print(agg.summary(top=10))
+
+`aggregate(paths, workers=4)` does exactly that with a process pool.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .vault_compact_event import CompactEvent
+from .vault_event_filter import _MISSING, _compile_getter
+from .vault_time import event_time_ns
+from .vault_transaction_reader import VaultTransactionReader
+
+DEFAULT_TOP_K = 1000
+DEFAULT_GROUP_BY = ("request.path", "request.mount_type", "auth.entity_id")
+DEFAULT_DISTINCT = ("auth.entity_id", "auth.client_token")
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+# Value used for `latency_by` groups beyond `max_latency_groups`.
+OTHER_GROUP = "(other)"
+
+_MASK64 = (1 << 64) - 1
+
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash (unlike `hash()`, equal across processes)."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class CountMinSketch:
+    """Approximate counts; estimates never undercount.
+
+    With `width` w and `depth` d an estimate exceeds the true count by at
+    most `2 * total / w` with probability `1 - 2 ** -d`. Sketches merge
+    when their sizes match.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 5) -> None:
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._table = array("q", bytes(8 * width * depth))
+
+    def _cells(self, key: str) -> List[int]:
+        h = _hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        w = self.width
+        return [row * w + (h1 + row * h2) % w for row in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> None:
+        table = self._table
+        for cell in self._cells(key):
+            table[cell] += count
+        self.total += count
+
+    def estimate(self, key: str) -> int:
+        table = self._table
+        return min(table[cell] for cell in self._cells(key))
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("cannot merge CountMinSketch of different sizes")
+        table = self._table
+        for i, n in enumerate(other._table):
+            if n:
+                table[i] += n
+        self.total += other.total
+        return self
+
+
+class SpaceSaving:
+    """Top-K heavy hitters over a stream (Metwally et al.).
+
+    At most `capacity` values are tracked. A new value evicts the
+    current minimum and inherits its count as `error`, so a reported
+    count overestimates by at most its error; any value occurring more
+    than `total / capacity` times is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TOP_K) -> None:
+        self.capacity = max(1, capacity)
+        self.total = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        # one (count, key) per tracked key; counts may lag (see `_pop_min`)
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        heap, counts = self._heap, self._counts
+        while True:
+            n, key = heap[0]
+            current = counts[key]
+            if current == n:
+                return heapq.heappop(heap)
+            heapq.heapreplace(heap, (current, key))
+
+    def add(self, key: str, count: int = 1) -> None:
+        self.total += count
+        counts = self._counts
+        if key in counts:
+            counts[key] += count
+            return
+        error = 0
+        if len(counts) >= self.capacity:
+            error, evicted = self._pop_min()
+            del counts[evicted]
+            del self._errors[evicted]
+        counts[key] = error + count
+        self._errors[key] = error
+        heapq.heappush(self._heap, (error + count, key))
+
+    def count(self, key: str) -> int:
+        """Upper bound of `key`'s count (0 if untracked and not full)."""
+        if key in self._counts:
+            return self._counts[key]
+        return self._floor()
+
+    def _floor(self) -> int:
+        if len(self._counts) < self.capacity:
+            return 0
+        return min(self._counts.values())
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """`(key, count, error)` of the `n` largest counts, descending."""
+        items = sorted(self._counts.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+        return [(key, count, self._errors[key]) for key, count in items]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combine with `other`; untracked keys count as each side's floor."""
+        a_floor, b_floor = self._floor(), other._floor()
+        counts: Dict[str, int] = {}
+        errors: Dict[str, int] = {}
+        for key in self._counts.keys() | other._counts.keys():
+            counts[key] = self._counts.get(key, a_floor) + other._counts.get(
+                key, b_floor
+            )
+            errors[key] = self._errors.get(key, a_floor) + other._errors.get(
+                key, b_floor
+            )
+        if len(counts) > self.capacity:
+            keep = heapq.nlargest(self.capacity, counts, key=counts.__getitem__)
+            counts = {key: counts[key] for key in keep}
+        self._counts = counts
+        self._errors = {key: errors[key] for key in counts}
+        self._heap = [(n, key) for key, n in counts.items()]
+        heapq.heapify(self._heap)
+        self.total += other.total
+        return self
+
+
+class HyperLogLog:
+    """Distinct-count estimate with about `1.04 / sqrt(2 ** p)` error.
+
+    Uses `2 ** p` one-byte registers (16 KiB at the default `p=14`,
+    ~0.8% error); sketches of equal `p` merge by register-wise maximum.
+    """
+
+    def __init__(self, p: int = 14) -> None:
+        if not 4 <= p <= 18:
+            raise ValueError("HyperLogLog precision p must be in 4..18")
+        self.p = p
+        self._registers = bytearray(1 << p)
+
+    def add(self, value: str) -> None:
+        h = _hash64(value)
+        index = h >> (64 - self.p)
+        rest = (h << self.p) & _MASK64
+        rank = 64 - self.p + 1 if rest == 0 else 65 - rest.bit_length()
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # small range: linear counting is more accurate
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if self.p != other.p:
+            raise ValueError("cannot merge HyperLogLog of different precision")
+        self._registers = bytearray(map(max, self._registers, other._registers))
+        return self
+
+
+class TDigest:
+    """Quantile sketch keeping about `compression` centroids (Dunning).
+
+    Values are buffered and periodically merged into weighted centroids
+    whose size shrinks towards the tails (the `k1` arcsine scale), so
+    extreme quantiles stay precise. Digests merge by re-compressing their centroids.
+    """
+
+    def __init__(self, compression: float = 100.0) -> None:
+        self.compression = compression
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._centroids: List[Tuple[float, float]] = []  # (mean, weight)
+        self._buffer: List[Tuple[float, float]] = []
+        self._buffer_size = max(32, int(compression * 5))
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        self._buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = sum(w for _m, w in points)
+        # k1 scale: a centroid may span at most one unit of k
+        scale = self.compression / (2 * math.pi)
+
+        def k(q: float) -> float:
+            return scale * math.asin(2 * min(q, 1.0) - 1)
+
+        merged: List[Tuple[float, float]] = []
+        mean, weight = points[0]
+        before = 0.0
+        k_lo = k(0.0)
+        for m, w in points[1:]:
+            if k((before + weight + w) / total) - k_lo <= 1:
+                weight += w
+                mean += (m - mean) * w / weight
+            else:
+                merged.append((mean, weight))
+                before += weight
+                k_lo = k(before / total)
+                mean, weight = m, w
+        merged.append((mean, weight))
+        self._centroids = merged
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile `q` (0..1); NaN when empty."""
+        self._compress()
+        cs = self._centroids
+        if not cs:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        target = q * self.count
+        # cumulative weight at each centroid's centre
+        centres: List[float] = []
+        cumulative = 0.0
+        for _m, w in cs:
+            centres.append(cumulative + w / 2)
+            cumulative += w
+        i = bisect_left(centres, target)
+        if i == 0:
+            lo_pos, lo_val = 0.0, self.min
+            hi_pos, hi_val = centres[0], cs[0][0]
+        elif i == len(cs):
+            lo_pos, lo_val = centres[-1], cs[-1][0]
+            hi_pos, hi_val = self.count, self.max
+        else:
+            lo_pos, lo_val = centres[i - 1], cs[i - 1][0]
+            hi_pos, hi_val = centres[i], cs[i][0]
+        if hi_pos <= lo_pos:
+            return hi_val
+        return lo_val + (hi_val - lo_val) * (target - lo_pos) / (hi_pos - lo_pos)
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        other._compress()
+        self._buffer.extend(other._centroids)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+
+def _first_value(entries: Sequence[Any], get: Any) -> Optional[str]:
+    for entry in entries:
+        value = get(entry)
+        if value is not _MISSING and value is not None and value != "":
+            return value if isinstance(value, str) else str(value)
+    return None
+
+
+def _has_error(entries: Sequence[Any]) -> bool:
+    return any(
+        isinstance(e, (dict, CompactEvent)) and e.get("error") for e in entries
+    )
+
+
+class TransactionAggregator:
+    """One-pass, mergeable statistics over transactions.
+
+    Parameters
+    - `group_by`: dotted fields counted per value (top-K and count-min).
+    - `distinct`: dotted fields whose distinct values are estimated.
+    - `latency_by`: optional dotted field with per-value latency digests
+       (at most `max_latency_groups`; later values share `OTHER_GROUP`).
+    - `top_k`: values tracked per `group_by` field.
+    - `sketch_width`, `sketch_depth`: `CountMinSketch` size.
+    - `hll_precision`: `HyperLogLog` precision.
+    - `compression`: `TDigest` compression.
+    - `time_key`: event time field used for latency.
+
+    A field's value is taken from the first event of the transaction
+    that has it. Latency is the response time minus the request time,
+    in milliseconds, for transactions with both events.
+    """
+
+    def __init__(
+        self,
+        group_by: Sequence[str] = DEFAULT_GROUP_BY,
+        distinct: Sequence[str] = DEFAULT_DISTINCT,
+        latency_by: Optional[str] = None,
+        top_k: int = DEFAULT_TOP_K,
+        sketch_width: int = 2048,
+        sketch_depth: int = 5,
+        hll_precision: int = 14,
+        compression: float = 100.0,
+        max_latency_groups: int = 64,
+        time_key: str = "time",
+    ) -> None:
+        self.group_by = tuple(group_by)
+        self.distinct_fields = tuple(distinct)
+        self.latency_by = latency_by
+        self.max_latency_groups = max_latency_groups
+        self.time_key = time_key
+        self.compression = compression
+        self.transactions = 0
+        self.errors = 0
+        self.top = {f: SpaceSaving(top_k) for f in self.group_by}
+        self.error_top = {f: SpaceSaving(top_k) for f in self.group_by}
+        self.sketches = {
+            f: CountMinSketch(sketch_width, sketch_depth) for f in self.group_by
+        }
+        self.distinct = {f: HyperLogLog(hll_precision) for f in self.distinct_fields}
+        self.latency = TDigest(compression)
+        self.latency_groups: Dict[str, TDigest] = {}
+
+        self._compile()
+
+    def _compile(self) -> None:
+        fields = set(self.group_by) | set(self.distinct_fields)
+        if self.latency_by is not None:
+            fields.add(self.latency_by)
+        self._getters = {f: _compile_getter(f) for f in fields}
+
+    # compiled getters are closures: rebuild them instead of pickling
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_getters"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._compile()
+
+    def add(self, transaction: Tuple[str, Iterable[Any]]) -> None:
+        """Account for one `(request_id, entries)` transaction."""
+        _request_id, entries = transaction
+        entries = entries if isinstance(entries, list) else list(entries)
+        self.transactions += 1
+        error = _has_error(entries)
+        if error:
+            self.errors += 1
+        getters = self._getters
+        for f in self.group_by:
+            value = _first_value(entries, getters[f])
+            if value is None:
+                continue
+            self.top[f].add(value)
+            self.sketches[f].add(value)
+            if error:
+                self.error_top[f].add(value)
+        for f in self.distinct_fields:
+            value = _first_value(entries, getters[f])
+            if value is not None:
+                self.distinct[f].add(value)
+
+        started = ended = None
+        for e in entries:
+            if not isinstance(e, (dict, CompactEvent)):
+                continue
+            kind = e.get("type")
+            if kind == "request" and started is None:
+                started = event_time_ns(e, self.time_key)
+            elif kind == "response" and ended is None:
+                ended = event_time_ns(e, self.time_key)
+        if started is None or ended is None:
+            return
+        latency_ms = (ended - started) / 1e6
+        self.latency.add(latency_ms)
+        if self.latency_by is not None:
+            group = _first_value(entries, getters[self.latency_by])
+            self._latency_group(group or OTHER_GROUP).add(latency_ms)
+
+    def _latency_group(self, group: str) -> TDigest:
+        digest = self.latency_groups.get(group)
+        if digest is None:
+            if len(self.latency_groups) >= self.max_latency_groups:
+                group = OTHER_GROUP
+                digest = self.latency_groups.get(group)
+            if digest is None:
+                digest = self.latency_groups[group] = TDigest(self.compression)
+        return digest
+
+    def update(
+        self, transactions: Iterable[Tuple[str, Iterable[Any]]]
+    ) -> "TransactionAggregator":
+        for tx in transactions:
+            self.add(tx)
+        return self
+
+    def count(self, field: str, value: str) -> int:
+        """Estimated number of transactions with `field == value`."""
+        top = self.top[field]
+        if value in top._counts and top._errors[value] == 0:
+            return top._counts[value]
+        return self.sketches[field].estimate(value)
+
+    def merge(self, other: "TransactionAggregator") -> "TransactionAggregator":
+        """Add the statistics of `other` (built with the same options)."""
+        self.transactions += other.transactions
+        self.errors += other.errors
+        for f in self.group_by:
+            self.top[f].merge(other.top[f])
+            self.error_top[f].merge(other.error_top[f])
+            self.sketches[f].merge(other.sketches[f])
+        for f in self.distinct_fields:
+            self.distinct[f].merge(other.distinct[f])
+        self.latency.merge(other.latency)
+        for group, digest in other.latency_groups.items():
+            self._latency_group(group).merge(digest)
+        return self
+
+    def summary(
+        self, top: int = 10, quantiles: Sequence[float] = DEFAULT_QUANTILES
+    ) -> Dict[str, Any]:
+        """Plain-dict report (JSON-serializable)."""
+
+        def percentiles(digest: TDigest) -> Dict[str, Any]:
+            report: Dict[str, Any] = {"count": int(digest.count)}
+            if digest.count:
+                for q in quantiles:
+                    report[f"p{q * 100:g}"] = round(digest.quantile(q), 3)
+                report["max"] = round(digest.max, 3)
+            return report
+
+        return {
+            "transactions": self.transactions,
+            "errors": self.errors,
+            "error_rate": self.errors / self.transactions if self.transactions else 0.0,
+            "top": {f: self.top[f].top(top) for f in self.group_by},
+            "error_top": {f: self.error_top[f].top(top) for f in self.group_by},
+            "distinct": {f: hll.count() for f, hll in self.distinct.items()},
+            "latency_ms": percentiles(self.latency),
+            "latency_ms_by": {
+                group: percentiles(digest)
+                for group, digest in sorted(self.latency_groups.items())
+            },
+        }
+
+
+def _aggregate_path(path: str, options: Dict[str, Any]) -> TransactionAggregator:
+    return TransactionAggregator(**options).update(VaultTransactionReader(path))
+
+
+def aggregate(
+    paths: Iterable[str], workers: int = 1, **options: Any
+) -> TransactionAggregator:
+    """Aggregate the transactions of several log files and merge the results.
+
+    Each file is read by its own `VaultTransactionReader` (in a process
+    pool when `workers > 1`), so transactions spanning files are counted
+    once per file. `options` are `TransactionAggregator` arguments.
+    """
+    paths = list(paths)
+    result = TransactionAggregator(**options)
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for agg in pool.map(_aggregate_path, paths, [options] * len(paths)):
+                result.merge(agg)
+    else:
+        for path in paths:
+            result.merge(_aggregate_path(path, options))
+    return result
+
+
+__all__ = [
+    "CountMinSketch",
+    "SpaceSaving",
+    "HyperLogLog",
+    "TDigest",
+    "TransactionAggregator",
+    "aggregate",
+]
@@ -0,0 +1,402 @@
+"""asyncio front-ends for the readers and writers.
+
+- `AsyncVaultLogReader` yields entries with `async for` from a path (the
+  synchronous `VaultLogReader` runs in an executor, one batch of entries
+  per hop) or from an `asyncio.StreamReader` (lines are framed on the
+  loop; large batches are decoded in the executor).
+- `AsyncVaultTransactionReader` groups entries of any async source into
+  transactions, with the same options as `VaultTransactionReader`.
+- `AsyncVaultLogWriter` collects entries and hands each batch to a
+  `VaultLogWriter` in the executor, so serialization, compression and
+  file I/O never run on the event loop.
+- `AsyncVaultAuditServer` accepts connections from Vault `socket` audit
+  devices (TCP or Unix socket) and yields their events from one bounded
+  queue; a full queue stops reading from the sockets (backpressure).
+
+Each object only awaits, so many streams can share one event loop:
+
+    async with AsyncVaultAuditServer(port=9090) as server:
+        async for request_id, events in AsyncVaultTransactionReader(server):
+            ...
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .vault_json_codec import JSONCodec
+from .vault_log_reader import (
+    Prefilter,
+    VaultLogReader,
+    _compile_prefilter,
+    _line_decoder,
+)
+from .vault_log_writer import VaultLogWriter
+from .vault_time import time_sort_key
+from .vault_transaction_reader import VaultTransactionReader, _extract_request_id
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_QUEUE_SIZE = 10_000
+_READ_SIZE = 64 * 1024
+# Stream batches with fewer lines are decoded on the loop itself.
+_OFFLOAD_MIN_LINES = 64
+
+_END = object()
+
+
+def _next_batch(it: Iterator[Any], size: int) -> List[Any]:
+    batch: List[Any] = []
+    for entry in it:
+        batch.append(entry)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+def _decode_lines(decode: Callable[[bytes], Any], lines: Sequence[bytes]) -> List[Any]:
+    return [decode(line) for line in lines]
+
+
+class AsyncVaultLogReader:
+    """Read entries from a log file or stream with `async for`.
+
+    Parameters
+    - `source`: path or file object (read by `VaultLogReader` in the
+       executor) or an `asyncio.StreamReader` of newline-delimited JSON.
+    - `batch_size`: entries read per executor hop.
+    - `executor`: executor for blocking work (default: the loop's).
+    - `fields`, `prefilter`, `codec`: as for `VaultLogReader`.
+    - `reader_options`: further `VaultLogReader` arguments for paths
+       (e.g. `workers=4`, `use_mmap=True`).
+    """
+
+    def __init__(
+        self,
+        source: Union[str, IO, asyncio.StreamReader],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        executor: Optional[Executor] = None,
+        fields: Optional[Sequence[str]] = None,
+        prefilter: Optional[Prefilter] = None,
+        codec: Union[str, JSONCodec, None] = None,
+        **reader_options: Any,
+    ) -> None:
+        self.source = source
+        self.batch_size = max(1, batch_size)
+        self.executor = executor
+        self.fields = fields
+        self.prefilter = prefilter
+        self.codec = codec
+        self.reader_options = reader_options
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self.read()
+
+    async def read(self) -> AsyncIterator[Any]:
+        if isinstance(self.source, asyncio.StreamReader):
+            async for entry in self._read_stream(self.source):
+                yield entry
+            return
+        loop = asyncio.get_running_loop()
+        reader = VaultLogReader(
+            self.source,
+            fields=self.fields,
+            prefilter=self.prefilter,
+            codec=self.codec,
+            **self.reader_options,
+        )
+        it = reader.read()
+        try:
+            while True:
+                batch = await loop.run_in_executor(
+                    self.executor, _next_batch, it, self.batch_size
+                )
+                if not batch:
+                    return
+                for entry in batch:
+                    yield entry
+        finally:
+            await loop.run_in_executor(self.executor, it.close)
+
+    async def _read_stream(self, stream: asyncio.StreamReader) -> AsyncIterator[Any]:
+        loop = asyncio.get_running_loop()
+        decode = _line_decoder(self.fields, self.codec)
+        needles = _compile_prefilter(self.prefilter) or ()
+        pending = b""
+        while True:
+            data = await stream.read(_READ_SIZE)
+            if not data:
+                break
+            *raw_lines, pending = (pending + data).split(b"\n")
+            lines = [line.strip() for line in raw_lines]
+            lines = [ln for ln in lines if ln and all(n in ln for n in needles)]
+            if len(lines) >= _OFFLOAD_MIN_LINES:
+                entries = await loop.run_in_executor(
+                    self.executor, _decode_lines, decode, lines
+                )
+            else:
+                entries = _decode_lines(decode, lines)
+            for entry in entries:
+                yield entry
+        line = pending.strip()
+        if line and all(n in line for n in needles):
+            yield decode(line)
+
+
+class AsyncVaultTransactionReader(VaultTransactionReader):
+    """Group entries of an async source into transactions with `async for`.
+
+    `source` is a path, file object or `asyncio.StreamReader` (read with
+    `AsyncVaultLogReader`) or any async iterable of entries. The other
+    parameters are those of `VaultTransactionReader` (except `follow`);
+    `compact` and `keep_raw` apply to every source read with
+    `AsyncVaultLogReader`.
+    Spilled transactions (`on_limit="spill"`) use blocking file I/O.
+    """
+
+    def __init__(self, source: Any, *args: Any, **kwargs: Any) -> None:
+        super().__init__([], *args, **kwargs)
+        if hasattr(source, "__aiter__"):
+            self.reader = source
+        else:
+            self.reader = AsyncVaultLogReader(
+                source, compact=self.compact, keep_raw=self.keep_raw
+            )
+
+    def __iter__(self) -> Iterator[Tuple[str, List[Any]]]:
+        raise TypeError("use 'async for' with AsyncVaultTransactionReader")
+
+    def __aiter__(self) -> AsyncIterator[Tuple[str, List[Any]]]:
+        return self.aread()
+
+    async def aread(self) -> AsyncIterator[Tuple[str, List[Any]]]:
+        buffer = self._new_buffer()
+        try:
+            async for entry in self.reader:
+                rid = _extract_request_id(entry)
+                if rid is None:
+                    continue
+                for tx in buffer.add(rid, entry):
+                    yield tx
+            if self.close_on_eof:
+                for tx in buffer.drain():
+                    yield tx
+        finally:
+            buffer.close()
+
+
+class AsyncVaultLogWriter:
+    """Write entries from coroutines; the work runs in an executor.
+
+    Parameters
+    - `file`: path or text file object, as for `VaultLogWriter`.
+    - `batch_size`: entries collected before a batch is written.
+    - `executor`: executor for blocking work (default: the loop's).
+    - `writer_options`: further `VaultLogWriter` arguments (`mode`,
+       `gzip_block_size`, `compresslevel`, ...).
+
+    Batches are written in order even when several tasks share the
+    writer. Entries are serialized in the executor, so they must not be
+    mutated after `write()`. Use `async with` or `aclose()`.
+    """
+
+    def __init__(
+        self,
+        file: Union[str, IO],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        executor: Optional[Executor] = None,
+        **writer_options: Any,
+    ) -> None:
+        self._writer = VaultLogWriter(file, **writer_options)
+        self.batch_size = max(1, batch_size)
+        self.executor = executor
+        self._batch: List[Any] = []
+        self._lock = asyncio.Lock()
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def _write_batch(self) -> None:
+        async with self._lock:
+            batch, self._batch = self._batch, []
+            if batch:
+                await self._run(self._writer.writelines, batch)
+
+    async def write(self, entry: Any) -> None:
+        self._batch.append(entry)
+        if len(self._batch) >= self.batch_size:
+            await self._write_batch()
+
+    async def writelines(self, entries: Iterable[Any]) -> None:
+        for entry in entries:
+            await self.write(entry)
+
+    async def write_transaction(
+        self, request_id: str, entries: Iterable[Any], time_key: str = "time"
+    ) -> None:
+        """Write one transaction's entries in time order."""
+        ordered = sorted(entries, key=lambda e: time_sort_key(e, time_key))
+        await self.writelines(ordered)
+
+    async def flush(self) -> None:
+        await self._write_batch()
+        async with self._lock:
+            await self._run(self._writer.flush)
+
+    async def aclose(self) -> None:
+        await self._write_batch()
+        async with self._lock:
+            await self._run(self._writer.close)
+
+    async def __aenter__(self) -> "AsyncVaultLogWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            await self.flush()
+        finally:
+            await self.aclose()
+
+
+class AsyncVaultAuditServer:
+    """Receive events from Vault `socket` audit devices on a local socket.
+
+    Parameters
+    - `host`, `port`: TCP address to listen on (`port=0` picks a free
+       port; see `address` after `start()`).
+    - `path`: listen on this Unix socket path instead of TCP.
+    - `queue_size`: events buffered between the connections and the
+       consumer; when full, connections stop being read.
+    - `fields`, `prefilter`, `codec`, `executor`: as for
+       `AsyncVaultLogReader`, applied to every connection.
+
+    `async for entry in server` yields events from all connections in
+    arrival order until `close()` is called.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: Optional[str] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        fields: Optional[Sequence[str]] = None,
+        prefilter: Optional[Prefilter] = None,
+        codec: Union[str, JSONCodec, None] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.path = path
+        self.queue_size = queue_size
+        self.fields = fields
+        self.prefilter = prefilter
+        self.codec = codec
+        self.executor = executor
+        self.address: Any = None
+        self.connections = 0
+        self.events = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._queue: Optional["asyncio.Queue[Any]"] = None
+        self._handlers: Set["asyncio.Task[Any]"] = set()
+        self._closed = False
+
+    async def start(self) -> "AsyncVaultAuditServer":
+        self._queue = asyncio.Queue(maxsize=max(1, self.queue_size))
+        self._closed = False
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, self.host, self.port
+            )
+        self.address = self._server.sockets[0].getsockname()
+        return self
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        assert self._queue is not None
+        self.connections += 1
+        task = asyncio.current_task()
+        if task is not None:
+            self._handlers.add(task)
+        source = AsyncVaultLogReader(
+            reader,
+            executor=self.executor,
+            fields=self.fields,
+            prefilter=self.prefilter,
+            codec=self.codec,
+        )
+        try:
+            async for entry in source:
+                await self._queue.put(entry)
+                self.events += 1
+        except ConnectionError:
+            pass
+        finally:
+            if task is not None:
+                self._handlers.discard(task)
+            writer.close()
+
+    async def close(self) -> None:
+        """Stop listening, drop open connections and end iteration.
+
+        Events already queued are still yielded before iteration ends.
+        """
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        server.close()
+        handlers = list(self._handlers)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await server.wait_closed()
+        self._closed = True
+        try:
+            # wakes a consumer waiting on an empty queue
+            self._queue.put_nowait(_END)  # type: ignore[union-attr]
+        except asyncio.QueueFull:
+            pass
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iter()
+
+    async def _iter(self) -> AsyncIterator[Any]:
+        if self._queue is None:
+            raise RuntimeError("AsyncVaultAuditServer has not been started")
+        queue = self._queue
+        while not (self._closed and queue.empty()):
+            entry = await queue.get()
+            if entry is _END:
+                return
+            yield entry
+
+    async def __aenter__(self) -> "AsyncVaultAuditServer":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+__all__ = [
+    "AsyncVaultLogReader",
+    "AsyncVaultTransactionReader",
+    "AsyncVaultLogWriter",
+    "AsyncVaultAuditServer",
+]
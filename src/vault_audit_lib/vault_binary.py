@@ -0,0 +1,266 @@
+"""Length-prefixed binary record format for intermediate logs.
+
+Between pipeline stages, re-encoding events as JSON lines and parsing
+them again is pure overhead. `VaultLogWriter(path, binary=True)` (or a
+`.vbin` path) writes blocks of entries instead, and `VaultLogReader`
+recognizes such files by their header, so `VaultTransactionReader`,
+filters and projections work on them unchanged.
+
+Layout: a 12-byte header (`MAGIC`, format version, codec id, two
+reserved bytes), then blocks of `(payload length, entry count)` as two
+little-endian uint32 followed by the payload, one serialized list of up
+to `block_entries` entries. Appending to an existing binary file
+continues its block stream.
+
+Codecs:
+
+- `"marshal"` (default, standard library): fastest to write and read.
+  Marshal stores an object referenced several times in a block only
+  once, which covers dict keys shared by the JSON decoder. The format is
+  only guaranteed within one Python version, and `marshal` is not meant
+  for untrusted input: use it for intermediate files only.
+- `"msgpack"`: portable across Python versions; needs the optional
+  `msgpack` package.
+
+With `dedupe=True` every repeated string in a block (paths, mount types,
+`hmac-sha256:` tokens...) is replaced by one shared object before
+encoding, so marshal writes it once and the reader builds it once. That
+roughly halves reduced files and speeds up reading, but the pass over
+each entry costs more write time than it saves on read.
+
+`prefilter` cannot apply to binary files (there is no JSON text to scan)
+and is rejected; byte-offset features (`offsets=`, parallel `workers`,
+`read_range` bisection, following) read them serially or not at all.
+"""
+from __future__ import annotations
+
+import gc
+import gzip
+import marshal
+import struct
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+try:  # optional dependency
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None  # type: ignore[assignment]
+
+from .vault_compact_event import CompactEvent
+
+MAGIC = b"VAULTBIN"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 4
+DEFAULT_BLOCK_ENTRIES = 64
+BINARY_SUFFIXES = (".vbin", ".vbin.gz")
+
+_BLOCK = struct.Struct("<II")
+_CODEC_IDS = {"marshal": 1, "msgpack": 2}
+_CODEC_NAMES = {v: k for k, v in _CODEC_IDS.items()}
+
+
+def _stringify(obj: Any) -> Any:
+    """Replace values the codec cannot encode with `str(value)`."""
+    if isinstance(obj, dict):
+        return {str(k): _stringify(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_stringify(v) for v in obj]
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, CompactEvent):
+        return _stringify(obj.to_dict())
+    return str(obj)
+
+
+def _dedupe(obj: Any, table: Dict[str, str]) -> Any:
+    """Copy of `obj` sharing one object per distinct string in `table`."""
+    if type(obj) is dict:
+        return {
+            table.setdefault(k, k) if type(k) is str else k: _dedupe(v, table)
+            for k, v in obj.items()
+        }
+    if type(obj) is str:
+        return table.setdefault(obj, obj)
+    if type(obj) is list:
+        return [_dedupe(v, table) for v in obj]
+    return obj
+
+
+def _codec(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if name == "marshal":
+        return marshal.dumps, marshal.loads
+    if name == "msgpack":
+        if msgpack is None:
+            raise ValueError("codec 'msgpack' requires the msgpack package")
+        return (
+            msgpack.packb,
+            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+        )
+    raise ValueError(f"unknown binary codec {name!r}")
+
+
+def is_binary_path(path: str) -> bool:
+    """True for paths named like binary logs (`.vbin`, `.vbin.gz`)."""
+    return path.endswith(BINARY_SUFFIXES)
+
+
+def read_header(fh: IO[bytes]) -> Optional[str]:
+    """Consume and return the codec name of a binary header, or None.
+
+    On None (not a binary file) the position of `fh` is undefined.
+    """
+    header = fh.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[: len(MAGIC)] != MAGIC:
+        return None
+    version, codec_id = header[len(MAGIC)], header[len(MAGIC) + 1]
+    if version != FORMAT_VERSION or codec_id not in _CODEC_NAMES:
+        raise ValueError(
+            f"unsupported binary log (version {version}, codec {codec_id})"
+        )
+    return _CODEC_NAMES[codec_id]
+
+
+def _open_path(path: str, mode: str) -> IO[bytes]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)  # type: ignore[return-value]
+    return open(path, mode)
+
+
+def detect_binary(path: str) -> Optional[str]:
+    """Codec name if the file at `path` is a binary log, else None."""
+    try:
+        with _open_path(path, "rb") as fh:
+            return read_header(fh)
+    except (OSError, EOFError):
+        return None
+
+
+class BinaryRecordWriter:
+    """Block-buffering writer behind `VaultLogWriter(binary=True)`.
+
+    Parameters
+    - `fh`: binary file object positioned at the end of the stream.
+    - `codec`: `"marshal"` or `"msgpack"`.
+    - `block_entries`: entries per block.
+    - `dedupe`: share repeated strings within a block (see module doc).
+    - `write_header`: False when appending to an existing binary file.
+    - `close_file`: close `fh` in `close()`.
+    """
+
+    def __init__(
+        self,
+        fh: IO[bytes],
+        codec: str = "marshal",
+        block_entries: int = DEFAULT_BLOCK_ENTRIES,
+        dedupe: bool = False,
+        write_header: bool = True,
+        close_file: bool = True,
+    ) -> None:
+        self._fh = fh
+        self._dumps, _loads = _codec(codec)
+        self.block_entries = max(1, block_entries)
+        self.dedupe = dedupe
+        self._close_file = close_file
+        self._block: List[Any] = []
+        if write_header:
+            fh.write(MAGIC + bytes((FORMAT_VERSION, _CODEC_IDS[codec], 0, 0)))
+
+    def write(self, entry: Any) -> None:
+        self._block.append(entry)
+        if len(self._block) >= self.block_entries:
+            self._write_block()
+
+    def writelines(self, entries: Iterable[Any]) -> None:
+        block = self._block
+        size = self.block_entries
+        for entry in entries:
+            block.append(entry)
+            if len(block) >= size:
+                self._write_block()
+                block = self._block
+
+    def _write_block(self) -> None:
+        block, self._block = self._block, []
+        if not block:
+            return
+        if self.dedupe:
+            table: Dict[str, str] = {}
+            block = [_dedupe(entry, table) for entry in block]
+        try:
+            payload = self._dumps(block)
+        except (ValueError, TypeError):
+            # like the JSON writer's default=str
+            payload = self._dumps(_stringify(block))
+        self._fh.write(_BLOCK.pack(len(payload), len(block)) + payload)
+
+    def flush(self) -> None:
+        self._write_block()
+        self._fh.flush()
+
+    def close(self) -> None:
+        try:
+            self._write_block()
+        finally:
+            if self._close_file:
+                self._fh.close()
+
+
+def read_blocks(fh: IO[bytes], codec: str) -> Iterator[List[Any]]:
+    """Yield the entry lists of the blocks after a header read from `fh`.
+
+    A truncated final block (e.g. of a file still being written) ends
+    the iteration.
+    """
+    _dumps, loads = _codec(codec)
+    read = fh.read
+    while True:
+        head = read(_BLOCK.size)
+        if len(head) < _BLOCK.size:
+            return
+        length, _count = _BLOCK.unpack(head)
+        payload = read(length)
+        if len(payload) < length:
+            return
+        # a block allocates thousands of containers at once, which would
+        # trigger several collections that cannot find any garbage in it
+        if gc.isenabled():
+            gc.disable()
+            try:
+                block = loads(payload)
+            finally:
+                gc.enable()
+        else:
+            block = loads(payload)
+        yield block
+
+
+def read_binary(
+    fh: IO[bytes], codec: str, project: Optional[Callable[[Any], Any]] = None
+) -> Iterator[Any]:
+    """Yield the entries of a binary log whose header has been read."""
+    for block in read_blocks(fh, codec):
+        if project is None:
+            yield from block
+        else:
+            for entry in block:
+                yield project(entry)
+
+
+__all__ = [
+    "MAGIC",
+    "BinaryRecordWriter",
+    "detect_binary",
+    "is_binary_path",
+    "read_binary",
+    "read_blocks",
+    "read_header",
+]
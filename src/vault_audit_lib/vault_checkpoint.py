@@ -0,0 +1,186 @@
+"""Resume points for long scans that write output files.
+
+Splitting a 50 GB log takes hours. A run that dies halfway has to start
+again from byte 0, and in append mode it also duplicates everything it
+had already written. `ScanCheckpoint` lets a read -> group -> write
+pipeline record a consistent resume point every `interval` seconds:
+
+- the input byte offset just past the last line consumed (the
+  uncompressed offset for `.gz` inputs),
+- the open transactions buffered by `VaultTransactionReader`: those in
+  memory are pickled, spilled ones stay in `<checkpoint>.spill.<n>`
+  files and only their index is saved,
+- the size of every output file and any state the caller adds (e.g.
+  counts).
+
+Each output file's original size is appended to a small journal
+(`<checkpoint>.outputs`) before the file is first written. That way
+files first touched after the last checkpoint can be rolled back too.
+On restart, `restore_outputs()` truncates every output to its size at
+the checkpoint, or removes it if it did not exist yet. The reader then
+continues at the recorded offset, so the resumed run writes exactly what
+an uninterrupted run would have:
+
+    checkpoint = ScanCheckpoint("job.ckpt")
+    checkpoint.restore_outputs()
+    checkpoint.track_output("out.log")
+    writer = VaultTransactionWriter("out.log", mode="a")
+    checkpoint.add_hook(lambda state: writer.flush())
+    for request_id, events in VaultTransactionReader(
+        "audit.log", checkpoint=checkpoint
+    ):
+        writer.write_transaction(request_id, events)
+    writer.close()
+    checkpoint.clear()
+
+`split_by(..., checkpoint_path=...)` does all of this for splits.
+
+Checkpoints are pickled and replaced atomically. They cover a process
+that crashed or was killed. After an operating system crash, outputs may
+be shorter than recorded; `restore_outputs` then raises instead of
+resuming. Outputs must be plain, binary or block-gzip
+(`gzip_block_size`) files, whose flushed sizes are valid cut points. A
+gzip input resumes quickly when it has a seekable `GzipCheckpointIndex`.
+Without one, the skipped part is decompressed again, but not parsed.
+"""
+from __future__ import annotations
+
+import glob
+import json
+import os
+import pickle
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+CHECKPOINT_VERSION = 2
+JOURNAL_SUFFIX = ".outputs"
+SPILL_SUFFIX = ".spill"
+DEFAULT_INTERVAL = 30.0
+
+Hook = Callable[[Dict[str, Any]], None]
+
+
+def _size(path: str) -> int:
+    """Size of `path`, or -1 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return -1
+
+
+class ScanCheckpoint:
+    """Periodic resume point of a scan, kept in a pickle file.
+
+    Parameters
+    - `path`: checkpoint file; the output journal is `path + ".outputs"`
+       and spilled transactions go to `path + ".spill.<n>"`.
+    - `interval`: seconds between checkpoints (see `due`); 0 saves at
+       every opportunity.
+
+    `state` is the loaded checkpoint, or None when starting fresh.
+    Pipeline stages register `add_hook(fn)`. `save(state)` calls each
+    `fn(state)` so it can flush its writers and add its own part. Only
+    then are the output sizes recorded and the file replaced.
+    """
+
+    def __init__(self, path: str, interval: float = DEFAULT_INTERVAL) -> None:
+        self.path = str(path)
+        self.journal_path = self.path + JOURNAL_SUFFIX
+        self.spill_path = self.path + SPILL_SUFFIX
+        self.interval = interval
+        self.saves = 0
+        self._hooks: List[Hook] = []
+        self._last = time.monotonic()
+        # output path -> size before this run first wrote it (-1: absent)
+        self._initial: Dict[str, int] = {}
+        self.state = self._load()
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    if line.endswith("\n"):  # a torn last line was never used
+                        record = json.loads(line)
+                        self._initial.setdefault(record["path"], record["size"])
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.path, "rb") as fh:
+                state = pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        if not isinstance(state, dict) or state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"unsupported checkpoint file {self.path}")
+        return state
+
+    # -- outputs --------------------------------------------------------
+
+    def track_output(self, path: str) -> None:
+        """Record the size of `path` before this run writes to it."""
+        path = os.path.abspath(path)
+        if path in self._initial:
+            return
+        size = _size(path)
+        with open(self.journal_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"path": path, "size": size}) + "\n")
+        self._initial[path] = size
+
+    def restore_outputs(self) -> None:
+        """Cut every tracked output back to its size at the checkpoint.
+
+        Files the checkpoint does not know are restored to their size
+        before the run, and removed if they did not exist then.
+        """
+        saved = self.state["outputs"] if self.state is not None else {}
+        for path, initial in self._initial.items():
+            target = saved.get(path, initial)
+            current = _size(path)
+            if target < 0:
+                if current >= 0:
+                    os.remove(path)
+            elif current < target:
+                raise ValueError(
+                    f"{path} is shorter ({current} bytes) than at the checkpoint"
+                    f" ({target} bytes); remove {self.path} to start over"
+                )
+            elif current > target:
+                os.truncate(path, target)
+
+    # -- saving ---------------------------------------------------------
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call `hook(state)` before each save, in registration order."""
+        self._hooks.append(hook)
+
+    def due(self) -> bool:
+        """True once `interval` seconds have passed since the last save."""
+        return time.monotonic() - self._last >= self.interval
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Run the hooks, add the output sizes and replace the checkpoint."""
+        state = dict(state, version=CHECKPOINT_VERSION)
+        for hook in self._hooks:
+            hook(state)
+        state["outputs"] = {path: _size(path) for path in self._initial}
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        self._last = time.monotonic()
+        self.saves += 1
+
+    def clear(self) -> None:
+        """Remove the checkpoint, journal and spill files after the scan."""
+        spills = glob.glob(glob.escape(self.spill_path) + ".*")
+        for path in [self.path, self.journal_path, self.path + ".tmp"] + spills:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.state = None
+        self._initial = {}
+
+
+__all__ = ["ScanCheckpoint", "DEFAULT_INTERVAL"]
@@ -0,0 +1,434 @@
+"""Columnar files of projected audit fields.
+
+`VaultColumnWriter` extracts a fixed set of (dotted) fields from each
+event into typed column buffers and writes them in chunks of
+`chunk_rows` rows; `VaultColumnReader` memory-maps the file and exposes
+each chunk's columns as `memoryview`s over the mapping, so reloading a
+week of logs costs no JSON parsing and no copies:
+
+    with VaultColumnWriter("week.vcol") as out:
+        out.writelines(VaultLogReader(path, fields=out.fields))
+
+    with VaultColumnReader("week.vcol") as cols:
+        paths = cols.dictionary("path")
+        for chunk in cols.chunks():
+            counts.update(chunk.values("path"))  # int32 codes, zero-copy
+
+Column kinds:
+
+- `"time"`: epoch nanoseconds (`parse_time_ns`) as int64; missing values
+  are `MISSING_TIME_NS`.
+- `"int"` / `"float"`: int64 (missing: `MISSING_INT`) / float64 (NaN).
+  Integers outside the int64 range are stored as missing, in time
+  columns too.
+- `"str"`: dictionary-encoded; int32 codes (missing: -1) index a
+  dictionary shared by the whole file. Each chunk stores only the
+  values first seen in it, so chunks can be written as they fill up.
+  Meant for repeated values such as paths, mount types and entity ids.
+- `"text"`: plain UTF-8 with int64 offsets and a validity byte per row,
+  for mostly unique values such as request ids and tokens.
+
+Layout: an 8-byte magic, the chunk buffers (8-byte aligned), a JSON
+footer describing columns and buffer positions, the footer length
+(8 bytes, little endian) and the magic again. The footer is written by
+`close()`; a file that was not closed cannot be read. With NumPy, any
+column view can be wrapped without a copy, e.g.
+`numpy.frombuffer(chunk.values("time"), dtype="<i8")`.
+"""
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .vault_event_filter import _MISSING, _compile_getter
+from .vault_time import MISSING_TIME_NS, parse_time_ns
+
+MAGIC = b"VAULTCOL"
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_ROWS = 65_536
+MISSING_INT = -(1 << 63)
+_INT64_END = 1 << 63
+KINDS = ("time", "int", "float", "str", "text")
+
+# (column name, dotted source key, kind)
+ColumnSpec = Tuple[str, str, str]
+
+# The projection of `examples/reduce_vault_log.py`.
+DEFAULT_COLUMNS: Tuple[ColumnSpec, ...] = (
+    ("time", "time", "time"),
+    ("type", "type", "str"),
+    ("request_id", "request.id", "text"),
+    ("auth_entity_id", "auth.entity_id", "str"),
+    ("auth_client_token", "auth.client_token", "text"),
+    ("namespace", "request.namespace.path", "str"),
+    ("mount_type", "request.mount_type", "str"),
+    ("request_path", "request.path", "str"),
+)
+
+_LITTLE = sys.byteorder == "little"
+
+
+def _as_bytes(buf: array) -> bytes:
+    """Little-endian bytes of `buf`."""
+    if not _LITTLE:
+        buf = array(buf.typecode, buf)
+        buf.byteswap()
+    return buf.tobytes()
+
+
+class _Column:
+    """Write buffer of one column."""
+
+    def __init__(self, name: str, key: str, kind: str) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"column kind must be one of {KINDS}, got {kind!r}")
+        self.name = name
+        self.key = key
+        self.kind = kind
+        self.get = _compile_getter(key)
+        # "str": value -> code over the whole file; new values this chunk
+        self.codes: Dict[str, int] = {}
+        self.new_values: List[str] = []
+        self.reset()
+
+    def reset(self) -> None:
+        kind = self.kind
+        if kind in ("time", "int"):
+            self.values = array("q")
+        elif kind == "float":
+            self.values = array("d")
+        elif kind == "str":
+            self.values = array("i")
+            self.new_values = []
+        else:
+            self.values = array("q", [0])  # offsets
+            self.data = bytearray()
+            self.valid = bytearray()
+
+    def append(self, entry: Any) -> None:
+        value = self.get(entry)
+        if value is _MISSING:
+            value = None
+        kind = self.kind
+        if kind == "time":
+            ns = parse_time_ns(value) if value is not None else None
+            ok = ns is not None and MISSING_INT <= ns < _INT64_END
+            self.values.append(ns if ok else MISSING_TIME_NS)
+        elif kind == "int":
+            ok = (
+                isinstance(value, int)
+                and not isinstance(value, bool)
+                and MISSING_INT <= value < _INT64_END
+            )
+            self.values.append(value if ok else MISSING_INT)
+        elif kind == "float":
+            ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+            self.values.append(float(value) if ok else math.nan)
+        elif kind == "str":
+            if value is None:
+                self.values.append(-1)
+                return
+            if not isinstance(value, str):
+                value = str(value)
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.codes)
+                self.new_values.append(value)
+            self.values.append(code)
+        else:
+            if value is not None:
+                text = value if isinstance(value, str) else str(value)
+                self.data += text.encode("utf-8")
+            self.values.append(len(self.data))
+            self.valid.append(value is not None)
+
+    def buffers(self) -> Dict[str, bytes]:
+        out = {"values": _as_bytes(self.values)}
+        if self.kind == "str":
+            out["dict"] = json.dumps(self.new_values, ensure_ascii=False).encode()
+        elif self.kind == "text":
+            out["data"] = bytes(self.data)
+            out["valid"] = bytes(self.valid)
+        return out
+
+
+class VaultColumnWriter:
+    """Write projected event fields to a chunked columnar file.
+
+    Parameters
+    - `file`: path or binary file object positioned at its start (chunk
+       offsets are relative to the start of the file, where the reader
+       expects the magic).
+    - `columns`: `(name, dotted key, kind)` triples; default
+       `DEFAULT_COLUMNS`. For pre-flattened records use the name as key.
+    - `chunk_rows`: rows buffered per chunk.
+
+    Non-dict entries produce a row of missing values.
+    """
+
+    def __init__(
+        self,
+        file: Union[str, IO[bytes]],
+        columns: Sequence[ColumnSpec] = DEFAULT_COLUMNS,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> None:
+        names = [name for name, _key, _kind in columns]
+        if len(set(names)) != len(names):
+            raise ValueError("column names must be unique")
+        self._columns = [_Column(name, key, kind) for name, key, kind in columns]
+        self.chunk_rows = max(1, chunk_rows)
+        if isinstance(file, str):
+            self._fh: IO[bytes] = open(file, "wb")
+            self._owns = True
+        else:
+            try:
+                pos = file.tell()
+            except (AttributeError, OSError):  # pipes and other streams
+                pos = 0
+            if pos != 0:
+                raise ValueError(
+                    f"columnar output must start at offset 0, file is at {pos}"
+                )
+            self._fh = file
+            self._owns = False
+        self._fh.write(MAGIC)
+        self._pos = len(MAGIC)
+        self._rows = 0
+        self._chunks: List[Dict[str, Any]] = []
+        self._closed = False
+
+    @property
+    def fields(self) -> List[str]:
+        """Source keys, e.g. for `VaultLogReader(path, fields=...)`."""
+        return [c.key for c in self._columns]
+
+    def write(self, entry: Any) -> None:
+        for column in self._columns:
+            column.append(entry)
+        self._rows += 1
+        if self._rows >= self.chunk_rows:
+            self.flush()
+
+    def writelines(self, entries: Any) -> None:
+        columns = self._columns
+        chunk_rows = self.chunk_rows
+        for entry in entries:
+            for column in columns:
+                column.append(entry)
+            self._rows += 1
+            if self._rows >= chunk_rows:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as a chunk."""
+        if not self._rows:
+            return
+        layout: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        for column in self._columns:
+            placed = {}
+            for part, data in column.buffers().items():
+                placed[part] = (self._pos, len(data))
+                self._write_aligned(data)
+            layout[column.name] = placed
+            column.reset()
+        self._chunks.append({"rows": self._rows, "buffers": layout})
+        self._rows = 0
+
+    def _write_aligned(self, data: bytes) -> None:
+        self._fh.write(data)
+        self._pos += len(data)
+        pad = -self._pos % 8
+        if pad:
+            self._fh.write(b"\0" * pad)
+            self._pos += pad
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+            footer = json.dumps(
+                {
+                    "version": FORMAT_VERSION,
+                    "columns": [[c.name, c.key, c.kind] for c in self._columns],
+                    "chunks": self._chunks,
+                },
+                ensure_ascii=False,
+            ).encode("utf-8")
+            self._fh.write(footer + struct.pack("<Q", len(footer)) + MAGIC)
+            self._fh.flush()
+        finally:
+            if self._owns:
+                self._fh.close()
+
+    def __enter__(self) -> "VaultColumnWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ColumnChunk:
+    """The columns of one chunk, as views over the reader's mapping."""
+
+    def __init__(self, reader: "VaultColumnReader", meta: Dict[str, Any]) -> None:
+        self._reader = reader
+        self._buffers = meta["buffers"]
+        self.rows: int = meta["rows"]
+
+    def _view(self, name: str, part: str) -> memoryview:
+        try:
+            offset, length = self._buffers[name][part]
+        except KeyError:
+            raise KeyError(f"no column {name!r}") from None
+        return self._reader._view[offset : offset + length]
+
+    def values(self, name: str) -> memoryview:
+        """Zero-copy values: int64 times/ints/text offsets, float64, int32 codes."""
+        kind = self._reader.kinds[name]
+        fmt = {"time": "q", "int": "q", "float": "d", "str": "i", "text": "q"}[kind]
+        view = self._view(name, "values")
+        if not _LITTLE:  # pragma: no cover - big-endian hosts copy
+            buf = array(fmt, view.tobytes())
+            buf.byteswap()
+            return memoryview(buf)
+        return view.cast(fmt)
+
+    def column(self, name: str) -> List[Any]:
+        """Decoded values of column `name` (missing values are None)."""
+        kind = self._reader.kinds[name]
+        values = self.values(name)
+        if kind == "time":
+            return [None if v == MISSING_TIME_NS else v for v in values]
+        if kind == "int":
+            return [None if v == MISSING_INT else v for v in values]
+        if kind == "float":
+            return [None if v != v else v for v in values]
+        if kind == "str":
+            dictionary = self._reader.dictionary(name)
+            return [None if c < 0 else dictionary[c] for c in values]
+        data = self._view(name, "data")
+        valid = self._view(name, "valid")
+        out: List[Any] = []
+        for i in range(self.rows):
+            if valid[i]:
+                out.append(str(data[values[i] : values[i + 1]], "utf-8"))
+            else:
+                out.append(None)
+        return out
+
+
+class VaultColumnReader:
+    """Memory-map a file written by `VaultColumnWriter`.
+
+    `columns` lists `(name, key, kind)`; `len(reader)` is the row count.
+    Iterating yields one dict per row (decoded, slower); analyses should
+    work on `chunks()` and their `values()` views instead. Views are only
+    valid until `close()`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._fh.close()
+            raise ValueError(f"{path}: not a columnar file") from None
+        self._view = memoryview(self._mm)
+        size = len(self._mm)
+        tail = len(MAGIC) + 8
+        if (
+            size < len(MAGIC) + tail
+            or self._mm[: len(MAGIC)] != MAGIC
+            or self._mm[size - len(MAGIC) :] != MAGIC
+        ):
+            self.close()
+            raise ValueError(f"{path}: not a (complete) columnar file")
+        (footer_len,) = struct.unpack("<Q", self._mm[size - tail : size - len(MAGIC)])
+        meta = json.loads(self._mm[size - tail - footer_len : size - tail])
+        if meta.get("version") != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: unsupported version {meta.get('version')}")
+        self.columns: List[ColumnSpec] = [tuple(c) for c in meta["columns"]]
+        self.kinds: Dict[str, str] = {name: kind for name, _k, kind in self.columns}
+        self._chunks: List[Dict[str, Any]] = meta["chunks"]
+        self._dictionaries: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return sum(chunk["rows"] for chunk in self._chunks)
+
+    def chunks(self) -> Iterator[ColumnChunk]:
+        for meta in self._chunks:
+            yield ColumnChunk(self, meta)
+
+    def dictionary(self, name: str) -> List[str]:
+        """Values of `"str"` column `name`, indexed by code."""
+        values = self._dictionaries.get(name)
+        if values is None:
+            if self.kinds.get(name) != "str":
+                raise ValueError(f"column {name!r} is not dictionary-encoded")
+            values = []
+            for meta in self._chunks:
+                offset, length = meta["buffers"][name]["dict"]
+                values.extend(json.loads(self._mm[offset : offset + length]))
+            self._dictionaries[name] = values
+        return values
+
+    def column(self, name: str) -> List[Any]:
+        """All decoded values of one column."""
+        out: List[Any] = []
+        for chunk in self.chunks():
+            out.extend(chunk.column(name))
+        return out
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = [name for name, _k, _kind in self.columns]
+        for chunk in self.chunks():
+            decoded = [chunk.column(name) for name in names]
+            for row in zip(*decoded):
+                yield dict(zip(names, row))
+
+    def close(self) -> None:
+        view: Optional[memoryview] = getattr(self, "_view", None)
+        if view is not None:
+            view.release()
+            self._view = None  # type: ignore[assignment]
+        if getattr(self, "_mm", None) is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # a caller still holds a view; the mapping closes with it
+                pass
+        self._fh.close()
+
+    def __enter__(self) -> "VaultColumnReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+__all__ = [
+    "VaultColumnWriter",
+    "VaultColumnReader",
+    "ColumnChunk",
+    "DEFAULT_COLUMNS",
+    "MISSING_INT",
+]
@@ -0,0 +1,147 @@
+"""Compact events: the raw log line plus a few decoded fields.
+
+A decoded audit event is a tree of dicts and strings that takes several
+times the memory of its JSON line, and `VaultTransactionReader` holds one
+per event of every open transaction. `CompactEvent` keeps the original
+line instead, with the fields that grouping, ordering and routing look at
+stored as slot attributes:
+
+- `request_id` (`request.id`), `type`, `time_ns` (`time` as epoch
+  nanoseconds, see `vault_time`), `client_token` (`auth.client_token`),
+  `entity_id` (`auth.entity_id`), `path` (`request.path`) and `error`.
+
+Everything else is decoded from `raw` on demand (`get()`, `to_dict()`).
+
+    reader = VaultLogReader(path, compact=True)
+    with VaultTransactionWriter("out.log") as out:
+        for request_id, events in VaultTransactionReader(reader):
+            if events[0].entity_id == entity:
+                out.write_transaction(request_id, events)
+
+`VaultTransactionReader`, `VaultTransactionWriter`, filters, `split_by`
+and `TransactionAggregator` accept compact events in place of dicts, and
+`VaultLogWriter` writes `raw` verbatim, so a read-group-write pipeline
+never re-serializes an event. Compact events are immutable; to change
+one, edit `to_dict()` and write the resulting dict.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .vault_json_codec import get_codec
+from .vault_time import event_time_ns
+
+# dotted key -> attribute, for `get`
+_HOT_FIELDS: Dict[str, str] = {
+    "request.id": "request_id",
+    "type": "type",
+    "auth.client_token": "client_token",
+    "auth.entity_id": "entity_id",
+    "request.path": "path",
+    "error": "error",
+}
+
+
+def _loads(line: str) -> Any:
+    return get_codec().loads(line)
+
+
+class CompactEvent:
+    """One audit event kept as its JSON line with hot fields extracted.
+
+    Parameters
+    - `raw`: the event's JSON line (`bytes` are decoded as UTF-8; a
+       trailing newline is stripped).
+    - `entry`: the decoded line, if the caller has parsed it already;
+       otherwise `raw` is parsed once here. Must be a JSON object.
+
+    Hot attributes are None when the field is absent or null, which is
+    also how filters treat a "missing" field.
+    """
+
+    __slots__ = (
+        "raw",
+        "request_id",
+        "type",
+        "time_ns",
+        "client_token",
+        "entity_id",
+        "path",
+        "error",
+    )
+
+    def __init__(
+        self, raw: Union[str, bytes], entry: Optional[Dict[str, Any]] = None
+    ) -> None:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        raw = raw.rstrip("\r\n")
+        if entry is None:
+            entry = _loads(raw)
+        if not isinstance(entry, dict):
+            raise ValueError("CompactEvent requires a JSON object line")
+        self.raw = raw
+        request = entry.get("request")
+        if not isinstance(request, dict):
+            request = {}
+        auth = entry.get("auth")
+        if not isinstance(auth, dict):
+            auth = {}
+        self.request_id = request.get("id")
+        self.type = entry.get("type")
+        self.time_ns = event_time_ns(entry)
+        self.client_token = auth.get("client_token")
+        self.entity_id = auth.get("entity_id")
+        self.path = request.get("path")
+        self.error = entry.get("error")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode the full event (a new dict on every call)."""
+        return _loads(self.raw)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of dotted `key`, or `default` when absent.
+
+        Hot fields are answered from their attributes; other keys decode
+        `raw`.
+        """
+        attr = _HOT_FIELDS.get(key)
+        if attr is not None:
+            value = getattr(self, attr)
+            return default if value is None else value
+        cur: Any = self.to_dict()
+        for part in key.split("."):
+            if not isinstance(cur, dict) or part not in cur:
+                return default
+            cur = cur[part]
+        return cur
+
+    def event_time_ns(self, time_key: str = "time") -> Optional[int]:
+        """Parsed `time_key`; see `vault_time.event_time_ns`."""
+        if time_key == "time":
+            return self.time_ns
+        return event_time_ns(self.to_dict(), time_key)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CompactEvent):
+            return self.raw == other.raw
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.raw)
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactEvent(request_id={self.request_id!r}, type={self.type!r}, "
+            f"time_ns={self.time_ns!r})"
+        )
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+__all__ = ["CompactEvent"]
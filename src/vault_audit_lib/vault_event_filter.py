@@ -4,11 +4,187 @@ Provides `VaultEventFilter` which tests whether a log entry matches a
 specified key/value condition. Keys support dotted lookup (e.g.
 `request.id`). The filter accepts a literal value, a callable, or a
 compiled regex as the match criterion.
+
+Filters are compiled once, at construction, into a single matcher
+closure: the dotted key is split up front and the value kind is
+dispatched once instead of on every event. Filters compose with `&`,
+`|` and `~` (or `all_of`/`any_of`/`not_`) into one short-circuiting
+matcher, and `field(key)` builds the common predicates:
+
+    flt = field("type").eq("response") & field("error").missing()
+    flt = field("response.status").ge(400) | field("request.path").isin(paths)
 """
 from __future__ import annotations
 
+import operator
 import re
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Optional, Union
+
+Matcher = Callable[[Any], bool]
+
+# Returned by compiled getters when the dotted key is absent.
+_MISSING = object()
+
+
+def _get_other(entry: Any, key: str) -> Any:
+    """Dotted lookup on a non-dict event that provides it (`CompactEvent`)."""
+    get = getattr(entry, "get", None)
+    if get is None:
+        return _MISSING
+    return get(key, _MISSING)
+
+
+def _compile_getter(key: str) -> Callable[[Any], Any]:
+    """Return a function looking up dotted `key`, or `_MISSING` if absent."""
+    parts = tuple(key.split("."))
+    if len(parts) == 1:
+        (k0,) = parts
+
+        def get1(entry: Any) -> Any:
+            if not isinstance(entry, dict):
+                return _get_other(entry, key)
+            return entry.get(k0, _MISSING)
+
+        return get1
+
+    if len(parts) == 2:
+        k0, k1 = parts
+
+        def get2(entry: Any) -> Any:
+            if not isinstance(entry, dict):
+                return _get_other(entry, key)
+            cur = entry.get(k0)
+            if not isinstance(cur, dict):
+                return _MISSING
+            return cur.get(k1, _MISSING)
+
+        return get2
+
+    def get_n(entry: Any) -> Any:
+        if not isinstance(entry, dict):
+            return _get_other(entry, key)
+        cur = entry
+        for part in parts:
+            if not isinstance(cur, dict):
+                return _MISSING
+            cur = cur.get(part, _MISSING)
+            if cur is _MISSING:
+                return _MISSING
+        return cur
+
+    return get_n
+
+
+def _compile_value_matcher(key: str, value: Any) -> Matcher:
+    """Compile the `VaultEventFilter(key, value)` semantics into one closure.
+
+    A missing key is presented to the criterion as None, as before.
+    """
+    get = _compile_getter(key)
+    missing = _MISSING
+
+    # Callable matcher
+    if callable(value):
+
+        def match_callable(entry: Any) -> bool:
+            found = get(entry)
+            try:
+                return bool(value(None if found is missing else found))
+            except Exception:
+                return False
+
+        return match_callable
+
+    # Regex matcher
+    if isinstance(value, re.Pattern):
+        search = value.search
+
+        def match_regex(entry: Any) -> bool:
+            found = get(entry)
+            if found is missing or found is None:
+                return False
+            return search(str(found)) is not None
+
+        return match_regex
+
+    # Default equality
+    if value is None:
+
+        def match_none(entry: Any) -> bool:
+            found = get(entry)
+            return found is missing or found is None
+
+        return match_none
+
+    def match_eq(entry: Any) -> bool:
+        return get(entry) == value
+
+    return match_eq
+
+
+_COMPARISONS = {
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+}
+
+
+def _compile_compare(key: str, op: str, bound: Any) -> Matcher:
+    get = _compile_getter(key)
+    compare = _COMPARISONS[op]
+    missing = _MISSING
+
+    def match_compare(entry: Any) -> bool:
+        found = get(entry)
+        if found is missing or found is None:
+            return False
+        try:
+            return compare(found, bound)
+        except TypeError:
+            return False
+
+    return match_compare
+
+
+def _all(matchers: tuple) -> Matcher:
+    if len(matchers) == 1:
+        return matchers[0]
+    if len(matchers) == 2:
+        a, b = matchers
+
+        def match_and2(entry: Any) -> bool:
+            return a(entry) and b(entry)
+
+        return match_and2
+
+    def match_and(entry: Any) -> bool:
+        for m in matchers:
+            if not m(entry):
+                return False
+        return True
+
+    return match_and
+
+
+def _any(matchers: tuple) -> Matcher:
+    if len(matchers) == 1:
+        return matchers[0]
+    if len(matchers) == 2:
+        a, b = matchers
+
+        def match_or2(entry: Any) -> bool:
+            return a(entry) or b(entry)
+
+        return match_or2
+
+    def match_or(entry: Any) -> bool:
+        for m in matchers:
+            if m(entry):
+                return True
+        return False
+
+    return match_or
 
 
 class VaultEventFilter:
@@ -20,44 +196,44 @@ class VaultEventFilter:
        extracted value and should return truthy/falsey. If a `re.Pattern`,
        the pattern will be searched against the stringified value. Otherwise
        simple equality is used.
+
+    Filters can be combined with `&` (and), `|` (or) and `~` (not); the
+    result is a new `VaultEventFilter` with a single compiled matcher.
     """
 
     def __init__(self, key: str, value: Any):
-        self.key = key
+        self.key: Optional[str] = key
         self.value = value
+        self.description = f"{key} == {value!r}"
+        self._match_single: Matcher = _compile_value_matcher(key, value)
 
-    def _lookup(self, entry: Any) -> Optional[Any]:
-        """Lookup dotted key in `entry` if it's a dict, else return None."""
-        if not isinstance(entry, dict):
-            return None
-        cur: Any = entry
-        for part in self.key.split("."):
-            if not isinstance(cur, dict):
-                return None
-            cur = cur.get(part)
-        return cur
+    @classmethod
+    def from_matcher(
+        cls, matcher: Matcher, description: str = "<matcher>"
+    ) -> "VaultEventFilter":
+        """Wrap an `entry -> bool` function as a filter.
 
-    def _match_single(self, entry: Any) -> bool:
-        """Match a single event entry (not a transaction)."""
-        found = self._lookup(entry)
-        # Callable matcher
-        if callable(self.value):
-            try:
-                return bool(self.value(found))
-            except Exception:
-                return False
+        Unlike a callable `value`, `matcher` receives the whole event and
+        exceptions it raises are not swallowed.
+        """
+        flt = cls.__new__(cls)
+        flt.key = None
+        flt.value = None
+        flt.description = description
+        flt._match_single = matcher
+        return flt
 
-        # Regex matcher
-        if isinstance(self.value, re.Pattern):
-            if found is None:
-                return False
-            try:
-                return self.value.search(str(found)) is not None
-            except Exception:
-                return False
+    def __repr__(self) -> str:
+        return f"VaultEventFilter({self.description})"
+
+    def __and__(self, other: "VaultEventFilter") -> "VaultEventFilter":
+        return all_of(self, other)
+
+    def __or__(self, other: "VaultEventFilter") -> "VaultEventFilter":
+        return any_of(self, other)
 
-        # Default equality
-        return found == self.value
+    def __invert__(self) -> "VaultEventFilter":
+        return not_(self)
 
     def match(self, entry: Any) -> bool:
         """Return True if `entry` matches the configured key/value.
@@ -66,6 +242,7 @@ class VaultEventFilter:
         in that case the method returns True if any event in the transaction
         matches the configured criterion.
         """
+        match_single = self._match_single
         # Detect transaction-like inputs and return True if any contained
         # event matches. Supported forms:
         # - (request_id, entries_iterable)
@@ -85,14 +262,122 @@ class VaultEventFilter:
 
             # If entries_iter is a string/bytes, treat as single entry
             if isinstance(entries_iter, (str, bytes)):
-                return self._match_single(entries_iter)
+                return match_single(entries_iter)
 
             for ev in entries_iter:
-                if self._match_single(ev):
+                if match_single(ev):
                     return True
             return False
 
-        return self._match_single(entry)
+        return match_single(entry)
+
+
+def all_of(*filters: VaultEventFilter) -> VaultEventFilter:
+    """Filter matching when every filter matches (short-circuits)."""
+    matchers = []
+    for f in filters:
+        inner = getattr(f._match_single, "_all_of", None)
+        matchers.extend(inner if inner is not None else (f._match_single,))
+    matcher = _all(tuple(matchers))
+    if len(matchers) > 1:
+        matcher._all_of = tuple(matchers)  # type: ignore[attr-defined]
+    desc = " & ".join(f"({f.description})" for f in filters)
+    return VaultEventFilter.from_matcher(matcher, desc)
+
+
+def any_of(*filters: VaultEventFilter) -> VaultEventFilter:
+    """Filter matching when at least one filter matches (short-circuits)."""
+    matchers = []
+    for f in filters:
+        inner = getattr(f._match_single, "_any_of", None)
+        matchers.extend(inner if inner is not None else (f._match_single,))
+    matcher = _any(tuple(matchers))
+    if len(matchers) > 1:
+        matcher._any_of = tuple(matchers)  # type: ignore[attr-defined]
+    desc = " | ".join(f"({f.description})" for f in filters)
+    return VaultEventFilter.from_matcher(matcher, desc)
+
+
+def not_(flt: VaultEventFilter) -> VaultEventFilter:
+    """Filter matching when `flt` does not match."""
+    inner = flt._match_single
+
+    def match_not(entry: Any) -> bool:
+        return not inner(entry)
+
+    return VaultEventFilter.from_matcher(match_not, f"~({flt.description})")
+
+
+class FieldPredicate:
+    """Predicate builder for one dotted key; see `field`.
+
+    Every method returns a compiled `VaultEventFilter`. A key is "missing"
+    when it is absent or null, matching how `VaultEventFilter(key, None)`
+    behaves; comparisons never match a missing value nor a value of an
+    incomparable type.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def _make(self, matcher: Matcher, desc: str) -> VaultEventFilter:
+        return VaultEventFilter.from_matcher(matcher, f"{self.key} {desc}")
+
+    def eq(self, value: Any) -> VaultEventFilter:
+        return VaultEventFilter(self.key, value)
+
+    def ne(self, value: Any) -> VaultEventFilter:
+        return ~self.eq(value)
+
+    def isin(self, values: Iterable[Any]) -> VaultEventFilter:
+        get = _compile_getter(self.key)
+        allowed = frozenset(values)
+
+        def match_in(entry: Any) -> bool:
+            try:
+                return get(entry) in allowed
+            except TypeError:  # unhashable value
+                return False
+
+        return self._make(match_in, f"in {sorted(map(repr, allowed))}")
+
+    def lt(self, bound: Any) -> VaultEventFilter:
+        return self._make(_compile_compare(self.key, "lt", bound), f"< {bound!r}")
+
+    def le(self, bound: Any) -> VaultEventFilter:
+        return self._make(_compile_compare(self.key, "le", bound), f"<= {bound!r}")
+
+    def gt(self, bound: Any) -> VaultEventFilter:
+        return self._make(_compile_compare(self.key, "gt", bound), f"> {bound!r}")
+
+    def ge(self, bound: Any) -> VaultEventFilter:
+        return self._make(_compile_compare(self.key, "ge", bound), f">= {bound!r}")
+
+    def exists(self) -> VaultEventFilter:
+        return ~self.missing()
+
+    def missing(self) -> VaultEventFilter:
+        return VaultEventFilter(self.key, None)
+
+    def matches(self, pattern: Union[str, "re.Pattern[str]"]) -> VaultEventFilter:
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        return VaultEventFilter(self.key, pattern)
+
+    def test(self, func: Callable[[Any], Any]) -> VaultEventFilter:
+        return VaultEventFilter(self.key, func)
+
+
+def field(key: str) -> FieldPredicate:
+    """Start a predicate on dotted `key`, e.g. `field("type").eq("response")`."""
+    return FieldPredicate(key)
 
 
-__all__ = ["VaultEventFilter"]
+__all__ = [
+    "VaultEventFilter",
+    "FieldPredicate",
+    "field",
+    "all_of",
+    "any_of",
+    "not_",
+]
@@ -0,0 +1,161 @@
+"""Field projection for Vault audit log lines.
+
+Provides `VaultFieldProjection`, which turns a raw log line into a dict
+containing only a chosen set of dotted fields (e.g. `request.id`,
+`auth.entity_id`). The nested shape is preserved, so a projected entry
+still works with `VaultEventFilter` and `VaultTransactionReader`:
+
+    {"type": "response", "request": {"id": "..."}, "auth": {"entity_id": "..."}}
+
+When `ijson` is installed with a compiled backend, lines are parsed
+incrementally and parsing stops as soon as every requested field has
+been seen, so large `request.data`/`response.data` blobs that follow are
+never materialized. Without it, the line is decoded with `json` and then
+trimmed, which keeps downstream memory small but not the per-line CPU.
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:  # optional dependency
+    import ijson
+except ImportError:  # pragma: no cover - depends on environment
+    ijson = None  # type: ignore[assignment]
+
+# The pure-python ijson backend is much slower than `json.loads`; only
+# stream-parse when a compiled backend is available.
+_FAST_IJSON_BACKENDS = ("yajl2_c", "yajl2_cffi")
+_BUILD_EVENTS = ("start_map", "start_array")
+
+
+def _use_ijson() -> bool:
+    return ijson is not None and getattr(ijson, "backend", "") in _FAST_IJSON_BACKENDS
+
+
+def _normalize_fields(fields: Iterable[str]) -> List[str]:
+    """Deduplicate fields and drop those covered by a requested ancestor."""
+    unique = sorted(set(fields))
+    kept: List[str] = []
+    for f in unique:
+        if any(f.startswith(k + ".") for k in kept):
+            continue
+        kept.append(f)
+    return kept
+
+
+def _assign(out: Dict[str, Any], parts: Tuple[str, ...], value: Any) -> None:
+    cur = out
+    for part in parts[:-1]:
+        cur = cur.setdefault(part, {})
+    cur[parts[-1]] = value
+
+
+class VaultFieldProjection:
+    """Project log lines or decoded entries onto a list of dotted fields.
+
+    Parameters
+    - `fields`: dotted key paths to keep (e.g. `["time", "request.id"]`).
+       Missing fields are simply absent from the projected dict.
+    - `streaming`: force (`True`) or disable (`False`) incremental parsing
+       with `ijson`; by default it is used when a compiled backend exists.
+    - `loads`: function decoding a whole line when not streaming (default
+       `json.loads`).
+
+    Lines that are not JSON objects are returned unchanged: non-JSON lines
+    as the raw string and other JSON values (lists, numbers) fully decoded,
+    matching `VaultLogReader`. With streaming enabled, a line whose prefix
+    holds every requested field is projected even if its tail is malformed.
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str],
+        streaming: Optional[bool] = None,
+        loads: Optional[Callable[[Union[str, bytes]], Any]] = None,
+    ):
+        self.fields = _normalize_fields(fields)
+        self._paths = [tuple(f.split(".")) for f in self.fields]
+        self._targets = {f: p for f, p in zip(self.fields, self._paths)}
+        if streaming is None:
+            streaming = _use_ijson()
+        elif streaming and ijson is None:
+            raise ImportError("streaming projection requires the 'ijson' package")
+        self.streaming = bool(streaming)
+        self.loads = loads if loads is not None else json.loads
+
+    def project(self, entry: Any) -> Any:
+        """Project an already-decoded entry; non-dicts are returned as-is."""
+        if not isinstance(entry, dict):
+            return entry
+        out: Dict[str, Any] = {}
+        for parts in self._paths:
+            cur: Any = entry
+            for part in parts:
+                if not isinstance(cur, dict) or part not in cur:
+                    break
+                cur = cur[part]
+            else:
+                _assign(out, parts, cur)
+        return out
+
+    def __call__(self, line: Union[str, bytes]) -> Any:
+        """Decode and project one stripped, non-empty log line (str or bytes)."""
+        if self.streaming:
+            data = line if isinstance(line, bytes) else line.encode("utf-8")
+            try:
+                return self._stream_project(data)
+            except Exception:
+                pass
+        try:
+            return self.project(self.loads(line))
+        except Exception:
+            if isinstance(line, bytes):
+                return line.decode("utf-8").strip()
+            return line
+
+    def _stream_project(self, data: bytes) -> Any:
+        """Incrementally parse `data`, stopping once every field is found."""
+        out: Dict[str, Any] = {}
+        remaining = len(self._targets)
+        events = ijson.parse(io.BytesIO(data), use_float=True)
+        first = next(events)
+        if first[1] != "start_map":
+            # Not an object: decode fully so the result matches json.loads.
+            return json.loads(data)
+
+        builder = None
+        depth = 0
+        building: Tuple[str, ...] = ()
+        for prefix, event, value in events:
+            if builder is not None:
+                builder.event(event, value)
+                if event in _BUILD_EVENTS:
+                    depth += 1
+                elif event in ("end_map", "end_array"):
+                    depth -= 1
+                    if depth == 0:
+                        _assign(out, building, builder.value)
+                        builder = None
+                        remaining -= 1
+                        if not remaining:
+                            break
+                continue
+            parts = self._targets.get(prefix)
+            if parts is None or event == "map_key":
+                continue
+            if event in _BUILD_EVENTS:
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                depth = 1
+                building = parts
+                continue
+            _assign(out, parts, value)
+            remaining -= 1
+            if not remaining:
+                break
+        return out
+
+
+__all__ = ["VaultFieldProjection"]
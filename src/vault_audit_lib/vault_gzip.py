@@ -0,0 +1,451 @@
+"""Random access into gzip-compressed audit logs.
+
+Two pieces live here:
+
+- `GzipCheckpointIndex` records decompression checkpoints for a `.gz`
+  file in a JSON sidecar (`<log>.gzi`). Each checkpoint sits on a gzip
+  member boundary, where decompression can restart without any earlier
+  data, and remembers whether a line starts there. With it, readers can
+  seek to an uncompressed offset by decompressing at most one checkpoint
+  interval, and several ranges can be decompressed in parallel. A file
+  made of a single member has no interior boundaries; if the optional
+  `indexed_gzip` package is installed its zran-style index (stored as
+  `<log>.gzi.zran`) is used for those instead. Without it such an index
+  is not `seekable` and `ensure()` warns, since every read then
+  decompresses from the start (see `requirements-optional.txt`).
+
+- `BlockGzipWriter` writes text as a series of independent gzip members
+  of bounded size, cut at line boundaries (similar to BGZF). The result
+  is a valid multi-member gzip file that `gunzip`/`zcat` read normally.
+  Each member carries its total length in a `VL` extra subfield, so the
+  checkpoint index is built by hopping from header to header without
+  decompressing anything.
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import struct
+import warnings
+import zlib
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+try:  # optional dependency
+    import indexed_gzip
+except ImportError:  # pragma: no cover - depends on environment
+    indexed_gzip = None  # type: ignore[assignment]
+
+INDEX_VERSION = 1
+DEFAULT_SPACING = 4 * 1024 * 1024
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_FEXTRA = 0x04
+_SUBFIELD = b"VL"
+_SUBFIELD_LEN = 5  # uint32 member size + flags byte
+_FLAG_LINE_START = 0x01
+_READ_SIZE = 1024 * 1024
+
+# (compressed offset, uncompressed offset, a line starts at this offset)
+Checkpoint = Tuple[int, int, bool]
+
+
+def _member_header(total_size: int, flags: int) -> bytes:
+    extra = _SUBFIELD + struct.pack("<HIB", _SUBFIELD_LEN, total_size, flags)
+    return (
+        _GZIP_MAGIC
+        + bytes([8, _FEXTRA])  # deflate, FEXTRA
+        + b"\x00\x00\x00\x00"  # mtime
+        + b"\x00\xff"  # xfl, os=unknown
+        + struct.pack("<H", len(extra))
+        + extra
+    )
+
+
+_HEADER_SIZE = len(_member_header(0, 0))
+
+
+def compress_member(
+    data: bytes, compresslevel: int = 9, line_start: bool = True
+) -> bytes:
+    """Return `data` as one self-contained gzip member with a `VL` subfield.
+
+    `line_start` records whether `data` begins at the start of a line.
+    """
+    comp = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = comp.compress(data) + comp.flush()
+    crc = zlib.crc32(data) & 0xFFFFFFFF
+    trailer = struct.pack("<II", crc, len(data) & 0xFFFFFFFF)
+    total = _HEADER_SIZE + len(body) + len(trailer)
+    flags = _FLAG_LINE_START if line_start else 0
+    return _member_header(total, flags) + body + trailer
+
+
+def _vl_subfield(header: bytes) -> Optional[Tuple[int, int]]:
+    """Return `(member_size, flags)` from a `VL` subfield, if present."""
+    if len(header) < 12 or header[:2] != _GZIP_MAGIC or not header[3] & _FEXTRA:
+        return None
+    (xlen,) = struct.unpack("<H", header[10:12])
+    extra = header[12 : 12 + xlen]
+    pos = 0
+    while pos + 4 <= len(extra):
+        sub_id = extra[pos : pos + 2]
+        (sub_len,) = struct.unpack("<H", extra[pos + 2 : pos + 4])
+        if sub_id == _SUBFIELD and sub_len == _SUBFIELD_LEN:
+            size, flags = struct.unpack("<IB", extra[pos + 4 : pos + 9])
+            return size, flags
+        pos += 4 + sub_len
+    return None
+
+
+def _member_last_byte(fh: IO[bytes], c_off: int) -> bytes:
+    """Decompress the member at `c_off` and return its last byte."""
+    fh.seek(c_off)
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    last = b""
+    while not d.eof:
+        chunk = fh.read(_READ_SIZE)
+        if not chunk:
+            break
+        out = d.decompress(chunk)
+        if out:
+            last = out[-1:]
+    return last
+
+
+def _scan_members(path: str) -> Tuple[List[Checkpoint], int]:
+    """Return every member boundary of `path` and the uncompressed size."""
+    boundaries: List[Checkpoint] = []
+    size = os.path.getsize(path)
+    c_off = u_off = 0
+    prev_c_off = 0
+    # last decompressed byte of the previous member, when known
+    last_byte: Optional[bytes] = b"\n"
+    with open(path, "rb") as fh:
+        while c_off < size:
+            fh.seek(c_off)
+            vl = _vl_subfield(fh.read(64))
+            if vl is not None and vl[1] & _FLAG_LINE_START:
+                last_byte = b"\n"
+            elif last_byte is None:
+                last_byte = _member_last_byte(fh, prev_c_off)
+            boundaries.append((c_off, u_off, u_off == 0 or last_byte == b"\n"))
+            prev_c_off = c_off
+            if vl is not None:
+                fh.seek(c_off + vl[0] - 4)
+                (isize,) = struct.unpack("<I", fh.read(4))
+                c_off += vl[0]
+                u_off += isize
+                last_byte = None
+                continue
+            # Foreign member: decompress to find where it ends.
+            fh.seek(c_off)
+            d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            consumed = 0
+            while not d.eof:
+                chunk = fh.read(_READ_SIZE)
+                if not chunk:
+                    raise EOFError(f"truncated gzip member at offset {c_off}")
+                out = d.decompress(chunk)
+                if out:
+                    last_byte = out[-1:]
+                u_off += len(out)
+                consumed += len(chunk)
+            c_off += consumed - len(d.unused_data)
+            # skip zero padding some writers append between members
+            fh.seek(c_off)
+            pad = fh.read(_READ_SIZE)
+            c_off += len(pad) - len(pad.lstrip(b"\x00"))
+    return boundaries, u_off
+
+
+def _signature(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class GzipCheckpointIndex:
+    """Decompression checkpoints for a gzip file, persisted as a sidecar.
+
+    Parameters
+    - `path`: the `.gz` log file.
+    - `index_path`: sidecar location; defaults to `path + ".gzi"`.
+    - `spacing`: minimum uncompressed distance between kept checkpoints.
+
+    Usage:
+        idx = GzipCheckpointIndex(path).ensure()
+        with idx.open() as fh:
+            fh.seek(offset)
+            line = fh.readline()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        index_path: Optional[str] = None,
+        spacing: int = DEFAULT_SPACING,
+    ) -> None:
+        self.path = str(path)
+        self.index_path = index_path or self.path + ".gzi"
+        self.spacing = spacing
+        self.kind = "members"
+        self.checkpoints: List[Checkpoint] = []
+        self.uncompressed_size = 0
+
+    @property
+    def zran_path(self) -> str:
+        return self.index_path + ".zran"
+
+    def build(self) -> "GzipCheckpointIndex":
+        """Scan the gzip file and write the sidecar."""
+        boundaries, total = _scan_members(self.path)
+        kept: List[Checkpoint] = []
+        for cp in boundaries:
+            if not kept or cp[1] - kept[-1][1] >= self.spacing:
+                kept.append(cp)
+        self.kind = "members"
+        self.checkpoints = kept
+        self.uncompressed_size = total
+        if len(kept) == 1 and total > self.spacing and indexed_gzip is not None:
+            igz = indexed_gzip.IndexedGzipFile(self.path, spacing=self.spacing)
+            try:
+                igz.build_full_index()
+                igz.export_index(self.zran_path)
+            finally:
+                igz.close()
+            self.kind = "zran"
+        data: Dict[str, Any] = dict(
+            _signature(self.path),
+            version=INDEX_VERSION,
+            kind=self.kind,
+            uncompressed_size=total,
+            checkpoints=kept,
+        )
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, self.index_path)
+        return self
+
+    def load(self) -> bool:
+        """Load the sidecar; return False if it is missing or stale."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        current = _signature(self.path)
+        if data.get("version") != INDEX_VERSION or any(
+            data.get(k) != v for k, v in current.items()
+        ):
+            return False
+        if data.get("kind") == "zran" and (
+            indexed_gzip is None or not os.path.exists(self.zran_path)
+        ):
+            return False
+        self.kind = data["kind"]
+        self.checkpoints = [(c, u, bool(a)) for c, u, a in data["checkpoints"]]
+        self.uncompressed_size = data["uncompressed_size"]
+        return True
+
+    def ensure(self) -> "GzipCheckpointIndex":
+        """Load the sidecar, building it first if missing or stale.
+
+        Warns when the file is larger than `spacing` but the index has no
+        access point past its start (a single gzip member without
+        `indexed_gzip`).
+        """
+        if not self.load():
+            self.build()
+        if not self.seekable and self.uncompressed_size > self.spacing:
+            hint = (
+                "install indexed_gzip"
+                if indexed_gzip is None
+                else "rewrite it with gzip_block_size"
+            )
+            warnings.warn(
+                f"{self.path} has no gzip access points past its start; seeks"
+                f" and parallel reads decompress from byte 0 ({hint})",
+                stacklevel=2,
+            )
+        return self
+
+    @property
+    def seekable(self) -> bool:
+        """True when the index allows starting away from offset 0.
+
+        False for single-member files indexed without `indexed_gzip`;
+        readers then fall back to decompressing from the start.
+        """
+        return self.kind == "zran" or len(self.checkpoints) > 1
+
+    def open(self) -> IO[bytes]:
+        """Return a binary reader over the uncompressed stream with fast seeks."""
+        if self.kind == "zran":
+            return indexed_gzip.IndexedGzipFile(  # type: ignore[no-any-return]
+                self.path, index_file=self.zran_path
+            )
+        return _CheckpointedGzipReader(  # type: ignore[return-value]
+            self.path, self.checkpoints, self.spacing
+        )
+
+
+class _CheckpointedGzipReader(io.RawIOBase):
+    """Seekable view of a multi-member gzip file using member checkpoints."""
+
+    def __init__(self, path: str, checkpoints: List[Checkpoint], spacing: int):
+        super().__init__()
+        self._raw = open(path, "rb")
+        self._checkpoints = checkpoints or [(0, 0, True)]
+        self._u_offsets = [cp[1] for cp in self._checkpoints]
+        self._spacing = spacing
+        self._gz: Optional[gzip.GzipFile] = None
+        self._pos = 0
+        self._restart(0)
+
+    def _restart(self, index: int) -> None:
+        c_off, u_off, _ = self._checkpoints[index]
+        self._raw.seek(c_off)
+        self._gz = gzip.GzipFile(fileobj=self._raw, mode="rb")
+        self._pos = u_off
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("only SEEK_SET and SEEK_CUR are supported")
+        if offset < self._pos or offset - self._pos > self._spacing:
+            # bisect for the last checkpoint at or before `offset`
+            lo, hi = 0, len(self._u_offsets)
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if self._u_offsets[mid] <= offset:
+                    lo = mid
+                else:
+                    hi = mid
+            if offset < self._pos or self._u_offsets[lo] > self._pos:
+                self._restart(lo)
+        while self._pos < offset:
+            if not self.read(min(offset - self._pos, _READ_SIZE)):
+                break
+        return self._pos
+
+    def readinto(self, buffer: Any) -> int:
+        assert self._gz is not None
+        n = self._gz.readinto(buffer)
+        self._pos += n
+        return n
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        assert self._gz is not None
+        line = self._gz.readline(-1 if size is None else size)
+        self._pos += len(line)
+        return line
+
+    def close(self) -> None:
+        if not self.closed:
+            try:
+                if self._gz is not None:
+                    self._gz.close()
+            finally:
+                self._raw.close()
+        super().close()
+
+
+def open_seekable(path: str) -> IO[bytes]:
+    """Open `path` for binary reading with efficient absolute seeks.
+
+    Plain files are opened directly. Gzip files use their checkpoint
+    sidecar when one is current, and fall back to `gzip.open` (whose
+    seeks decompress from the start) otherwise.
+    """
+    if not path.endswith(".gz"):
+        return open(path, "rb")
+    idx = GzipCheckpointIndex(path)
+    if idx.load():
+        return idx.open()
+    return gzip.open(path, "rb")  # type: ignore[return-value]
+
+
+class BlockGzipWriter:
+    """Text writer producing a multi-member gzip file of line-aligned blocks.
+
+    Parameters
+    - `path`: output file path.
+    - `mode`: `"w"` to truncate or `"a"` to append members.
+    - `block_size`: uncompressed bytes buffered before a member is cut at
+       the last complete line.
+    - `compresslevel`: zlib level used for each member.
+
+    `flush()` closes the current member, so everything written so far is
+    durable and readable by standard gzip tools.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "a",
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        compresslevel: int = 9,
+    ) -> None:
+        self._raw = open(path, mode.replace("t", "").rstrip("b") + "b")
+        self.block_size = max(1, block_size)
+        self.compresslevel = compresslevel
+        self._buf = bytearray()
+        # appending to a non-empty file: whether a line is open is left for
+        # the index builder to find out
+        self._line_start = self._raw.tell() == 0
+
+    def _write_member(self, data: bytes) -> None:
+        self._raw.write(compress_member(data, self.compresslevel, self._line_start))
+        self._line_start = data.endswith(b"\n")
+
+    def write(self, text: str) -> int:
+        self._buf += text.encode("utf-8")
+        while len(self._buf) >= self.block_size:
+            cut = self._buf.rfind(b"\n", 0, self.block_size) + 1
+            if not cut:
+                # a single line longer than a block becomes its own member
+                cut = self._buf.find(b"\n", self.block_size) + 1
+                if not cut:
+                    break
+            self._write_member(bytes(self._buf[:cut]))
+            del self._buf[:cut]
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buf:
+            self._write_member(bytes(self._buf))
+            self._buf.clear()
+        self._raw.flush()
+
+    def close(self) -> None:
+        if self._raw.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._raw.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._raw.closed
+
+
+__all__ = [
+    "GzipCheckpointIndex",
+    "BlockGzipWriter",
+    "compress_member",
+    "open_seekable",
+]
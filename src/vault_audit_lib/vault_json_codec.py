@@ -0,0 +1,153 @@
+"""Pluggable JSON codec used by the readers and writers.
+
+`get_codec()` returns a `JSONCodec` whose `loads` uses the fastest
+installed backend, tried in order:
+
+- `orjson`
+- `msgspec`
+- `ujson`
+- the standard library `json` module
+
+Third-party decoders are wrapped so that any line they reject (e.g. `NaN`,
+lone surrogates) is retried with `json.loads`, and lines containing a run
+of 19 or more digits go straight to `json.loads`, because some backends
+turn integers wider than 64 bits into floats instead of failing (the check
+is a `bytes.translate` plus substring search, a small fraction of the
+decode). A line
+therefore decodes to the same value whichever backend is active.
+
+`dumps` is always the standard library encoder configured like
+`json.dumps(entry, default=str)`, so files written by this package stay
+byte-for-byte identical regardless of the installed packages: none of
+the fast encoders can reproduce the `", "`/`": "` separators and ASCII
+escaping. The encoder instance is built once instead of per call, which
+is where `json.dumps` with keyword arguments spends a good part of its
+time on small entries.
+
+    codec = get_codec()          # best available
+    codec = get_codec("json")    # force the standard library
+    entry = codec.loads(line)    # str or bytes
+    line = codec.dumps(entry)
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+
+AUTO = "auto"
+STDLIB = "json"
+# Preference order for `get_codec()` / `get_codec("auto")`.
+BACKENDS = ("orjson", "msgspec", "ujson", STDLIB)
+
+Loads = Callable[[Union[str, bytes]], Any]
+Dumps = Callable[[Any], str]
+
+_stdlib_loads = json.loads
+# A run of this many digits may be an integer outside the 64-bit range (or
+# merely a digit run inside a string, which just costs a stdlib decode).
+_WIDE_DIGITS = 19
+_DIGIT_MASK = bytes(ord("0") if 0x30 <= i <= 0x39 else ord(" ") for i in range(256))
+_WIDE_RUN = b"0" * _WIDE_DIGITS
+# Equivalent to `json.dumps(obj, default=str)`, without rebuilding the
+# encoder on every call.
+_stdlib_dumps: Dumps = json.JSONEncoder(default=str).encode
+
+
+class JSONCodec:
+    """A named pair of `loads`/`dumps` functions for single log lines.
+
+    Parameters
+    - `name`: backend name, reported in benchmarks and `repr`.
+    - `loads`: callable decoding a `str` or `bytes` line.
+    - `dumps`: callable returning the JSON text of an entry (no newline);
+       defaults to the stable standard library encoder.
+
+    Codecs returned by `get_codec` pickle by name, so they can be handed
+    to worker processes; custom codecs must be picklable themselves to be
+    used with `VaultLogReader(workers=...)`.
+    """
+
+    def __init__(self, name: str, loads: Loads, dumps: Optional[Dumps] = None):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps if dumps is not None else _stdlib_dumps
+
+    def __repr__(self) -> str:
+        return f"JSONCodec({self.name!r})"
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        if _codecs.get(self.name) is self:
+            return get_codec, (self.name,)
+        return super().__reduce_ex__(protocol)
+
+
+def _with_fallback(fast_loads: Loads) -> Loads:
+    mask, run = _DIGIT_MASK, _WIDE_RUN
+
+    def loads(line: Union[str, bytes]) -> Any:
+        try:
+            data = line if isinstance(line, bytes) else line.encode("utf-8")
+            if run not in data.translate(mask):
+                return fast_loads(data)
+        except Exception:
+            pass
+        return _stdlib_loads(line)
+
+    return loads
+
+
+def _load_backend(name: str) -> Optional[Loads]:
+    """Return the raw `loads` of backend `name`, or None if not installed."""
+    try:
+        if name == "orjson":
+            import orjson
+
+            return orjson.loads
+        if name == "msgspec":
+            import msgspec
+
+            return msgspec.json.Decoder().decode
+        if name == "ujson":
+            import ujson
+
+            return ujson.loads
+    except ImportError:
+        return None
+    if name == STDLIB:
+        return _stdlib_loads
+    raise ValueError(f"unknown JSON backend {name!r}; expected one of {BACKENDS}")
+
+
+_codecs: Dict[str, JSONCodec] = {}
+
+
+def available_codecs() -> List[str]:
+    """Return the names of the installed backends, fastest first."""
+    return [name for name in BACKENDS if _load_backend(name) is not None]
+
+
+def get_codec(name: Union[str, JSONCodec, None] = None) -> JSONCodec:
+    """Return the codec for backend `name` (default: best available).
+
+    A `JSONCodec` instance is returned unchanged. Asking for a known but
+    uninstalled backend raises ImportError; an unknown name ValueError.
+    """
+    if isinstance(name, JSONCodec):
+        return name
+    if name is None or name == AUTO:
+        codec = _codecs.get(AUTO)
+        if codec is None:
+            codec = _codecs[AUTO] = get_codec(available_codecs()[0])
+        return codec
+    codec = _codecs.get(name)
+    if codec is None:
+        loads = _load_backend(name)
+        if loads is None:
+            raise ImportError(f"JSON backend {name!r} is not installed")
+        if name != STDLIB:
+            loads = _with_fallback(loads)
+        codec = _codecs[name] = JSONCodec(name, loads)
+    return codec
+
+
+__all__ = ["JSONCodec", "get_codec", "available_codecs", "BACKENDS"]
@@ -0,0 +1,293 @@
+"""Follow a live Vault audit log, like `tail -F`.
+
+`VaultLogFollower` keeps the log open and yields entries as they are
+appended, decoded the same way as `VaultLogReader`. It
+
+- waits for new data with inotify on Linux (through `ctypes`, watching
+  the log's directory) and falls back to polling elsewhere;
+- holds back a trailing line until its newline has been written;
+- notices rotation (the path now names another file: the old file is
+  read to its end first, then the new one from its start) and
+  truncation (`copytruncate`: reading restarts at offset 0);
+- optionally records its byte offset in a checkpoint file, so a restarted
+  follower resumes after the last line it yielded.
+
+It is an iterable of entries, so transactions can be grouped live:
+
+    follower = VaultLogFollower(path, checkpoint_path=path + ".pos")
+    for request_id, events in VaultTransactionReader(follower):
+        ...
+
+Only plain (uncompressed) files can be followed.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import sys
+import time
+from typing import IO, Any, Generator, Optional, Sequence, Tuple, Union
+
+from .vault_json_codec import JSONCodec, get_codec
+from .vault_log_reader import Prefilter, _compile_prefilter, _line_decoder
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_CHECKPOINT_INTERVAL = 5.0
+_READ_SIZE = 64 * 1024
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+
+_FileId = Tuple[int, int]
+
+
+class _Inotify:
+    """Minimal inotify watch on one directory; any event wakes `wait()`."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+
+    @classmethod
+    def create(cls, directory: str) -> Optional["_Inotify"]:
+        """Watch `directory`, or return None where inotify is unavailable."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            return None
+        return cls(fd)
+
+    def wait(self, timeout: float) -> None:
+        ready, _w, _x = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def _file_id(st: os.stat_result) -> _FileId:
+    return st.st_dev, st.st_ino
+
+
+class VaultLogFollower:
+    """Yield entries appended to a live audit log until stopped.
+
+    Parameters
+    - `path`: path of the (uncompressed) audit log.
+    - `from_end`: without a usable checkpoint, start at the current end
+       of the file instead of its beginning.
+    - `checkpoint_path`: JSON file recording the offset after the last
+       yielded line (and the file's identity); read on start, written
+       every `checkpoint_interval` seconds, when idle and on close.
+    - `poll_interval`: seconds between checks when inotify is unavailable;
+       with inotify, the longest wait between checks.
+    - `idle_timeout`: stop after this many seconds without new data
+       (default: follow forever, until `stop()`).
+    - `use_inotify`: set False to always poll.
+    - `fields`, `prefilter`, `codec`: as for `VaultLogReader`.
+
+    A checkpoint for a file that has since been replaced (different
+    inode) or truncated below the saved offset is ignored, and reading
+    starts at the beginning of the current file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        from_end: bool = False,
+        checkpoint_path: Optional[str] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        idle_timeout: Optional[float] = None,
+        checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        use_inotify: bool = True,
+        fields: Optional[Sequence[str]] = None,
+        prefilter: Optional[Prefilter] = None,
+        codec: Union[str, JSONCodec, None] = None,
+    ) -> None:
+        self.path = str(path)
+        if self.path.endswith(".gz"):
+            raise ValueError("compressed logs cannot be followed")
+        self.from_end = from_end
+        self.checkpoint_path = checkpoint_path
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.checkpoint_interval = checkpoint_interval
+        self.use_inotify = use_inotify
+        self.fields = list(fields) if fields is not None else None
+        self.prefilter = _compile_prefilter(prefilter)
+        self.codec = get_codec(codec)
+        # offset just past the last line handed out, in the file `_file_id`
+        self.offset = 0
+        self._file_id: Optional[_FileId] = None
+        self._saved: Optional[Tuple[Optional[_FileId], int]] = None
+        self._stopped = False
+
+    def __iter__(self) -> Generator[Any, None, None]:
+        yield from self.read()
+
+    def stop(self) -> None:
+        """Make `read()` return at its next wait (safe from other threads)."""
+        self._stopped = True
+
+    # -- checkpoints ----------------------------------------------------
+
+    def _load_checkpoint(self, st: os.stat_result) -> Optional[int]:
+        if not self.checkpoint_path:
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            file_id = (int(data["dev"]), int(data["ino"]))
+            offset = int(data["offset"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if file_id != _file_id(st) or offset > st.st_size:
+            return None
+        return offset
+
+    def save_checkpoint(self) -> None:
+        """Write the current offset to `checkpoint_path` (if set)."""
+        if not self.checkpoint_path or self._file_id is None:
+            return
+        state = (self._file_id, self.offset)
+        if state == self._saved:
+            return
+        dev, ino = self._file_id
+        data = {"path": self.path, "dev": dev, "ino": ino, "offset": self.offset}
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, self.checkpoint_path)
+        self._saved = state
+
+    # -- reading --------------------------------------------------------
+
+    def _open(self, resume: bool) -> Optional[IO[bytes]]:
+        """Open the file at `path`; seek to the checkpoint or start offset."""
+        try:
+            fh = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+        st = os.fstat(fh.fileno())
+        offset = 0
+        if resume:
+            saved = self._load_checkpoint(st)
+            if saved is not None:
+                offset = saved
+            elif self.from_end:
+                offset = st.st_size
+        fh.seek(offset)
+        self.offset = offset
+        self._file_id = _file_id(st)
+        return fh
+
+    def read(self) -> Generator[Any, None, None]:
+        """Yield entries as they are appended; see the class docstring."""
+        decode = _line_decoder(self.fields, self.codec)
+        needles = self.prefilter or ()
+        self._stopped = False
+        fh = self._open(resume=True)
+        watcher = None
+        if self.use_inotify:
+            watcher = _Inotify.create(os.path.dirname(os.path.abspath(self.path)))
+        pending = b""
+        last_data = last_save = time.monotonic()
+
+        def entries(lines: Sequence[bytes]) -> Generator[Any, None, None]:
+            for raw in lines:
+                line = raw.strip()
+                if line and all(n in line for n in needles):
+                    yield decode(line)
+                # counted once the consumer asks for the next entry
+                self.offset += len(raw) + 1
+
+        try:
+            while True:
+                data = fh.read(_READ_SIZE) if fh is not None else b""
+                if data:
+                    last_data = time.monotonic()
+                    *lines, pending = (pending + data).split(b"\n")
+                    yield from entries(lines)
+                    if last_data - last_save >= self.checkpoint_interval:
+                        self.save_checkpoint()
+                        last_save = last_data
+                    continue
+
+                # at EOF: look for truncation or rotation
+                try:
+                    st: Optional[os.stat_result] = os.stat(self.path)
+                except FileNotFoundError:
+                    st = None
+                if fh is None:
+                    if st is not None:
+                        fh = self._open(resume=False)
+                        continue
+                elif st is not None and _file_id(st) != self._file_id:
+                    # rotated: the old file has been fully read (data is
+                    # empty), so its unterminated tail is a complete line
+                    if pending:
+                        yield from entries([pending])
+                        pending = b""
+                    fh.close()
+                    fh = self._open(resume=False)
+                    continue
+                elif st is not None and st.st_size < fh.tell():
+                    # truncated in place
+                    fh.seek(0)
+                    self.offset = 0
+                    pending = b""
+                    continue
+
+                self.save_checkpoint()
+                last_save = time.monotonic()
+                if self._stopped:
+                    return
+                if self.idle_timeout is not None:
+                    if last_save - last_data >= self.idle_timeout:
+                        return
+                if watcher is not None:
+                    watcher.wait(self.poll_interval)
+                else:
+                    time.sleep(self.poll_interval)
+        finally:
+            if fh is not None:
+                fh.close()
+            if watcher is not None:
+                watcher.close()
+            self.save_checkpoint()
+
+
+__all__ = ["VaultLogFollower"]
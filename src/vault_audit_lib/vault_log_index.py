@@ -0,0 +1,256 @@
+"""Persistent sidecar index for Vault audit log files.
+
+`VaultLogIndex` scans a log once and stores, in a small SQLite file next
+to it (`<log>.idx` by default), the byte offset of every line keyed by:
+
+- `request.id`
+- `auth.client_token`
+- `auth.entity_id`
+- `request.path`
+- `time` (bucketed to the minute, e.g. `2024-05-01T12:03`)
+
+Later lookups return the offsets of matching lines, and
+`VaultLogReader(path, offsets=...)` seeks straight to them, so repeated
+investigations on the same file skip parsing everything else:
+
+    idx = VaultLogIndex(path).ensure()
+    offsets = idx.transaction_offsets("auth.client_token", token)
+    reader = VaultLogReader(path, offsets=offsets)
+    for request_id, events in VaultTransactionReader(reader):
+        ...
+
+For `.gz` logs the offsets refer to the uncompressed stream.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import sqlite3
+from contextlib import closing
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from .vault_field_projection import VaultFieldProjection
+from .vault_log_reader import VaultLogReader
+
+INDEX_VERSION = "1"
+INDEXED_FIELDS = (
+    "request.id",
+    "auth.client_token",
+    "auth.entity_id",
+    "request.path",
+    "time",
+)
+TIME_BUCKET_CHARS = len("YYYY-MM-DDTHH:MM")
+_TIME_FIELD_NO = INDEXED_FIELDS.index("time")
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE keys (
+    id INTEGER PRIMARY KEY,
+    field INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (field, value)
+);
+CREATE TABLE postings (
+    key_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (key_id, offset)
+) WITHOUT ROWID;
+"""
+
+
+def _lookup(entry: Dict[str, Any], parts: Tuple[str, ...]) -> Any:
+    cur: Any = entry
+    for part in parts:
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(part)
+    return cur
+
+
+def _open_binary(path: str) -> IO[bytes]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    return open(path, "rb")
+
+
+def _source_signature(path: str) -> Dict[str, str]:
+    st = os.stat(path)
+    return {"size": str(st.st_size), "mtime_ns": str(st.st_mtime_ns)}
+
+
+class VaultLogIndex:
+    """Sidecar index mapping key fields of a log file to line offsets.
+
+    Parameters
+    - `log_path`: path of the audit log (plain or `.gz`).
+    - `index_path`: sidecar location; defaults to `log_path + ".idx"`.
+
+    The index remembers the size and mtime of the log it was built from;
+    `is_current()` reports whether it still matches, and `ensure()`
+    rebuilds it when it does not.
+    """
+
+    def __init__(self, log_path: str, index_path: Optional[str] = None) -> None:
+        self.log_path = str(log_path)
+        self.index_path = index_path or self.log_path + ".idx"
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with closing(sqlite3.connect(self.index_path)) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def is_current(self) -> bool:
+        """Return True if the sidecar exists and matches the log file."""
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            meta = dict(self._query("SELECT key, value FROM meta"))
+        except sqlite3.Error:
+            return False
+        expected = _source_signature(self.log_path)
+        expected["version"] = INDEX_VERSION
+        return all(meta.get(k) == v for k, v in expected.items())
+
+    def ensure(self) -> "VaultLogIndex":
+        """Build the index unless an up-to-date one already exists."""
+        if not self.is_current():
+            self.build()
+        return self
+
+    def _scan(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield `(offset, projected_entry)` for every JSON object line."""
+        project = VaultFieldProjection(INDEXED_FIELDS)
+        offset = 0
+        with _open_binary(self.log_path) as fh:
+            for raw in fh:
+                start = offset
+                offset += len(raw)
+                line = raw.decode("utf-8").strip()
+                if not line:
+                    continue
+                entry = project(line)
+                if isinstance(entry, dict):
+                    yield start, entry
+
+    def build(self, batch_size: int = 50_000) -> "VaultLogIndex":
+        """Scan the log once and (re)write the sidecar index."""
+        signature = _source_signature(self.log_path)
+        tmp_path = self.index_path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        paths = [tuple(f.split(".")) for f in INDEXED_FIELDS]
+        key_ids: Dict[Tuple[int, str], int] = {}
+        lines = 0
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(_SCHEMA)
+            conn.execute(
+                "CREATE TEMP TABLE raw_postings (key_id INTEGER, offset INTEGER)"
+            )
+            batch: List[Tuple[int, int]] = []
+            for offset, entry in self._scan():
+                lines += 1
+                for field_no, parts in enumerate(paths):
+                    value = _lookup(entry, parts)
+                    if not isinstance(value, str) or not value:
+                        continue
+                    if field_no == _TIME_FIELD_NO:
+                        value = value[:TIME_BUCKET_CHARS]
+                    key = (field_no, value)
+                    key_id = key_ids.get(key)
+                    if key_id is None:
+                        key_id = key_ids[key] = len(key_ids) + 1
+                    batch.append((key_id, offset))
+                if len(batch) >= batch_size:
+                    conn.executemany("INSERT INTO raw_postings VALUES (?, ?)", batch)
+                    batch = []
+            if batch:
+                conn.executemany("INSERT INTO raw_postings VALUES (?, ?)", batch)
+
+            conn.executemany(
+                "INSERT INTO keys (id, field, value) VALUES (?, ?, ?)",
+                ((kid, f, v) for (f, v), kid in key_ids.items()),
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO postings "
+                "SELECT key_id, offset FROM raw_postings ORDER BY key_id, offset"
+            )
+            meta = dict(signature, version=INDEX_VERSION, lines=str(lines))
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, self.index_path)
+        return self
+
+    def _field_no(self, field: str) -> int:
+        try:
+            return INDEXED_FIELDS.index(field)
+        except ValueError:
+            raise ValueError(
+                f"field {field!r} is not indexed; expected one of {INDEXED_FIELDS}"
+            ) from None
+
+    def offsets(self, field: str, value: str) -> List[int]:
+        """Return sorted offsets of lines whose `field` equals `value`.
+
+        For `field="time"`, `value` is matched on its minute bucket.
+        """
+        field_no = self._field_no(field)
+        if field == "time":
+            value = value[:TIME_BUCKET_CHARS]
+        rows = self._query(
+            "SELECT p.offset FROM keys k JOIN postings p ON p.key_id = k.id "
+            "WHERE k.field = ? AND k.value = ? ORDER BY p.offset",
+            (field_no, value),
+        )
+        return [r[0] for r in rows]
+
+    def time_offsets(self, start: str, end: str) -> List[int]:
+        """Return sorted offsets of lines with a minute bucket in `[start, end]`.
+
+        `start`/`end` are RFC3339 strings compared on their minute prefix,
+        so the result may include lines just outside the exact range.
+        """
+        field_no = self._field_no("time")
+        rows = self._query(
+            "SELECT DISTINCT p.offset FROM keys k "
+            "JOIN postings p ON p.key_id = k.id "
+            "WHERE k.field = ? AND k.value BETWEEN ? AND ? ORDER BY p.offset",
+            (field_no, start[:TIME_BUCKET_CHARS], end[:TIME_BUCKET_CHARS]),
+        )
+        return [r[0] for r in rows]
+
+    def transaction_offsets(self, field: str, value: str) -> List[int]:
+        """Return offsets of every event in transactions touching `field == value`.
+
+        Matching lines are read to collect their `request.id`, and all
+        lines of those request ids are returned, so a transaction whose
+        response lacks the key is still complete.
+        """
+        matched = self.offsets(field, value)
+        if field == "request.id":
+            return matched
+        request_ids = set()
+        for entry in VaultLogReader(self.log_path, offsets=matched):
+            if not isinstance(entry, dict):
+                continue
+            rid = _lookup(entry, ("request", "id"))
+            if isinstance(rid, str):
+                request_ids.add(rid)
+        result = set(matched)
+        for rid in request_ids:
+            result.update(self.offsets("request.id", rid))
+        return sorted(result)
+
+    def values(self, field: str) -> List[str]:
+        """Return the distinct indexed values of `field`."""
+        field_no = self._field_no(field)
+        rows = self._query(
+            "SELECT value FROM keys WHERE field = ? ORDER BY value", (field_no,)
+        )
+        return [r[0] for r in rows]
+
+
+__all__ = ["VaultLogIndex", "INDEXED_FIELDS"]
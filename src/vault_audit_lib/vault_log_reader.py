@@ -5,30 +5,383 @@ and yields one entry at a time. If a line is valid JSON, it yields
 the parsed object (dict/list); otherwise it yields the raw line string.
 The reader accepts file paths or file-like objects and transparently
 handles gzip-compressed files when the filename ends with `.gz`.
+
+Files given by path can optionally be parsed by a pool of worker
+processes (`workers=N`). The file is cut into byte ranges, each range
+is decoded in a worker starting at its first full line, and the
+results are yielded in the original order, so the output is identical
+to the serial reader. Gzip files qualify once they have a
+`GzipCheckpointIndex` sidecar; without one they are read serially.
+
+Passing `fields=[...]` makes the reader yield only those dotted fields
+of each event (see `VaultFieldProjection`), which avoids materializing
+large request/response payloads when only a few keys are needed.
+
+Passing `offsets=[...]` (byte offsets of line starts, e.g. from
+`VaultLogIndex`) reads only the lines starting at those offsets.
+`start_offset=N` reads serially from byte N and keeps the reader's
+`offset` just past the last line yielded, which is what scan checkpoints
+(see `vault_checkpoint`) record and resume from.
+
+For plain files, `use_mmap=True` scans a memory-mapped view of the file
+for line boundaries and hands `bytes` lines straight to the JSON decoder
+without a text-decoding pass. `prefilter=` (in every mode) skips lines
+that do not contain all of the given byte strings before any parsing,
+e.g. `prefilter=b'"type":"response"'`.
+
+Lines are decoded with the fastest installed JSON backend (see
+`vault_json_codec`); `codec="json"` forces the standard library.
+
+With `compact=True` JSON object lines are yielded as `CompactEvent`s,
+which keep the line itself and decode the rest of the event on demand;
+this suits pipelines that buffer many events, such as transaction
+grouping, and write them back out unchanged. With `keep_raw=True` they
+are `RawEvent`s instead: ordinary dicts that also carry their line, which
+`VaultLogWriter` writes back byte for byte.
+
+Binary logs written with `VaultLogWriter(binary=True)` are recognized by
+their header and read block by block (see `vault_binary`); `fields`
+applies to them, `prefilter`, `offsets` and `start_offset` do not.
+
+`read_range(start, end)` answers time-window queries on a roughly
+time-ordered file without reading all of it: it bisects the file by byte
+offset (peeking at the `time` of the first full line after each probe),
+then streams from the found position until events are past `end`. Gzip
+files need a `GzipCheckpointIndex` for the bisection; without one they
+are scanned from the start.
 """
 from __future__ import annotations
 
 import gzip
 import io
-import json
-from typing import IO, Any, Generator, Union
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .vault_binary import MAGIC
+from .vault_binary import _open_path as _open_binary
+from .vault_binary import detect_binary, read_binary, read_header
+from .vault_compact_event import CompactEvent
+from .vault_field_projection import VaultFieldProjection
+from .vault_gzip import GzipCheckpointIndex, open_seekable
+from .vault_json_codec import JSONCodec, get_codec
+from .vault_raw_event import RawEvent
+from .vault_time import NS_PER_SECOND, TimeLike, event_time_ns, parse_time_ns
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# Seconds by which events may appear out of time order in a file.
+DEFAULT_RANGE_SLACK = 5.0
+# `read_range` stops bisecting below this span and scans linearly.
+_BISECT_MIN_SPAN = 64 * 1024
+# Lines examined after a probe offset to find one with a time.
+_PEEK_LINES = 64
+
+
+Prefilter = Union[bytes, str, Sequence[Union[bytes, str]]]
+
+
+def _raw_line(line: Union[str, bytes]) -> str:
+    if isinstance(line, bytes):
+        return line.decode("utf-8").strip()
+    return line
+
+
+def _compile_prefilter(prefilter: Optional[Prefilter]) -> Optional[Tuple[bytes, ...]]:
+    """Normalize `prefilter` to a tuple of UTF-8 needles (all must match)."""
+    if prefilter is None:
+        return None
+    if isinstance(prefilter, (bytes, str)):
+        prefilter = [prefilter]
+    needles = tuple(
+        n.encode("utf-8") if isinstance(n, str) else bytes(n) for n in prefilter
+    )
+    return needles or None
+
+
+def _text_needles(needles: Optional[Tuple[bytes, ...]]) -> Tuple[str, ...]:
+    return tuple(n.decode("utf-8") for n in needles) if needles else ()
+
+
+# (start, end, a line starts at `start`; None when unknown)
+_Range = Tuple[int, int, Optional[bool]]
+
+
+def _split_ranges(path: str, chunk_size: int) -> Iterator[_Range]:
+    """Yield byte ranges of roughly `chunk_size` covering the (uncompressed) file.
+
+    For gzip files the ranges start on checkpoints of the file's
+    `GzipCheckpointIndex` so each one can be decompressed independently.
+    """
+    chunk_size = max(1, chunk_size)
+    if path.endswith(".gz"):
+        idx = GzipCheckpointIndex(path)
+        if not idx.load():
+            raise ValueError(f"{path} has no current gzip checkpoint index")
+        size = idx.uncompressed_size
+        if idx.kind == "members":
+            starts = []
+            for _c, u_off, line_start in idx.checkpoints:
+                if not starts or u_off - starts[-1][0] >= chunk_size:
+                    starts.append((u_off, line_start))
+            for i, (start, line_start) in enumerate(starts):
+                end = starts[i + 1][0] if i + 1 < len(starts) else size
+                yield start, end, line_start
+            return
+    else:
+        size = os.path.getsize(path)
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size), None
+
+
+def _line_decoder(
+    fields: Optional[Sequence[str]],
+    codec: Optional[JSONCodec] = None,
+    compact: bool = False,
+    keep_raw: bool = False,
+) -> Callable[[Any], Any]:
+    """Return the per-line decode function for an optional projection.
+
+    The returned function parses a stripped, non-empty line as JSON and
+    falls back to the raw string. With `compact`, JSON objects become
+    `CompactEvent`s, with `keep_raw` `RawEvent`s.
+    """
+    loads = get_codec(codec).loads
+    if fields is not None:
+        return VaultFieldProjection(fields, loads=loads)
+    if compact:
+
+        def decode_compact(line: Union[str, bytes]) -> Any:
+            try:
+                entry = loads(line)
+            except Exception:
+                return _raw_line(line)
+            if isinstance(entry, dict):
+                return CompactEvent(line, entry)
+            return entry
+
+        return decode_compact
+    if keep_raw:
+
+        def decode_keep_raw(line: Union[str, bytes]) -> Any:
+            try:
+                entry = loads(line)
+            except Exception:
+                return _raw_line(line)
+            if isinstance(entry, dict):
+                if isinstance(line, bytes):
+                    line = line.decode("utf-8")
+                return RawEvent(entry, line)
+            return entry
+
+        return decode_keep_raw
+
+    def decode(line: Union[str, bytes]) -> Any:
+        try:
+            return loads(line)
+        except Exception:
+            return _raw_line(line)
+
+    return decode
+
+
+def _parse_range(
+    path: str,
+    start: int,
+    end: int,
+    line_start: Optional[bool] = None,
+    fields: Optional[Sequence[str]] = None,
+    prefilter: Optional[Tuple[bytes, ...]] = None,
+    codec: Optional[JSONCodec] = None,
+    compact: bool = False,
+    keep_raw: bool = False,
+) -> List[Any]:
+    """Parse the lines that start within `[start, end)` (worker entry point).
+
+    A line crossing `end` is read to completion here, and a line that
+    began before `start` is left to the previous range. Newlines are
+    normalized the same way the text-mode serial reader does (`\\r\\n` and
+    lone `\\r` count as line endings), so the parsed entries match it line
+    for line.
+    """
+    with open_seekable(path) as fh:
+        if start > 0 and line_start is None:
+            fh.seek(start - 1)
+            line_start = fh.read(1) == b"\n"
+        fh.seek(start)
+        pos = start
+        if start > 0 and not line_start:
+            pos += len(fh.readline())
+        data = b""
+        if pos < end:
+            data = fh.read(end - pos)
+            if data and not data.endswith(b"\n"):
+                data += fh.readline()
+    decode = _line_decoder(fields, codec, compact, keep_raw)
+    needles = _text_needles(prefilter)
+    text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    out: List[Any] = []
+    for raw in text.split("\n"):
+        if needles and not all(n in raw for n in needles):
+            continue
+        line = raw.strip()
+        if not line:
+            continue
+        out.append(decode(line))
+    return out
+
+
+def _peek_time(
+    fh: IO[bytes], offset: int, time_key: str, loads: Callable[[bytes], Any]
+) -> Optional[int]:
+    """Time of the first timed event in a line starting after `offset`."""
+    fh.seek(offset)
+    if offset > 0:
+        fh.readline()
+    for _ in range(_PEEK_LINES):
+        raw = fh.readline()
+        if not raw:
+            return None
+        try:
+            ns = event_time_ns(loads(raw), time_key)
+        except Exception:
+            continue
+        if ns is not None:
+            return ns
+    return None
 
 
 class VaultLogReader:
     """Read entries from a Vault audit log file.
 
+    Parameters
+    - `file`: path string or file-like object.
+    - `workers`: when greater than 1 and `file` is a path, parse the file
+       with that many worker processes. Gzip paths need a seekable
+       `GzipCheckpointIndex` sidecar; file-like objects and gzip files
+       without one are read serially.
+    - `chunk_size`: approximate size in bytes of each range handed to a
+       worker in parallel mode.
+    - `fields`: optional list of dotted key paths; when given, JSON object
+       entries are reduced to just those fields (nested shape preserved).
+    - `offsets`: optional byte offsets of line starts (uncompressed offsets
+       for `.gz` files); when given only those lines are read, in file
+       order. Requires `file` to be a path.
+    - `start_offset`: byte offset of a line start (uncompressed for `.gz`
+       files) to read from, serially; `offset` then tracks the position
+       just past the last line yielded. Requires `file` to be a path.
+       Lines are split on `\\n` only.
+    - `use_mmap`: for plain (non-gzip) paths read serially, scan a
+       memory-mapped view and decode `bytes` lines directly. Lines are
+       split on `\\n` only.
+    - `prefilter`: byte string (or list of them) that a raw line must
+       contain, all of them, to be decoded at all; other lines, JSON or
+       not, are skipped.
+    - `codec`: JSON backend name or `JSONCodec` (see `get_codec`); by
+       default the fastest installed backend.
+    - `compact`: yield JSON objects as `CompactEvent`s. Cannot be combined
+       with `fields` and does not apply to binary logs.
+    - `keep_raw`: yield JSON objects as `RawEvent`s, dicts that keep their
+       original line for verbatim rewriting. Same restrictions as
+       `compact`.
+
     Usage:
       reader = VaultLogReader(path)
       for entry in reader:
           # entry is dict (if JSON) or str
     """
 
-    def __init__(self, file: Union[str, IO]):
+    def __init__(
+        self,
+        file: Union[str, IO],
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        fields: Optional[Sequence[str]] = None,
+        offsets: Optional[Iterable[int]] = None,
+        use_mmap: bool = False,
+        prefilter: Optional[Prefilter] = None,
+        codec: Union[str, JSONCodec, None] = None,
+        compact: bool = False,
+        keep_raw: bool = False,
+        start_offset: Optional[int] = None,
+    ):
+        if compact and keep_raw:
+            raise ValueError("compact and keep_raw are mutually exclusive")
+        if (compact or keep_raw) and fields is not None:
+            raise ValueError("compact and keep_raw keep whole lines; drop fields=")
         self.file = file
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.fields = list(fields) if fields is not None else None
+        self.offsets = sorted(set(offsets)) if offsets is not None else None
+        if self.offsets is not None and hasattr(file, "read"):
+            raise ValueError("offsets require a file path, not a file object")
+        if start_offset is not None and hasattr(file, "read"):
+            raise ValueError("start_offset requires a file path, not a file object")
+        self.start_offset = start_offset
+        self.offset = start_offset or 0
+        self.use_mmap = use_mmap
+        self.prefilter = _compile_prefilter(prefilter)
+        self.codec = get_codec(codec)
+        self.compact = compact
+        self.keep_raw = keep_raw
 
     def __iter__(self) -> Generator[Any, None, None]:
         yield from self.read()
 
+    def _parallel_path(self) -> Optional[str]:
+        """Return the path to parse in parallel, or None to read serially."""
+        if not self.workers or self.workers <= 1 or hasattr(self.file, "read"):
+            return None
+        path = str(self.file)
+        if path.endswith(".gz"):
+            idx = GzipCheckpointIndex(path)
+            if not idx.load() or not idx.seekable:
+                return None
+        return path
+
+    def _binary_codec(self) -> Optional[str]:
+        """Codec of a binary log (see `vault_binary`), None for text logs."""
+        if hasattr(self.file, "read"):
+            peek = getattr(self.file, "peek", None)
+            if peek is None or isinstance(self.file, io.TextIOBase):
+                return None
+            head = peek(len(MAGIC))[: len(MAGIC)]
+            return read_header(self.file) if head == MAGIC else None
+        return detect_binary(str(self.file))
+
+    def _read_binary(self, codec: str) -> Generator[Any, None, None]:
+        if self.prefilter or self.offsets is not None or self.start_offset is not None:
+            raise ValueError(
+                "prefilter, offsets and start_offset do not apply to binary logs"
+            )
+        if self.compact or self.keep_raw:
+            raise ValueError("binary logs have no lines for compact or keep_raw")
+        project = None
+        if self.fields is not None:
+            project = VaultFieldProjection(self.fields).project
+        if hasattr(self.file, "read"):
+            # the header has been consumed by `_binary_codec`
+            yield from read_binary(self.file, codec, project)  # type: ignore[arg-type]
+            return
+        path = str(self.file)
+        with _open_binary(path, "rb") as fh:
+            read_header(fh)
+            yield from read_binary(fh, codec, project)
+
     def read(self) -> Generator[Any, None, None]:
         """Yield entries from the underlying file.
 
@@ -36,6 +389,30 @@ class VaultLogReader:
         succeeds the resulting Python object is yielded; otherwise the raw
         string line is yielded.
         """
+        binary = self._binary_codec()
+        if binary is not None:
+            yield from self._read_binary(binary)
+            return
+
+        if self.offsets is not None:
+            yield from self._read_offsets(str(self.file), self.offsets)
+            return
+
+        if self.start_offset is not None:
+            yield from self._read_from(str(self.file), self.start_offset)
+            return
+
+        parallel_path = self._parallel_path()
+        if parallel_path is not None:
+            yield from self._read_parallel(parallel_path)
+            return
+
+        if self.use_mmap and not hasattr(self.file, "read"):
+            path = str(self.file)
+            if not path.endswith(".gz"):
+                yield from self._read_mmap(path)
+                return
+
         file_obj: IO
 
         # Accept file-like objects directly
@@ -50,15 +427,20 @@ class VaultLogReader:
             else:
                 file_obj = open(path, "r", encoding="utf-8")
 
+        decode = _line_decoder(self.fields, self.codec, self.compact, self.keep_raw)
+        # file objects opened in binary mode yield bytes lines
+        byte_needles = self.prefilter or ()
+        text_needles = _text_needles(self.prefilter)
         try:
             for raw in file_obj:
+                if byte_needles:
+                    needles = byte_needles if isinstance(raw, bytes) else text_needles
+                    if not all(n in raw for n in needles):
+                        continue
                 line = raw.strip()
                 if not line:
                     continue
-                try:
-                    yield json.loads(line)
-                except Exception:
-                    yield line
+                yield decode(line)
         finally:
             if close_after:
                 try:
@@ -66,5 +448,190 @@ class VaultLogReader:
                 except Exception:
                     pass
 
+    def _read_offsets(
+        self, path: str, offsets: Sequence[int]
+    ) -> Generator[Any, None, None]:
+        """Yield the entries on the lines starting at `offsets` (ascending)."""
+        decode = _line_decoder(self.fields, self.codec, self.compact, self.keep_raw)
+        needles = self.prefilter or ()
+        with open_seekable(path) as fh:
+            for offset in offsets:
+                fh.seek(offset)
+                raw = fh.readline()
+                if needles and not all(n in raw for n in needles):
+                    continue
+                line = raw.decode("utf-8").strip()
+                if line:
+                    yield decode(line)
+
+    def _read_from(self, path: str, offset: int) -> Generator[Any, None, None]:
+        """Read from `offset` on, keeping `self.offset` past each yielded line."""
+        decode = _line_decoder(self.fields, self.codec, self.compact, self.keep_raw)
+        needles = self.prefilter or ()
+        self.offset = offset
+        with open_seekable(path) as fh:
+            fh.seek(offset)
+            for raw in fh:
+                offset += len(raw)
+                if needles and not all(n in raw for n in needles):
+                    continue
+                line = raw.strip()
+                if line:
+                    self.offset = offset
+                    yield decode(line)
+        self.offset = offset
+
+    def _read_mmap(self, path: str) -> Generator[Any, None, None]:
+        """Scan a memory-mapped plain file, decoding only prefiltered lines."""
+        decode = _line_decoder(self.fields, self.codec, self.compact, self.keep_raw)
+        needles = self.prefilter or ()
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                find = mm.find
+                pos = 0
+                while pos < size:
+                    end = find(b"\n", pos)
+                    if end < 0:
+                        end = size
+                    if needles and not all(find(n, pos, end) >= 0 for n in needles):
+                        pos = end + 1
+                        continue
+                    line = mm[pos:end].strip()
+                    pos = end + 1
+                    if line:
+                        yield decode(line)
+
+    def read_range(
+        self,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+        time_key: str = "time",
+        slack: float = DEFAULT_RANGE_SLACK,
+    ) -> Generator[Any, None, None]:
+        """Yield the events with `start <= time < end`, in file order.
+
+        Parameters
+        - `start`, `end`: RFC3339 strings, `datetime` objects or epoch
+           nanoseconds; either may be None for an open bound.
+        - `time_key`: top-level key holding the event time.
+        - `slack`: seconds by which the file may be out of time order.
+           Every event must be at most `slack` seconds older than any
+           event before it, or it may be missed.
+
+        Only JSON objects with a parsable time are yielded. `fields` and
+        `prefilter` apply as in `read()`; `workers` and `offsets` are
+        ignored. Requires `file` to be a path.
+        """
+        if hasattr(self.file, "read"):
+            raise ValueError("read_range requires a file path, not a file object")
+        lo_ns = None if start is None else parse_time_ns(start)
+        hi_ns = None if end is None else parse_time_ns(end)
+        if (start is not None and lo_ns is None) or (end is not None and hi_ns is None):
+            raise ValueError(f"invalid time bound in read_range({start!r}, {end!r})")
+        slack_ns = int(slack * NS_PER_SECOND)
+        path = str(self.file)
+
+        size: Optional[int] = None
+        if not path.endswith(".gz"):
+            size = os.path.getsize(path)
+        else:
+            idx = GzipCheckpointIndex(path)
+            if idx.load() and idx.seekable:
+                size = idx.uncompressed_size
+
+        fields = self.fields
+        drop_time = fields is not None and time_key not in fields
+        if drop_time:
+            fields = list(fields) + [time_key]  # type: ignore[operator]
+        decode = _line_decoder(fields, self.codec, self.compact, self.keep_raw)
+        needles = self.prefilter or ()
+
+        if detect_binary(path) is not None:
+            # no byte offsets to bisect on: filter a serial read
+            reader = VaultLogReader(path, fields=fields, prefilter=self.prefilter)
+            for entry in reader.read():
+                ns = event_time_ns(entry, time_key)
+                if ns is None:
+                    continue
+                if hi_ns is not None and ns >= hi_ns + slack_ns:
+                    break
+                if (lo_ns is None or ns >= lo_ns) and (hi_ns is None or ns < hi_ns):
+                    if drop_time:
+                        del entry[time_key]
+                    yield entry
+            return
+
+        with open_seekable(path) as fh:
+            begin = 0
+            if lo_ns is not None and size is not None:
+                target = lo_ns - slack_ns
+                lo, hi = 0, size
+                while hi - lo > _BISECT_MIN_SPAN:
+                    mid = (lo + hi) // 2
+                    ns = _peek_time(fh, mid, time_key, self.codec.loads)
+                    if ns is None or ns >= target:
+                        hi = mid
+                    else:
+                        lo = mid
+                begin = lo
+            fh.seek(begin)
+            if begin > 0:
+                fh.seek(begin - 1)
+                if fh.read(1) != b"\n":
+                    fh.readline()
+            for raw in iter(fh.readline, b""):
+                if needles and not all(n in raw for n in needles):
+                    continue
+                line = raw.strip()
+                if not line:
+                    continue
+                entry = decode(line)
+                ns = event_time_ns(entry, time_key)
+                if ns is None:
+                    continue
+                if hi_ns is not None and ns >= hi_ns + slack_ns:
+                    break
+                if (lo_ns is None or ns >= lo_ns) and (hi_ns is None or ns < hi_ns):
+                    if drop_time:
+                        del entry[time_key]
+                    yield entry
+
+    def _read_parallel(self, path: str) -> Generator[Any, None, None]:
+        """Parse `path` in a process pool, yielding entries in file order.
+
+        At most `2 * workers` ranges are in flight at once so memory stays
+        bounded by a few chunks regardless of the file size.
+        """
+        workers = int(self.workers or 1)
+        max_pending = workers * 2
+        pool = ProcessPoolExecutor(max_workers=workers)
+        pending: deque = deque()
+        try:
+            for start, end, line_start in _split_ranges(path, self.chunk_size):
+                fut = pool.submit(
+                    _parse_range,
+                    path,
+                    start,
+                    end,
+                    line_start,
+                    self.fields,
+                    self.prefilter,
+                    self.codec,
+                    self.compact,
+                    self.keep_raw,
+                )
+                pending.append(fut)
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for fut in pending:
+                fut.cancel()
+            pool.shutdown(wait=True)
+
 
 __all__ = ["VaultLogReader"]
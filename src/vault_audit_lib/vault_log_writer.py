@@ -3,12 +3,66 @@
 Provides `VaultLogWriter` to append entries to a Vault audit log file.
 Entries are written as JSON lines. Accepts a path (text or .gz) or a
 file-like object opened for text writing.
+
+With `gzip_block_size` set, `.gz` output is written as independent,
+line-aligned gzip members (see `BlockGzipWriter`), which stays readable
+by standard gzip tools and lets `GzipCheckpointIndex` support random
+and parallel reads.
+
+Entries are serialized like `json.dumps(entry, default=str)`, through
+the package's JSON codec (see `vault_json_codec`), so the output bytes do
+not depend on which JSON backends are installed.
+
+Writes can be batched: with `buffer_size` (bytes) and/or `buffer_entries`
+set, serialized lines are collected and handed to the file (and so to
+the gzip compressor) as one joined string per batch. The buffer is also
+written out when `flush_interval` seconds have passed since the last
+flush (checked on each write), on `flush()` and on `close()`.
+
+With `background=True`, `write()` only enqueues the entry on a bounded
+queue and a dedicated thread serializes, compresses and writes it, so
+the caller's parsing overlaps with the output work (zlib and file I/O
+release the GIL). Entries are written in call order; a full queue blocks
+the caller. An error raised in the thread is re-raised by the next
+`write()`, `flush()` or `close()`.
+
+With `binary=True`, or for `.vbin` paths, entries are written as blocks
+of the binary record format of `vault_binary` instead of JSON lines;
+`VaultLogReader` detects it from the file header. Appending to an
+existing file keeps that file's format.
+
+A `CompactEvent`, or a `RawEvent` whose `raw` line is still set, is
+written as its original line, without re-serialization.
 """
 from __future__ import annotations
 
 import gzip
-import json
-from typing import IO, Any, Iterable, Optional, Union
+import os
+import queue
+import threading
+import time
+from typing import IO, Any, Iterable, List, Optional, Union
+
+from .vault_binary import (
+    DEFAULT_BLOCK_ENTRIES,
+    BinaryRecordWriter,
+    detect_binary,
+    is_binary_path,
+)
+from .vault_compact_event import CompactEvent
+from .vault_gzip import BlockGzipWriter
+from .vault_json_codec import JSONCodec, get_codec
+from .vault_raw_event import RawEvent
+
+# `writelines` joins lines into writes of about this many characters when
+# unbuffered.
+WRITELINES_BATCH = 64 * 1024
+DEFAULT_QUEUE_SIZE = 1024
+
+_WRITE = "write"
+_WRITELINES = "writelines"
+_FLUSH = "flush"
+_STOP = "stop"
 
 
 class VaultLogWriter:
@@ -17,58 +71,312 @@ class VaultLogWriter:
     Example:
         with VaultLogWriter("/var/log/.private_log") as w:
             w.write({"request": {"id": "1"}, "msg": "start"})
+
+    Parameters
+    - `file`: path (text or .gz) or file-like object opened for text writing.
+    - `mode`: `"a"` to append (default) or `"w"` to truncate.
+    - `gzip_block_size`: for `.gz` paths, write a new gzip member every
+       this many uncompressed bytes (at a line boundary).
+    - `codec`: JSON backend name or `JSONCodec` providing `dumps`; the
+       default encoder matches `json.dumps(entry, default=str)` exactly.
+    - `buffer_size`: write buffered lines out once they reach this many
+       characters.
+    - `buffer_entries`: write buffered lines out once this many are queued.
+    - `flush_interval`: seconds after which a write also flushes the
+       buffer and the underlying file.
+    - `compresslevel`: gzip compression level for `.gz` paths (1-9).
+    - `background`: serialize and write on a dedicated thread.
+    - `queue_size`: maximum number of queued calls in background mode;
+       `write()` blocks while the queue is full.
+    - `binary`: write the binary record format (default: for `.vbin`
+       paths, or when appending to an existing binary log). File objects
+       must then be opened in binary mode.
+    - `binary_codec`, `block_entries`, `dedupe`: see `BinaryRecordWriter`.
+       Binary output is buffered in blocks, so `buffer_size` and
+       `buffer_entries` do not apply to it.
+
+    Without `buffer_size`/`buffer_entries` every `write` reaches the file
+    immediately, as before. Buffered lines are lost if the writer is
+    never flushed or closed. In background mode entries must not be
+    mutated after `write()`, as they are serialized later, and the writer
+    must be closed to stop its thread.
     """
 
-    def __init__(self, file: Union[str, IO], mode: str = "a") -> None:
+    def __init__(
+        self,
+        file: Union[str, IO],
+        mode: str = "a",
+        gzip_block_size: Optional[int] = None,
+        codec: Union[str, JSONCodec, None] = None,
+        buffer_size: Optional[int] = None,
+        buffer_entries: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        compresslevel: int = 9,
+        background: bool = False,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        binary: Optional[bool] = None,
+        binary_codec: str = "marshal",
+        block_entries: int = DEFAULT_BLOCK_ENTRIES,
+        dedupe: bool = False,
+    ) -> None:
+        self._dumps = get_codec(codec).dumps
+        self.buffer_size = buffer_size
+        self.buffer_entries = buffer_entries
+        self.flush_interval = flush_interval
+        self._buffered = bool(buffer_size or buffer_entries)
+        self._buffer: List[str] = []
+        self._buffer_chars = 0
+        self._last_flush = time.monotonic()
         self._close_after = False
+        self._binary = False
         if hasattr(file, "write"):
             self._file = file  # type: ignore[assignment]
+            if binary:
+                self._binary = True
+                # closing flushes the last block; `file` itself stays open
+                self._close_after = True
+                self._file = BinaryRecordWriter(
+                    file,  # type: ignore[arg-type]
+                    binary_codec,
+                    block_entries,
+                    dedupe,
+                    close_file=False,
+                )
         else:
             path = str(file)
             self._close_after = True
-            if path.endswith(".gz"):
+            existing = None
+            if mode == "a" and os.path.exists(path) and os.path.getsize(path) > 0:
+                existing = detect_binary(path)
+                if binary is not None and binary != (existing is not None):
+                    kind = "binary" if existing else "JSON"
+                    raise ValueError(f"{path} is a {kind} log; cannot append to it")
+                binary = existing is not None
+            elif binary is None:
+                binary = is_binary_path(path)
+            if binary:
+                self._binary = True
+                if path.endswith(".gz"):
+                    fh = gzip.open(path, mode + "b", compresslevel=compresslevel)
+                else:
+                    fh = open(path, mode + "b")
+                self._file = BinaryRecordWriter(
+                    fh,  # type: ignore[arg-type]
+                    existing or binary_codec,
+                    block_entries,
+                    dedupe,
+                    write_header=existing is None,
+                )
+            elif path.endswith(".gz") and gzip_block_size:
+                self._file = BlockGzipWriter(
+                    path, mode, block_size=gzip_block_size, compresslevel=compresslevel
+                )
+            elif path.endswith(".gz"):
                 # gzip text append
-                self._file = gzip.open(path, mode + "t", encoding="utf-8")
+                self._file = gzip.open(
+                    path, mode + "t", encoding="utf-8", compresslevel=compresslevel
+                )
             else:
                 self._file = open(path, mode, encoding="utf-8")
 
-    def write(self, entry: Any) -> None:
-        """Write a single entry as a JSON line.
+        self._queue: Optional["queue.Queue[Any]"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._error_reported = False
+        if background:
+            self._queue = queue.Queue(maxsize=max(1, queue_size))
+            self._thread = threading.Thread(
+                target=self._run, name="VaultLogWriter", daemon=True
+            )
+            self._thread.start()
 
-        If `entry` is a string it is written verbatim (with newline).
-        Otherwise it is serialized with `json.dumps`.
-        """
+    def _serialize(self, entry: Any) -> str:
         if isinstance(entry, str):
             line = entry
+        elif type(entry) is CompactEvent:
+            line = entry.raw
+        elif type(entry) is RawEvent and entry.raw is not None:
+            line = entry.raw
         else:
-            line = json.dumps(entry, default=str)
+            line = self._dumps(entry)
         if not line.endswith("\n"):
             line = line + "\n"
-        self._file.write(line)
+        return line
+
+    def write(self, entry: Any) -> None:
+        """Write a single entry as a JSON line.
+
+        If `entry` is a string it is written verbatim (with newline), and
+        so is the original line of a `CompactEvent` or unmodified
+        `RawEvent`.
+        Otherwise it is serialized as JSON (`json.dumps(entry, default=str)`).
+        """
+        if self._queue is not None:
+            self._submit(_WRITE, entry)
+        else:
+            self._write(entry)
 
     def writelines(self, entries: Iterable[Any]) -> None:
+        """Write several entries, joining them into as few file writes as possible."""
+        if self._queue is None:
+            self._writelines(entries)
+            return
+        batch: List[Any] = []
         for e in entries:
-            self.write(e)
+            batch.append(e)
+            if len(batch) >= self._queue.maxsize:
+                self._submit(_WRITELINES, batch)
+                batch = []
+        if batch:
+            self._submit(_WRITELINES, batch)
 
     def flush(self) -> None:
-        try:
-            self._file.flush()
-        except Exception:
-            pass
+        """Write out buffered lines and flush the underlying file.
+
+        In background mode this waits until every entry written so far
+        has been handed to the file.
+        """
+        if self._queue is None or self._thread is None:
+            self._flush()
+            return
+        done = threading.Event()
+        self._submit(_FLUSH, done)
+        while not done.wait(0.1):
+            if self._thread is None or not self._thread.is_alive():
+                break
+        self._raise_error()
 
     def close(self) -> None:
+        thread = self._thread
+        if thread is not None:
+            self._thread = None
+            if thread.is_alive():
+                self._queue.put((_STOP, None))  # type: ignore[union-attr]
+                thread.join()
+        if self._error is None:
+            self._write_buffer()
         if self._close_after:
             try:
                 self._file.close()
             except Exception:
                 pass
+        if not self._error_reported:
+            self._raise_error()
+
+    # -- background mode ------------------------------------------------
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            self._error_reported = True
+            raise self._error
+
+    def _submit(self, op: str, arg: Any) -> None:
+        self._raise_error()
+        if self._thread is None:
+            raise ValueError("write to a closed VaultLogWriter")
+        self._queue.put((op, arg))  # type: ignore[union-attr]
+
+    def _run(self) -> None:
+        """Background thread: apply queued calls in order until `_STOP`."""
+        q = self._queue
+        assert q is not None
+        while True:
+            op, arg = q.get()
+            if op == _STOP:
+                return
+            if op == _FLUSH:
+                if self._error is None:
+                    try:
+                        self._flush()
+                    except BaseException as exc:
+                        self._error = exc
+                arg.set()
+                continue
+            if self._error is not None:
+                # drop everything after a failure; it is reported instead
+                continue
+            try:
+                if op == _WRITE:
+                    self._write(arg)
+                else:
+                    self._writelines(arg)
+            except BaseException as exc:
+                self._error = exc
+
+    # -- synchronous implementation --------------------------------------
+
+    def _write(self, entry: Any) -> None:
+        if self._binary:
+            self._file.write(entry)
+            self._check_interval()
+            return
+        line = self._serialize(entry)
+        if not self._buffered:
+            self._file.write(line)
+        else:
+            self._buffer.append(line)
+            self._buffer_chars += len(line)
+            if self._buffer_full():
+                self._write_buffer()
+        self._check_interval()
+
+    def _writelines(self, entries: Iterable[Any]) -> None:
+        if self._binary:
+            self._file.writelines(entries)
+            self._check_interval()
+            return
+        if self._buffered:
+            for e in entries:
+                self._write(e)
+            return
+        batch: List[str] = []
+        chars = 0
+        for e in entries:
+            line = self._serialize(e)
+            batch.append(line)
+            chars += len(line)
+            if chars >= WRITELINES_BATCH:
+                self._file.write("".join(batch))
+                batch = []
+                chars = 0
+        if batch:
+            self._file.write("".join(batch))
+        self._check_interval()
+
+    def _buffer_full(self) -> bool:
+        if self.buffer_entries is not None and len(self._buffer) >= self.buffer_entries:
+            return True
+        return self.buffer_size is not None and self._buffer_chars >= self.buffer_size
+
+    def _write_buffer(self) -> None:
+        if self._buffer:
+            data = "".join(self._buffer)
+            self._buffer = []
+            self._buffer_chars = 0
+            self._file.write(data)
+
+    def _check_interval(self) -> None:
+        if self.flush_interval is None:
+            return
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._write_buffer()
+        self._last_flush = time.monotonic()
+        try:
+            self._file.flush()
+        except Exception:
+            pass
 
     def __enter__(self) -> "VaultLogWriter":
         return self
 
     def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
-        self.flush()
-        self.close()
+        try:
+            self.flush()
+        finally:
+            self.close()
         return None
 
 
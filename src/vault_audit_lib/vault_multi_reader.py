@@ -0,0 +1,314 @@
+"""Read many audit log files as one time-ordered stream.
+
+Vault rotates its audit files and every node of a cluster writes its
+own, so one investigation spans many `.private_log` and `.gz` files.
+`VaultMultiLogReader` takes paths, directories and glob patterns, reads
+every file and merges them by event time (a k-way `heapq.merge`, so each
+file is consumed incrementally):
+
+    reader = VaultMultiLogReader(["node-*/", "archive/*.gz"], workers=4)
+    for request_id, events in VaultTransactionReader(reader):
+        ...
+
+Because the merged stream feeds one `VaultTransactionReader`, a request
+logged at the end of one file and its response at the start of the next
+are grouped into a single transaction. `VaultTransactionReader` also
+accepts a directory or glob pattern string directly.
+
+With `workers > 1` files are decompressed and parsed in a shared
+process pool. Plain files and gzip files with a seekable
+`GzipCheckpointIndex` are cut into byte ranges, a few of which are
+parsed ahead per file. Other gzip files cannot be split; each is parsed
+by one worker into a temporary spool file of pickled blocks (under
+`tmp_dir`) that the merge then streams back, so memory stays bounded.
+Binary logs are read in the calling process.
+
+Each file is expected to be roughly in time order, as Vault writes them;
+the merge does not reorder events within a file.
+"""
+from __future__ import annotations
+
+import glob
+import heapq
+import os
+import re
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .vault_binary import detect_binary
+from .vault_gzip import GzipCheckpointIndex
+from .vault_json_codec import JSONCodec, get_codec
+from .vault_log_reader import (
+    DEFAULT_CHUNK_SIZE,
+    Prefilter,
+    VaultLogReader,
+    _compile_prefilter,
+    _parse_range,
+    _split_ranges,
+)
+from .vault_time import time_sort_key
+from .vault_transaction_writer import _read_run, _spool_run
+
+# Byte ranges parsed ahead per splittable file in parallel mode.
+DEFAULT_PREFETCH = 2
+# Files next to logs that are never logs themselves.
+SIDECAR_SUFFIXES = (".idx", ".idx-journal", ".gzi", ".gzi.zran")
+
+_GLOB_CHARS = re.compile(r"[*?[]")
+
+
+def expand_log_paths(
+    sources: Union[str, Iterable[str]], pattern: str = "*", recursive: bool = False
+) -> List[str]:
+    """Expand paths, directories and glob patterns into log file paths.
+
+    Directories, including those a glob matches, contribute the regular
+    files matching `pattern` (in subdirectories too with `recursive`),
+    except index sidecars. The
+    result is sorted and free of duplicates; a source that matches
+    nothing raises `FileNotFoundError`.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    sub = os.path.join("**", pattern) if recursive else pattern
+    paths: Dict[str, None] = {}
+    for source in sources:
+        source = str(source)
+        if _GLOB_CHARS.search(source) and not os.path.exists(source):
+            matches = sorted(glob.glob(source, recursive=recursive))
+        else:
+            matches = [source]
+        found = []
+        for match in matches:
+            if os.path.isdir(match):
+                found.extend(glob.glob(os.path.join(match, sub), recursive=recursive))
+            else:
+                found.append(match)
+        found = [
+            p for p in found if os.path.isfile(p) and not p.endswith(SIDECAR_SUFFIXES)
+        ]
+        if not found:
+            raise FileNotFoundError(f"no audit log files match {source!r}")
+        for p in found:
+            paths[os.path.normpath(p)] = None
+    return sorted(paths)
+
+
+def is_multi_source(source: str) -> bool:
+    """True if `source` names a directory or an unmatched-as-file glob."""
+    return os.path.isdir(source) or (
+        _GLOB_CHARS.search(source) is not None and not os.path.exists(source)
+    )
+
+
+def _splittable(path: str) -> bool:
+    if not path.endswith(".gz"):
+        return True
+    idx = GzipCheckpointIndex(path)
+    return idx.load() and idx.seekable
+
+
+def _spool_file(path: str, options: Dict[str, Any], run_dir: str) -> str:
+    """Parse a whole file into a spool of pickled blocks (worker entry point)."""
+    return _spool_run(VaultLogReader(path, **options), run_dir)
+
+
+class _RangeStream:
+    """Entries of a splittable file, parsed range by range in the pool."""
+
+    def __init__(
+        self,
+        pool: ProcessPoolExecutor,
+        path: str,
+        chunk_size: int,
+        prefetch: int,
+        args: Sequence[Any],
+    ) -> None:
+        self._pool = pool
+        self._path = path
+        self._args = args
+        self._ranges = iter(_split_ranges(path, chunk_size))
+        self._pending: Deque["Future[List[Any]]"] = deque()
+        for _ in range(max(1, prefetch)):
+            self._submit()
+
+    def _submit(self) -> None:
+        for start, end, line_start in self._ranges:
+            self._pending.append(
+                self._pool.submit(
+                    _parse_range, self._path, start, end, line_start, *self._args
+                )
+            )
+            return
+
+    def __iter__(self) -> Iterator[Any]:
+        while self._pending:
+            entries = self._pending.popleft().result()
+            self._submit()
+            yield from entries
+
+    def cancel(self) -> None:
+        for fut in self._pending:
+            fut.cancel()
+
+
+class _SpoolStream:
+    """Entries of a file parsed in one worker task into a spool file."""
+
+    def __init__(self, future: "Future[str]") -> None:
+        self._future = future
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from _read_run(self._future.result())
+
+    def cancel(self) -> None:
+        self._future.cancel()
+
+
+class VaultMultiLogReader:
+    """Read several audit log files as one stream merged by event time.
+
+    Parameters
+    - `sources`: a path, directory or glob pattern, or a list of them
+       (see `expand_log_paths`).
+    - `pattern`, `recursive`: how directories are searched.
+    - `workers`: when greater than 1, parse files in that many worker
+       processes; otherwise files are read in this process.
+    - `chunk_size`: approximate bytes per parsed range in parallel mode.
+    - `prefetch`: ranges parsed ahead per file in parallel mode.
+    - `merge`: True to merge files by `time_key`; False to read them one
+       after the other, least recently modified first.
+    - `time_key`: top-level key holding the event time.
+    - `tmp_dir`: directory for spool files of unsplittable gzip files.
+    - `fields`, `prefilter`, `codec`, `compact`, `keep_raw`: as for
+       `VaultLogReader`, applied to every file.
+
+    `paths` lists the files that are read. Events without a parsable
+    time (and non-JSON lines) are yielded as soon as they reach the head
+    of their file.
+    """
+
+    def __init__(
+        self,
+        sources: Union[str, Iterable[str]],
+        pattern: str = "*",
+        recursive: bool = False,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        prefetch: int = DEFAULT_PREFETCH,
+        merge: bool = True,
+        time_key: str = "time",
+        tmp_dir: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        prefilter: Optional[Prefilter] = None,
+        codec: Union[str, JSONCodec, None] = None,
+        compact: bool = False,
+        keep_raw: bool = False,
+    ) -> None:
+        self.paths = expand_log_paths(sources, pattern, recursive)
+        if not merge:
+            self.paths.sort(key=os.path.getmtime)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+        self.merge = merge
+        self.time_key = time_key
+        self.tmp_dir = tmp_dir
+        self.fields = list(fields) if fields is not None else None
+        self.prefilter = prefilter
+        self.codec = get_codec(codec)
+        self.compact = compact
+        self.keep_raw = keep_raw
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.read()
+
+    def read(self) -> Iterator[Any]:
+        """Yield the entries of all files, merged by time if `merge`."""
+        fields = self.fields
+        # the merge needs the time even when the projection drops it
+        drop_time = self.merge and fields is not None and self.time_key not in fields
+        if drop_time:
+            fields = fields + [self.time_key]  # type: ignore[operator]
+        options: Dict[str, Any] = {
+            "fields": fields,
+            "prefilter": self.prefilter,
+            "codec": self.codec,
+            "compact": self.compact,
+            "keep_raw": self.keep_raw,
+        }
+        streams: List[Any] = []
+        pool: Optional[ProcessPoolExecutor] = None
+        run_dir: Optional[str] = None
+        try:
+            if self.workers and self.workers > 1:
+                pool = ProcessPoolExecutor(max_workers=self.workers)
+                run_dir = tempfile.mkdtemp(prefix="vault-multi-", dir=self.tmp_dir)
+                for path in self.paths:
+                    streams.append(self._parallel_stream(path, pool, run_dir, options))
+            else:
+                streams = [VaultLogReader(path, **options) for path in self.paths]
+
+            entries: Iterator[Any]
+            if self.merge:
+                time_key = self.time_key
+
+                def merge_key(entry: Any) -> int:
+                    return time_sort_key(entry, time_key)
+
+                entries = heapq.merge(*streams, key=merge_key)
+            else:
+                entries = (e for stream in streams for e in stream)
+            if not drop_time:
+                yield from entries
+                return
+            for entry in entries:
+                if isinstance(entry, dict):
+                    entry.pop(self.time_key, None)
+                yield entry
+        finally:
+            for stream in streams:
+                cancel = getattr(stream, "cancel", None)
+                if cancel is not None:
+                    cancel()
+            if pool is not None:
+                pool.shutdown(wait=True)
+            if run_dir is not None:
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+    def _parallel_stream(
+        self,
+        path: str,
+        pool: ProcessPoolExecutor,
+        run_dir: str,
+        options: Dict[str, Any],
+    ) -> Iterable[Any]:
+        """Start parsing `path` in `pool`; return its entry stream."""
+        if detect_binary(path) is not None:
+            return VaultLogReader(path, **options)
+        if _splittable(path):
+            args = (
+                options["fields"],
+                _compile_prefilter(options["prefilter"]),
+                options["codec"],
+                options["compact"],
+                options["keep_raw"],
+            )
+            return _RangeStream(pool, path, self.chunk_size, self.prefetch, args)
+        return _SpoolStream(pool.submit(_spool_file, path, options, run_dir))
+
+
+__all__ = ["VaultMultiLogReader", "expand_log_paths", "is_multi_source"]
@@ -0,0 +1,85 @@
+"""Decoded events that remember their original line.
+
+Copy and filter pipelines (`print_filter_clienttoken.py --out`,
+`print_error_transactions.py --out`) decode every event only to encode
+the matching ones again, which costs a second pass over each event and
+changes the bytes (spacing, key order, escapes). `RawEvent` is a plain
+`dict` subclass carrying the line it was decoded from in `raw`;
+`VaultLogReader(path, keep_raw=True)` yields them, and `VaultLogWriter`
+writes `raw` instead of serializing the dict, so the output lines are
+byte-identical to the input ones:
+
+    reader = VaultTransactionReader(path, keep_raw=True)
+    with VaultTransactionWriter("errors.log") as out:
+        for request_id, events in reader:
+            if keep.match(events):
+                out.write_transaction(request_id, events)
+
+Assigning, deleting or updating a top-level key drops `raw` (sets it to
+None), and the event is serialized as usual from then on. Changes inside
+nested values are not detected: after editing `event["request"][...]`,
+set `event.raw = None` yourself.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+
+class RawEvent(dict):
+    """A decoded event (`dict`) plus the JSON line it came from.
+
+    Parameters
+    - `entry`: the decoded event (copied, like `dict(entry)`).
+    - `raw`: its line without the trailing newline, or None.
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, entry: Any = (), raw: Optional[str] = None) -> None:
+        super().__init__(entry)
+        self.raw = raw
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.raw = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self.raw = None
+        super().__delitem__(key)
+
+    def __ior__(self, other: Any) -> "RawEvent":
+        self.raw = None
+        return super().__ior__(other)  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        self.raw = None
+        super().clear()
+
+    def pop(self, *args: Any) -> Any:
+        self.raw = None
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[Any, Any]:
+        self.raw = None
+        return super().popitem()
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key not in self:
+            self.raw = None
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self.raw = None
+        super().update(*args, **kwargs)
+
+    def copy(self) -> "RawEvent":
+        return RawEvent(self, self.raw)
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Dict[Any, Any], Optional[str]]]:
+        return RawEvent, (dict(self), self.raw)
+
+    def __repr__(self) -> str:
+        return f"RawEvent({dict.__repr__(self)})"
+
+
+__all__ = ["RawEvent"]
@@ -0,0 +1,357 @@
+"""Write a log as a series of rotated, compressed segments with a manifest.
+
+`VaultRotatingWriter` has the `write`/`writelines`/`flush`/`close`
+interface of `VaultLogWriter` but starts a new segment file once the
+current one reaches `max_bytes` (uncompressed characters), `max_entries`
+entries, or when an event falls into a later time `window` than the
+segment's. Windows are aligned to the epoch and measured in event time
+(`time_key`), not wall-clock time, so re-running a job over old logs
+produces the same segments.
+
+    with VaultRotatingWriter("out/reduced.log", window=3600) as out:
+        out.writelines(reader)
+    # out/reduced.00000.log.gz, out/reduced.00001.log.gz, ...
+    # out/reduced.log.manifest.json
+
+Closed segments are gzip-compressed by a background thread, so the
+caller keeps writing meanwhile. The manifest, a JSON file rewritten
+atomically whenever a segment is closed or compressed, lists for every
+segment its file name, entry count, size as written (and after
+compression) and the smallest and largest event time.
+`manifest_paths(manifest, start, end)` returns the segments that may
+hold events of a time window, so readers skip the others:
+
+    paths = manifest_paths("out/reduced.log.manifest.json", start, end)
+    for entry in VaultMultiLogReader(paths):
+        ...
+
+Appending (`mode="a"`) to an existing manifest continues its numbering.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .vault_binary import is_binary_path
+from .vault_log_writer import VaultLogWriter
+from .vault_time import NS_PER_SECOND, TimeLike, event_time_ns, parse_time_ns
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+_STOP = None
+
+
+def _segment_name(base_name: str, index: int) -> str:
+    """`reduced.log` -> `reduced.00003.log` (suffixes kept after the index)."""
+    stem, dot, rest = base_name.partition(".")
+    if not stem:  # dotfile such as `.private_log`
+        stem, dot, rest = base_name, "", ""
+    return f"{stem}.{index:05d}{dot}{rest}"
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """Read a manifest written by `VaultRotatingWriter`."""
+    with open(path, "r", encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"unsupported manifest version in {path}")
+    return manifest
+
+
+def manifest_paths(
+    manifest: Union[str, Dict[str, Any]],
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    manifest_dir: Optional[str] = None,
+) -> List[str]:
+    """Paths of the segments that may contain events with `start <= time < end`.
+
+    Parameters
+    - `manifest`: manifest path or loaded manifest.
+    - `start`, `end`: RFC3339 strings, `datetime`s or epoch nanoseconds;
+       either may be None for an open bound.
+    - `manifest_dir`: directory segment names are relative to (default:
+       the manifest's directory).
+
+    Segments holding events without a parsable time are always included.
+    """
+    if isinstance(manifest, str):
+        manifest_dir = manifest_dir or os.path.dirname(manifest)
+        manifest = load_manifest(manifest)
+    lo = None if start is None else parse_time_ns(start)
+    hi = None if end is None else parse_time_ns(end)
+    if (start is not None and lo is None) or (end is not None and hi is None):
+        raise ValueError(f"invalid time bound in manifest_paths({start!r}, {end!r})")
+    paths = []
+    for seg in manifest["segments"]:
+        first, last = seg.get("min_time_ns"), seg.get("max_time_ns")
+        if not seg.get("untimed") and first is not None:
+            if (hi is not None and first >= hi) or (lo is not None and last < lo):
+                continue
+        paths.append(os.path.join(manifest_dir or "", seg["path"]))
+    return paths
+
+
+class _Segment:
+    """Bookkeeping for the segment being written."""
+
+    def __init__(self, index: int, path: str, window: Optional[int]) -> None:
+        self.index = index
+        self.path = path
+        self.window = window
+        self.count = 0
+        self.size = 0
+        self.untimed = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns: Optional[int] = None
+
+    def record(self, base_dir: str) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "path": os.path.relpath(self.path, base_dir),
+            "count": self.count,
+            "bytes": self.size,
+            "min_time_ns": self.min_ns,
+            "max_time_ns": self.max_ns,
+            "untimed": self.untimed,
+            "compressed": self.path.endswith(".gz"),
+        }
+
+
+class VaultRotatingWriter:
+    """Append entries to size-, count- or time-rotated segment files.
+
+    Parameters
+    - `path`: base path; segments are named after it with a five-digit
+       index before the first suffix (`a.log` -> `a.00000.log`).
+    - `mode`: `"a"` continues an existing manifest, `"w"` starts over
+       (existing segment files are overwritten as they are reached).
+    - `max_bytes`: rotate once a segment holds this many uncompressed
+       characters. Not available for binary segments.
+    - `max_entries`: rotate after this many entries.
+    - `window`: seconds per time window; an event in a later window than
+       the segment's first timed event starts a new segment. Events that
+       are out of order into an earlier window stay in the current one.
+    - `time_key`: top-level key holding the event time.
+    - `compress`: gzip closed segments in a background thread (ignored
+       for `.gz` base paths, which are compressed while writing).
+    - `compresslevel`: gzip level for background compression.
+    - `manifest_path`: defaults to `path + ".manifest.json"`.
+    - `writer_options`: further `VaultLogWriter` arguments for segments.
+
+    `segments` lists the manifest records of the closed segments.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "a",
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        window: Optional[float] = None,
+        time_key: str = "time",
+        compress: bool = True,
+        compresslevel: int = 6,
+        manifest_path: Optional[str] = None,
+        **writer_options: Any,
+    ) -> None:
+        if mode not in ("a", "w"):
+            raise ValueError(f"mode must be 'a' or 'w', got {mode!r}")
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.window_ns = int(window * NS_PER_SECOND) if window else None
+        self.time_key = time_key
+        self.compress = compress and not self.path.endswith(".gz")
+        self.compresslevel = compresslevel
+        self.manifest_path = manifest_path or self.path + MANIFEST_SUFFIX
+        # segment paths in the manifest are relative to its directory
+        self.base_dir = os.path.dirname(os.path.abspath(self.manifest_path))
+        self.writer_options = writer_options
+        binary = writer_options.get("binary")
+        if binary is None:
+            binary = is_binary_path(self.path)
+        if max_bytes is not None and binary:
+            raise ValueError("max_bytes does not apply to binary segments")
+
+        self.segments: List[Dict[str, Any]] = []
+        if mode == "a" and os.path.exists(self.manifest_path):
+            self.segments = load_manifest(self.manifest_path)["segments"]
+        self._next_index = max((s["index"] for s in self.segments), default=-1) + 1
+        self._lock = threading.Lock()
+        self._segment: Optional[_Segment] = None
+        self._writer: Optional[VaultLogWriter] = None
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._error_reported = False
+        self._queue: Optional["queue.Queue[Optional[Dict[str, Any]]]"] = None
+        self._thread: Optional[threading.Thread] = None
+        if self.compress:
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(
+                target=self._compress_loop, name="VaultRotatingWriter", daemon=True
+            )
+            self._thread.start()
+
+    # -- writing --------------------------------------------------------
+
+    def write(self, entry: Any) -> None:
+        """Write one entry, rotating first if it does not belong in the segment."""
+        self._raise_error()
+        if self._closed:
+            raise ValueError("write to a closed VaultRotatingWriter")
+        ns = event_time_ns(entry, self.time_key)
+        seg = self._segment
+        if seg is not None and (
+            (self.max_entries is not None and seg.count >= self.max_entries)
+            or (self.max_bytes is not None and seg.size >= self.max_bytes)
+            or (
+                self.window_ns is not None
+                and ns is not None
+                and seg.window is not None
+                and ns // self.window_ns > seg.window
+            )
+        ):
+            self._rotate()
+            seg = None
+        if seg is None:
+            seg = self._open_segment(ns)
+        writer = self._writer
+        assert writer is not None
+        if self.max_bytes is not None:
+            line = writer._serialize(entry)
+            seg.size += len(line)
+            writer.write(line)
+        else:
+            writer.write(entry)
+        seg.count += 1
+        if ns is None:
+            seg.untimed += 1
+        else:
+            if seg.window is None and self.window_ns is not None:
+                seg.window = ns // self.window_ns
+            if seg.min_ns is None or ns < seg.min_ns:
+                seg.min_ns = ns
+            if seg.max_ns is None or ns > seg.max_ns:
+                seg.max_ns = ns
+
+    def writelines(self, entries: Iterable[Any]) -> None:
+        for entry in entries:
+            self.write(entry)
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def rotate(self) -> None:
+        """Close the current segment now; the next write starts a new one."""
+        if self._segment is not None:
+            self._rotate()
+
+    def close(self) -> None:
+        """Close the last segment and wait for pending compression."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._segment is not None:
+                self._rotate()
+        finally:
+            if self._thread is not None:
+                self._queue.put(_STOP)  # type: ignore[union-attr]
+                self._thread.join()
+                self._thread = None
+        self._raise_error()
+
+    def __enter__(self) -> "VaultRotatingWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # -- segments -------------------------------------------------------
+
+    def _open_segment(self, ns: Optional[int]) -> _Segment:
+        index = self._next_index
+        self._next_index += 1
+        name = _segment_name(os.path.basename(self.path), index)
+        path = os.path.join(os.path.dirname(self.path), name)
+        window = ns // self.window_ns if ns is not None and self.window_ns else None
+        self._segment = _Segment(index, path, window)
+        self._writer = VaultLogWriter(path, mode="w", **self.writer_options)
+        return self._segment
+
+    def _rotate(self) -> None:
+        seg, writer = self._segment, self._writer
+        self._segment = self._writer = None
+        assert seg is not None and writer is not None
+        writer.close()
+        seg.size = os.path.getsize(seg.path)
+        record = seg.record(self.base_dir)
+        with self._lock:
+            self.segments.append(record)
+            self._write_manifest()
+        if self._queue is not None:
+            self._queue.put(record)
+
+    def _write_manifest(self) -> None:
+        """Atomically replace the manifest (caller holds `_lock`)."""
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "base": os.path.basename(self.path),
+            "time_key": self.time_key,
+            "segments": sorted(self.segments, key=lambda s: s["index"]),
+        }
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    # -- background compression -----------------------------------------
+
+    def _compress_loop(self) -> None:
+        q = self._queue
+        assert q is not None
+        while True:
+            record = q.get()
+            if record is _STOP:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._compress(record)
+            except BaseException as exc:
+                self._error = exc
+
+    def _compress(self, record: Dict[str, Any]) -> None:
+        src = os.path.join(self.base_dir, record["path"])
+        dst = src + ".gz"
+        with open(src, "rb") as src_fh, gzip.open(
+            dst, "wb", compresslevel=self.compresslevel
+        ) as dst_fh:
+            shutil.copyfileobj(src_fh, dst_fh, 1024 * 1024)
+        os.remove(src)
+        with self._lock:
+            record["path"] = record["path"] + ".gz"
+            record["compressed"] = True
+            record["compressed_bytes"] = os.path.getsize(dst)
+            self._write_manifest()
+
+    def _raise_error(self) -> None:
+        if self._error is not None and not self._error_reported:
+            self._error_reported = True
+            raise self._error
+
+
+__all__ = [
+    "VaultRotatingWriter",
+    "load_manifest",
+    "manifest_paths",
+    "MANIFEST_SUFFIX",
+]
@@ -0,0 +1,357 @@
+"""Receive Vault audit events from a `socket` audit device.
+
+`VaultSocketReceiver` listens on TCP, UDP or a Unix socket, frames the
+incoming newline-delimited JSON and yields the decoded events, so it can
+stand in for a `VaultLogReader` anywhere in a pipeline:
+
+    with VaultSocketReceiver(port=9090) as receiver:
+        keep = field("error").exists()
+        with VaultLogWriter("errors.log") as out:
+            for request_id, events in VaultTransactionReader(receiver):
+                if keep.match(events):
+                    out.writelines(events)
+
+One background thread multiplexes all sockets with `selectors`. Each
+stream connection keeps its own buffer, so lines split across packets or
+interleaved between connections are reassembled correctly. Decoded
+events go through a bounded queue; while it is full the thread stops
+reading, so TCP and Unix-socket senders are slowed down by the kernel
+instead of the receiver growing without limit (UDP has no such
+feedback: the kernel drops datagrams). `counters` reports what happened.
+
+`replay_log` sends a log file to such a socket at a given rate, for
+testing pipelines without a Vault server.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import queue
+import selectors
+import socket
+import threading
+import time
+from typing import IO, Any, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+from .vault_json_codec import JSONCodec
+from .vault_log_reader import Prefilter, _compile_prefilter, _line_decoder
+
+PROTOCOLS = ("tcp", "udp", "unix")
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_MAX_LINE = 16 * 1024 * 1024
+_READ_SIZE = 256 * 1024
+_POLL = 0.2
+
+_END = object()
+
+
+class _Connection:
+    """Per-connection framing state."""
+
+    __slots__ = ("sock", "buffer", "discarding")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.buffer = bytearray()
+        # True while skipping the rest of an oversized line
+        self.discarding = False
+
+
+class VaultSocketReceiver:
+    """Iterable of events received on a socket audit-device endpoint.
+
+    Parameters
+    - `host`, `port`: address for `"tcp"`/`"udp"` (`port=0` picks a free
+       port; see `address` after `start()`).
+    - `path`: Unix socket path for `"unix"` (removed again on close).
+    - `protocol`: `"tcp"`, `"udp"` or `"unix"`.
+    - `queue_size`: decoded events buffered for the consumer.
+    - `max_line`: longest accepted line in bytes; longer ones are dropped
+       and counted as `oversized`.
+    - `fields`, `prefilter`, `codec`: as for `VaultLogReader`.
+
+    `counters` holds `connections`, `bytes`, `datagrams`, `events`,
+    `raw_lines` (non-JSON lines, yielded as strings), `filtered` (lines
+    rejected by `prefilter`), `oversized` and `backpressure_waits` (times
+    reading paused on a full queue).
+    Iteration ends after `close()` once the queue is drained; events
+    still unqueued when closing are dropped.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: Optional[str] = None,
+        protocol: str = "tcp",
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_line: int = DEFAULT_MAX_LINE,
+        fields: Optional[Sequence[str]] = None,
+        prefilter: Optional[Prefilter] = None,
+        codec: Union[str, JSONCodec, None] = None,
+    ) -> None:
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"protocol must be one of {PROTOCOLS}, got {protocol!r}")
+        if protocol == "unix" and not path:
+            raise ValueError("protocol 'unix' requires a socket path")
+        self.host = host
+        self.port = port
+        self.path = path
+        self.protocol = protocol
+        self.max_line = max_line
+        self.address: Any = None
+        self.counters: Dict[str, int] = dict.fromkeys(
+            (
+                "connections",
+                "bytes",
+                "datagrams",
+                "events",
+                "raw_lines",
+                "filtered",
+                "oversized",
+                "backpressure_waits",
+            ),
+            0,
+        )
+        self._decode = _line_decoder(fields, codec)
+        self._needles = _compile_prefilter(prefilter) or ()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._closed = False
+
+    # -- lifecycle ------------------------------------------------------
+
+    def start(self) -> "VaultSocketReceiver":
+        if self.protocol == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self.path)
+        else:
+            kind = socket.SOCK_DGRAM if self.protocol == "udp" else socket.SOCK_STREAM
+            family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+            sock = socket.socket(family, kind)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port))
+        if self.protocol != "udp":
+            sock.listen(128)
+        sock.setblocking(False)
+        self._sock = sock
+        self.address = sock.getsockname()
+        self._thread = threading.Thread(
+            target=self._run, name="VaultSocketReceiver", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop receiving; iteration ends once queued events are consumed."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        self._closed = True
+        try:
+            self._queue.put_nowait(_END)
+        except queue.Full:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of `counters`."""
+        return dict(self.counters)
+
+    def __enter__(self) -> "VaultSocketReceiver":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        q = self._queue
+        while True:
+            try:
+                item = q.get(timeout=_POLL)
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            if item is _END:
+                return
+            yield item
+
+    # -- receiving ------------------------------------------------------
+
+    def _run(self) -> None:
+        sock = self._sock
+        assert sock is not None
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ, None)
+        try:
+            while not self._stopping.is_set():
+                for key, _mask in sel.select(_POLL):
+                    if key.data is not None:
+                        self._read_stream(sel, key.data)
+                    elif self.protocol == "udp":
+                        self._read_datagram(sock)
+                    else:
+                        self._accept(sel, sock)
+        finally:
+            for key in list(sel.get_map().values()):
+                key.fileobj.close()  # type: ignore[union-attr]
+            sel.close()
+            if self.protocol == "unix" and self.path:
+                try:
+                    os.unlink(self.path)
+                except OSError:
+                    pass
+
+    def _accept(self, sel: selectors.BaseSelector, sock: socket.socket) -> None:
+        try:
+            conn, _addr = sock.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        conn.setblocking(False)
+        sel.register(conn, selectors.EVENT_READ, _Connection(conn))
+        self.counters["connections"] += 1
+
+    def _read_stream(self, sel: selectors.BaseSelector, conn: _Connection) -> None:
+        try:
+            data = conn.sock.recv(_READ_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            sel.unregister(conn.sock)
+            conn.sock.close()
+            if conn.buffer and not conn.discarding:
+                self._emit(bytes(conn.buffer))
+            return
+        self.counters["bytes"] += len(data)
+        buf = conn.buffer
+        buf += data
+        end = buf.rfind(b"\n")
+        if end < 0:
+            if len(buf) > self.max_line:
+                self.counters["oversized"] += 0 if conn.discarding else 1
+                conn.discarding = True
+                buf.clear()
+            return
+        lines = bytes(buf[:end]).split(b"\n")
+        del buf[: end + 1]
+        if conn.discarding:
+            # the first line is the tail of an oversized one
+            lines = lines[1:]
+            conn.discarding = False
+        for line in lines:
+            self._emit(line)
+
+    def _read_datagram(self, sock: socket.socket) -> None:
+        try:
+            data, _addr = sock.recvfrom(65535)
+        except (BlockingIOError, InterruptedError):
+            return
+        self.counters["datagrams"] += 1
+        self.counters["bytes"] += len(data)
+        for line in data.split(b"\n"):
+            self._emit(line)
+
+    def _emit(self, raw: bytes) -> None:
+        line = raw.strip()
+        if not line:
+            return
+        if len(line) > self.max_line:
+            self.counters["oversized"] += 1
+            return
+        if not all(n in line for n in self._needles):
+            self.counters["filtered"] += 1
+            return
+        entry = self._decode(line)
+        if isinstance(entry, str):
+            self.counters["raw_lines"] += 1
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # stop reading until the consumer catches up
+            self.counters["backpressure_waits"] += 1
+            while True:
+                try:
+                    self._queue.put(entry, timeout=_POLL)
+                    break
+                except queue.Full:
+                    if self._stopping.is_set():
+                        return
+        self.counters["events"] += 1
+
+
+def _open_lines(path: str) -> IO[bytes]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    return open(path, "rb")
+
+
+def replay_log(
+    log_path: str,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    path: Optional[str] = None,
+    protocol: str = "tcp",
+    rate: Optional[float] = None,
+    batch: int = 100,
+) -> int:
+    """Send the lines of `log_path` to a socket audit endpoint.
+
+    Parameters
+    - `log_path`: audit log to replay (plain or `.gz`).
+    - `host`, `port`, `path`, `protocol`: the receiving endpoint, as for
+       `VaultSocketReceiver`.
+    - `rate`: events per second (default: as fast as possible).
+    - `batch`: lines sent per `sendall` on stream sockets; UDP sends one
+       datagram per line.
+
+    Returns the number of lines sent.
+    """
+    if protocol not in PROTOCOLS:
+        raise ValueError(f"protocol must be one of {PROTOCOLS}, got {protocol!r}")
+    target: Union[str, Tuple[str, int]]
+    if protocol == "unix":
+        if not path:
+            raise ValueError("protocol 'unix' requires a socket path")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        target = path
+    else:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        kind = socket.SOCK_DGRAM if protocol == "udp" else socket.SOCK_STREAM
+        sock = socket.socket(family, kind)
+        target = (host, port)
+    batch = max(1, batch)
+    sent = 0
+    started = time.monotonic()
+    with sock, _open_lines(log_path) as fh:
+        if protocol != "udp":
+            sock.connect(target)
+        pending = []
+        for line in fh:
+            if not line.strip():
+                continue
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            if protocol == "udp":
+                sock.sendto(line, target)
+            else:
+                pending.append(line)
+                if len(pending) >= batch:
+                    sock.sendall(b"".join(pending))
+                    pending = []
+            sent += 1
+            if rate and sent % batch == 0:
+                delay = started + sent / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        if pending:
+            sock.sendall(b"".join(pending))
+    return sent
+
+
+__all__ = ["VaultSocketReceiver", "replay_log"]
@@ -0,0 +1,394 @@
+"""Split transactions into one output file per value of a field.
+
+`split_by` generalizes the `split_by_entity.py` / `split_by_clienttoken.py`
+examples for logs with many distinct keys:
+
+    counts = split_by("audit.log", "auth.entity_id", "out/")
+
+- Output writers live in an LRU pool of at most `max_open` files; a file
+  evicted from the pool is reopened in append mode when its key shows up
+  again, so the number of keys is not limited by file descriptors.
+- Transactions are buffered per key and appended in batches, so each
+  open/write touches one file for many transactions.
+- With `buckets=N` the split runs in two passes: transactions are first
+  hash-partitioned into N temporary bucket files of pickled records
+  (so compact and raw events come back unchanged), then each bucket is
+  split on its own. A bucket holds about 1/N of the keys, so its writers
+  fit in the pool. With `workers > 1` the buckets are split in parallel
+  worker processes; keys never span buckets, so workers never share an
+  output file.
+- With `checkpoint_path` a single-pass split records a `ScanCheckpoint`
+  every `checkpoint_interval` seconds. Running the same call again after
+  a crash truncates the outputs back to the checkpoint and continues
+  from its input offset instead of starting over.
+
+The result maps each key to its transaction count (`None` for
+transactions without the key), like the summary the examples print.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .vault_checkpoint import DEFAULT_INTERVAL, ScanCheckpoint
+from .vault_event_filter import _MISSING, _compile_getter
+from .vault_json_codec import JSONCodec
+from .vault_transaction_reader import VaultTransactionReader
+from .vault_transaction_writer import VaultTransactionWriter, _read_run
+
+DEFAULT_MAX_OPEN = 256
+DEFAULT_BATCH_SIZE = 64
+# Transactions buffered across all keys before every batch is written.
+DEFAULT_MAX_PENDING = 10_000
+# Transactions pickled together per bucket in the first pass.
+_BUCKET_BLOCK = 64
+
+_Transaction = Tuple[str, List[Any]]
+# (output file name, request id, entries)
+_Routed = Tuple[str, str, List[Any]]
+
+
+def sanitized_filename(key: str) -> str:
+    """Return `key` as a file name: unsafe characters become `_`, max 200."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", key)[:200]
+
+
+def _compile_key(key_path: str) -> Callable[[Iterable[Any]], Optional[str]]:
+    get = _compile_getter(key_path)
+
+    def key_of(entries: Iterable[Any]) -> Optional[str]:
+        for entry in entries:
+            value = get(entry)
+            if value is not _MISSING and isinstance(value, str) and value:
+                return value
+        return None
+
+    return key_of
+
+
+def transaction_key(entries: Iterable[Any], key_path: str) -> Optional[str]:
+    """Return the first non-empty string value of dotted `key_path`, or None."""
+    return _compile_key(key_path)(entries)
+
+
+class _WriterPool:
+    """At most `max_open` open `VaultTransactionWriter`s, evicted LRU."""
+
+    def __init__(
+        self,
+        out_dir: str,
+        mode: str,
+        max_open: int,
+        writer_options: Dict[str, Any],
+        checkpoint: Optional[ScanCheckpoint] = None,
+    ) -> None:
+        self.out_dir = out_dir
+        self.mode = mode
+        self.max_open = max(1, max_open)
+        self.writer_options = writer_options
+        self.checkpoint = checkpoint
+        self._open: "OrderedDict[str, VaultTransactionWriter]" = OrderedDict()
+        # files opened before: reopened in append mode after eviction
+        self._created: Set[str] = set()
+
+    def get(self, name: str) -> VaultTransactionWriter:
+        writer = self._open.get(name)
+        if writer is not None:
+            self._open.move_to_end(name)
+            return writer
+        if len(self._open) >= self.max_open:
+            _name, oldest = self._open.popitem(last=False)
+            oldest.close()
+        path = os.path.join(self.out_dir, name)
+        if name in self._created:
+            mode = "a"
+        else:
+            mode = self.mode
+            if self.checkpoint is not None:
+                self.checkpoint.track_output(path)
+        writer = VaultTransactionWriter(path, mode=mode, **self.writer_options)
+        self._created.add(name)
+        self._open[name] = writer
+        return writer
+
+    def flush(self) -> None:
+        for writer in self._open.values():
+            writer.flush()
+
+    def close(self) -> None:
+        error: Optional[BaseException] = None
+        while self._open:
+            _name, writer = self._open.popitem(last=False)
+            try:
+                writer.close()
+            except Exception as exc:
+                error = error or exc
+        if error is not None:
+            raise error
+
+
+def _write_split(
+    routed: Iterable[_Routed],
+    out_dir: str,
+    mode: str,
+    max_open: int,
+    batch_size: int,
+    max_pending: int,
+    writer_options: Dict[str, Any],
+    checkpoint: Optional[ScanCheckpoint] = None,
+) -> None:
+    """Append each routed transaction to its file, batched per file.
+
+    With `checkpoint`, every save first writes out the pending batches and
+    flushes the open files, and a resumed split reopens the files it had
+    already written in append mode.
+    """
+    pool = _WriterPool(out_dir, mode, max_open, writer_options, checkpoint)
+    pending: Dict[str, List[_Transaction]] = {}
+    npending = 0
+
+    def write_batch(name: str) -> None:
+        writer = pool.get(name)
+        for request_id, entries in pending.pop(name):
+            writer.write_transaction(request_id, entries)
+
+    if checkpoint is not None:
+        if checkpoint.state is not None:
+            pool._created.update(checkpoint.state["split_created"])
+
+        def save_outputs(state: Dict[str, Any]) -> None:
+            nonlocal npending
+            for name in list(pending):
+                write_batch(name)
+            npending = 0
+            pool.flush()
+            state["split_created"] = sorted(pool._created)
+
+        checkpoint.add_hook(save_outputs)
+
+    try:
+        for name, request_id, entries in routed:
+            batch = pending.get(name)
+            if batch is None:
+                batch = pending[name] = []
+            batch.append((request_id, entries))
+            npending += 1
+            if len(batch) >= batch_size:
+                npending -= len(batch)
+                write_batch(name)
+            elif npending >= max_pending:
+                for name in list(pending):
+                    write_batch(name)
+                npending = 0
+        for name in list(pending):
+            write_batch(name)
+    finally:
+        pool.close()
+
+
+def _split_bucket(
+    path: str,
+    out_dir: str,
+    mode: str,
+    max_open: int,
+    batch_size: int,
+    max_pending: int,
+    writer_options: Dict[str, Any],
+) -> None:
+    """Second pass: split one bucket file (run in a worker process).
+
+    Bucket files use the run-file format of `VaultTransactionWriter`;
+    `_read_run` removes the file once it is exhausted.
+    """
+    _write_split(
+        _read_run(path),
+        out_dir,
+        mode,
+        max_open,
+        batch_size,
+        max_pending,
+        writer_options,
+    )
+
+
+def split_by(
+    source: Union[str, Iterable[_Transaction]],
+    key_path: str,
+    out_dir: str,
+    mode: str = "a",
+    max_open: int = DEFAULT_MAX_OPEN,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_pending: int = DEFAULT_MAX_PENDING,
+    buckets: Optional[int] = None,
+    workers: int = 1,
+    tmp_dir: Optional[str] = None,
+    missing_name: Optional[str] = None,
+    codec: Union[str, JSONCodec, None] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_interval: float = DEFAULT_INTERVAL,
+    **writer_options: Any,
+) -> Dict[Optional[str], int]:
+    """Write each transaction of `source` to a file named after its key.
+
+    Parameters
+    - `source`: log path or iterable of `(request_id, entries)`, e.g. a
+       `VaultTransactionReader` over a parallel `VaultLogReader`.
+    - `key_path`: dotted field, e.g. `"auth.entity_id"`; the first event
+       of a transaction carrying it as a non-empty string decides the key.
+    - `out_dir`: output directory (created if needed). Files are named
+       `sanitized_filename(key) + ".jsonl"`.
+    - `mode`: `"a"` to append to existing files, `"w"` to overwrite.
+    - `max_open`: cap on open output files (shared by all workers).
+    - `batch_size`: transactions buffered per file before it is written;
+       at most `max_pending` transactions are buffered in total.
+    - `buckets`: split in two passes through this many temporary bucket
+       files under `tmp_dir` (default: `workers` if `workers > 1`).
+    - `workers`: processes splitting buckets in parallel.
+    - `missing_name`: file for transactions without the key (default
+       `error_no_<last key segment>.json`).
+    - `codec`: unused, kept for compatibility; bucket files hold pickled
+       records, so compact and raw events pass through unchanged.
+    - `checkpoint_path`: checkpoint file for resuming an interrupted
+       split of a log path (see `ScanCheckpoint`); saved every
+       `checkpoint_interval` seconds and removed once the split is done.
+       Not available with `buckets` or `workers`.
+    - `writer_options`: further `VaultLogWriter` arguments.
+
+    Returns a dict of transaction counts per key in first-seen order,
+    with `None` counting transactions without the key.
+    """
+    if mode not in ("a", "w"):
+        raise ValueError(f"mode must be 'a' or 'w', got {mode!r}")
+    if missing_name is None:
+        missing_name = f"error_no_{key_path.rsplit('.', 1)[-1]}.json"
+    if buckets is None and workers > 1:
+        buckets = workers
+    os.makedirs(out_dir, exist_ok=True)
+    counts: Dict[Optional[str], int] = {}
+    checkpoint: Optional[ScanCheckpoint] = None
+    if checkpoint_path is not None:
+        if not isinstance(source, str):
+            raise ValueError("checkpoint_path requires a log file path as source")
+        if buckets and buckets > 1:
+            raise ValueError("checkpoint_path does not apply to buckets or workers")
+        checkpoint = ScanCheckpoint(checkpoint_path, checkpoint_interval)
+        checkpoint.restore_outputs()
+        if checkpoint.state is not None:
+            counts.update(checkpoint.state["split_counts"])
+
+        def save_counts(state: Dict[str, Any]) -> None:
+            state["split_counts"] = dict(counts)
+
+        checkpoint.add_hook(save_counts)
+    transactions = (
+        VaultTransactionReader(source, checkpoint=checkpoint)
+        if isinstance(source, str)
+        else source
+    )
+    names: Dict[Optional[str], str] = {None: missing_name}
+    key_of = _compile_key(key_path)
+
+    def route() -> Iterator[_Routed]:
+        for request_id, entries in transactions:
+            entries = list(entries)
+            key = key_of(entries)
+            counts[key] = counts.get(key, 0) + 1
+            name = names.get(key)
+            if name is None:
+                name = names[key] = sanitized_filename(key) + ".jsonl"  # type: ignore
+            yield name, request_id, entries
+
+    if not buckets or buckets <= 1:
+        _write_split(
+            route(),
+            out_dir,
+            mode,
+            max_open,
+            batch_size,
+            max_pending,
+            writer_options,
+            checkpoint,
+        )
+        if checkpoint is not None:
+            checkpoint.clear()
+        return counts
+
+    run_dir = tempfile.mkdtemp(prefix="vault-split-", dir=tmp_dir)
+    try:
+        # pass 1: partition by file name, so names that collide after
+        # sanitizing still land in the same bucket
+        paths = [os.path.join(run_dir, f"bucket-{i:05d}") for i in range(buckets)]
+        files: List[IO[bytes]] = []
+        blocks: List[List[_Routed]] = [[] for _ in paths]
+        try:
+            for p in paths:
+                files.append(open(p, "wb"))
+            for record in route():
+                bucket = zlib.crc32(record[0].encode("utf-8")) % buckets
+                block = blocks[bucket]
+                block.append(record)
+                if len(block) >= _BUCKET_BLOCK:
+                    pickle.dump(block, files[bucket], pickle.HIGHEST_PROTOCOL)
+                    blocks[bucket] = []
+            for fh, block in zip(files, blocks):
+                if block:
+                    pickle.dump(block, fh, pickle.HIGHEST_PROTOCOL)
+        finally:
+            for fh in files:
+                fh.close()
+
+        # pass 2: split each bucket
+        if workers > 1:
+            per_worker = max(1, max_open // workers)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(
+                        _split_bucket,
+                        p,
+                        out_dir,
+                        mode,
+                        per_worker,
+                        batch_size,
+                        max_pending,
+                        writer_options,
+                    )
+                    for p in paths
+                ]
+                for fut in futures:
+                    fut.result()
+        else:
+            for p in paths:
+                _split_bucket(
+                    p,
+                    out_dir,
+                    mode,
+                    max_open,
+                    batch_size,
+                    max_pending,
+                    writer_options,
+                )
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return counts
+
+
+__all__ = ["split_by", "transaction_key", "sanitized_filename"]
@@ -0,0 +1,181 @@
+"""Event timestamps as integer epoch nanoseconds.
+
+Vault writes RFC3339 timestamps (`2024-05-01T12:00:00.123456789Z`), and
+comparing them as strings breaks as soon as two events differ in
+fractional precision or carry different UTC offsets. `parse_time_ns`
+turns such a value into one integer, epoch nanoseconds in UTC, that
+orders correctly and compares cheaply:
+
+    parse_time_ns("2024-05-01T12:00:00.5Z")       # 1714564800500000000
+    parse_time_ns("2024-05-01T14:00:00.5+02:00")  # same instant
+
+Parsing slices the fixed-width fields instead of running a regex, and the
+calendar part of each distinct minute (`YYYY-MM-DDTHH:MM`) is converted
+once and cached, since a log holds many events per minute.
+`parse_times_ns` parses a whole batch with the same cache.
+
+Consumers parse each entry once and carry the key alongside it:
+`VaultTransactionWriter` sorts and merges on it, `VaultTransactionReader`
+measures `max_age` with it, and `time_range` filters on it.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .vault_event_filter import VaultEventFilter
+
+NS_PER_SECOND = 1_000_000_000
+# Sort key of entries without a (parsable) time: before every real event.
+MISSING_TIME_NS = -(1 << 63)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MINUTE_CACHE_MAX = 4096
+_minute_cache: Dict[str, int] = {}
+
+TimeLike = Union[str, datetime, int]
+
+
+def _minute_seconds(prefix: str) -> int:
+    """Epoch seconds of the `YYYY-MM-DDTHH:MM` minute `prefix` (cached)."""
+    seconds = _minute_cache.get(prefix)
+    if seconds is None:
+        dt = datetime(
+            int(prefix[0:4]),
+            int(prefix[5:7]),
+            int(prefix[8:10]),
+            int(prefix[11:13]),
+            int(prefix[14:16]),
+            tzinfo=timezone.utc,
+        )
+        seconds = int((dt - _EPOCH).total_seconds())
+        if len(_minute_cache) >= _MINUTE_CACHE_MAX:
+            _minute_cache.clear()
+        _minute_cache[prefix] = seconds
+    return seconds
+
+
+def _parse_offset(tz: str) -> Optional[int]:
+    """Seconds east of UTC for `Z`, `+HH:MM`, `+HHMM` or `""`; None if invalid."""
+    if not tz or tz == "Z" or tz == "z":
+        return 0
+    if tz[0] not in "+-":
+        return None
+    digits = tz[1:3] + (tz[4:6] if len(tz) == 6 and tz[3] == ":" else tz[3:])
+    if len(digits) != 4 or not digits.isdigit():
+        return None
+    offset = int(digits[:2]) * 3600 + int(digits[2:]) * 60
+    return -offset if tz[0] == "-" else offset
+
+
+def _parse_str(s: str) -> Optional[int]:
+    if (
+        len(s) < 19
+        or s[4] != "-"
+        or s[7] != "-"
+        or s[10] not in "Tt "
+        or s[13] != ":"
+        or s[16] != ":"
+        or not s[17:19].isdigit()
+    ):
+        return None
+    try:
+        seconds = _minute_seconds(s[:16]) + int(s[17:19])
+    except ValueError:
+        return None
+    frac_ns = 0
+    pos = 19
+    if pos < len(s) and s[pos] == ".":
+        end = pos + 1
+        while end < len(s) and "0" <= s[end] <= "9":
+            end += 1
+        digits = s[pos + 1 : end]
+        if not digits:
+            return None
+        frac_ns = int(digits[:9].ljust(9, "0"))
+        pos = end
+    offset = _parse_offset(s[pos:])
+    if offset is None:
+        return None
+    return (seconds - offset) * NS_PER_SECOND + frac_ns
+
+
+def parse_time_ns(value: Any) -> Optional[int]:
+    """Return `value` as UTC epoch nanoseconds, or None if it is not a time.
+
+    Accepts RFC3339 strings (`T` or space separator, any fractional
+    precision, `Z`/offset or no zone meaning UTC), `datetime` objects
+    (naive ones are taken as UTC) and ints, which are returned as is.
+    """
+    if isinstance(value, str):
+        return _parse_str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        delta = value - _EPOCH
+        seconds = delta.days * 86400 + delta.seconds
+        return seconds * NS_PER_SECOND + delta.microseconds * 1000
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def parse_times_ns(values: Iterable[Any]) -> List[Optional[int]]:
+    """Parse a batch of timestamps; see `parse_time_ns`."""
+    parse_str = _parse_str
+    return [parse_str(v) if type(v) is str else parse_time_ns(v) for v in values]
+
+
+def event_time_ns(entry: Any, time_key: str = "time") -> Optional[int]:
+    """Return the parsed `time_key` of a dict entry, or None.
+
+    Non-dict events that know their time (`CompactEvent`) are asked for it.
+    """
+    if not isinstance(entry, dict):
+        get_time = getattr(entry, "event_time_ns", None)
+        return None if get_time is None else get_time(time_key)
+    value = entry.get(time_key)
+    if type(value) is str:  # fast path for the common case
+        return _parse_str(value)
+    return parse_time_ns(value)
+
+
+def time_sort_key(entry: Any, time_key: str = "time") -> int:
+    """Integer sort key for `entry`; missing or invalid times sort first."""
+    ns = event_time_ns(entry, time_key)
+    return MISSING_TIME_NS if ns is None else ns
+
+
+def time_range(
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    time_key: str = "time",
+) -> VaultEventFilter:
+    """Filter matching events with `start <= time < end` (either bound optional).
+
+    Bounds may be RFC3339 strings, `datetime` objects or epoch
+    nanoseconds. Events without a parsable time never match.
+    """
+    lo = None if start is None else parse_time_ns(start)
+    hi = None if end is None else parse_time_ns(end)
+    if (start is not None and lo is None) or (end is not None and hi is None):
+        raise ValueError(f"invalid time bound in time_range({start!r}, {end!r})")
+
+    def match_time_range(entry: Any) -> bool:
+        ns = event_time_ns(entry, time_key)
+        if ns is None:
+            return False
+        return (lo is None or ns >= lo) and (hi is None or ns < hi)
+
+    desc = f"{start!r} <= {time_key} < {end!r}"
+    return VaultEventFilter.from_matcher(match_time_range, desc)
+
+
+__all__ = [
+    "parse_time_ns",
+    "parse_times_ns",
+    "event_time_ns",
+    "time_sort_key",
+    "time_range",
+    "MISSING_TIME_NS",
+]
@@ -9,16 +9,73 @@ The reader collects entries keyed by `request.id` and yields a transaction
 when a configurable `is_final` predicate signals completion for that
 request, or when the source hits EOF (remaining buffered transactions are
 yielded).
+
+The buffer of open transactions can be bounded by count (`max_open`),
+approximate size (`max_bytes`) and age in event time (`max_age`). When a
+limit is exceeded the oldest open transaction is either yielded early as
+an `IncompleteTransaction` (`on_limit="emit"`) or spilled to a temporary
+file (`on_limit="spill"`) and merged back when its final event arrives.
+Spilled transactions still age out under `max_age`, and at most
+`max_spilled` of them are kept, so neither the spill index nor the spill
+file grows without bound on a long or followed log.
+
+With `compact=True` (for path sources) or a `VaultLogReader(compact=True)`
+source, buffered events are `CompactEvent`s: the raw line plus a few
+fields, which takes a fraction of the memory of decoded dicts.
+`keep_raw=True` buffers `RawEvent`s, which writers copy out verbatim.
+
+A directory or glob pattern as `source` reads every matching file
+through a time-merging `VaultMultiLogReader`, so transactions that span
+rotated files or nodes are still grouped.
+
+With `checkpoint=ScanCheckpoint(...)` the reader periodically saves its
+input offset and open transactions, and resumes from them when the
+checkpoint exists (see `vault_checkpoint`).
 """
 from __future__ import annotations
 
-from collections import defaultdict, deque
-from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+import glob
+import os
+import tempfile
+from collections import OrderedDict, deque
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
+from .vault_checkpoint import ScanCheckpoint
+from .vault_compact_event import CompactEvent
+from .vault_json_codec import get_codec
+from .vault_log_follower import VaultLogFollower
 from .vault_log_reader import VaultLogReader
+from .vault_multi_reader import VaultMultiLogReader, is_multi_source
+from .vault_raw_event import RawEvent
+from .vault_time import NS_PER_SECOND, event_time_ns
+
+ON_LIMIT_EMIT = "emit"
+ON_LIMIT_SPILL = "spill"
+DEFAULT_MAX_SPILLED = 100_000
+
+# how a spilled entry was stored
+_SPILL_JSON = 0
+_SPILL_COMPACT = 1
+_SPILL_RAW = 2
+# Rewrite the spill file once it is this large and mostly unspilled.
+_SPILL_REWRITE_MIN = 16 * 1024 * 1024
 
 
 def _extract_request_id(entry: Any) -> Optional[str]:
+    if type(entry) is CompactEvent:
+        rid = entry.request_id
+        return rid if isinstance(rid, str) else None
     if not isinstance(entry, dict):
         return None
     # Get entry["request"]["id"] Or None
@@ -31,23 +88,398 @@ def _extract_request_id(entry: Any) -> Optional[str]:
 
 
 def _default_is_final(entry: Any) -> bool:
-    if not isinstance(entry, dict):
+    if type(entry) is CompactEvent:
+        entry_type = entry.type
+    elif isinstance(entry, dict):
+        entry_type = entry.get("type")
+    else:
         return False
-    entry_type = entry.get("type")
     if isinstance(entry_type, str) and entry_type.lower() == "response":
         return True
     return False
 
 
+class IncompleteTransaction(list):
+    """Entries of a transaction yielded without its final event.
+
+    Behaves like the plain list of entries yielded for complete
+    transactions; `incomplete` is always True and `reason` names why the
+    transaction was released (`"max_open"`, `"max_bytes"`, `"max_age"`,
+    `"max_spilled"` or `"eof"`).
+    """
+
+    incomplete = True
+
+    def __init__(self, entries: Iterable[Any] = (), reason: str = "") -> None:
+        super().__init__(entries)
+        self.reason = reason
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class _TransactionBuffer:
+    """Open-transaction buffer with optional count/size/age limits."""
+
+    def __init__(
+        self,
+        is_final: Callable[[Any], bool],
+        max_open: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        on_limit: str = ON_LIMIT_EMIT,
+        spill_dir: Optional[str] = None,
+        time_key: str = "time",
+        max_spilled: Optional[int] = DEFAULT_MAX_SPILLED,
+    ) -> None:
+        self.is_final = is_final
+        self.max_open = max_open
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.on_limit = on_limit
+        self.spill_dir = spill_dir
+        self.time_key = time_key
+        self.max_spilled = max_spilled
+
+        # first-seen order doubles as eviction order
+        self._buffers: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        # event times as epoch nanoseconds (see `vault_time`)
+        self._max_age_ns = (
+            int(max_age * NS_PER_SECOND) if max_age is not None else None
+        )
+        self._started: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._latest: Optional[int] = None
+        self._ready: deque = deque()
+        self._spill: Optional[IO[bytes]] = None
+        self._spill_size = 0
+        # bytes of the spill file still referenced by `_spilled`
+        self._spill_live = 0
+        # (offset, length, `_SPILL_*` kind) per spilled entry; first-spilled
+        # order doubles as expiry order
+        self._spilled: "OrderedDict[str, List[Tuple[int, int, int]]]" = OrderedDict()
+        # start time of spilled transactions, for `max_age`
+        self._spill_started: Dict[str, int] = {}
+        # With a checkpoint, spill to named files `<spill_path>.<n>` that
+        # outlive a crash. The file referenced by the last saved snapshot
+        # is never truncated or rewritten; it is replaced by the next
+        # generation and removed once a later snapshot has been saved.
+        self.spill_path: Optional[str] = None
+        self._spill_gen = 0
+        self._spill_name: Optional[str] = None
+        self._saved_spill: Optional[str] = None
+        self._stale_spills: List[str] = []
+        self._codec = get_codec()
+
+    def add(self, rid: str, entry: Any) -> Iterator[Tuple[str, List[Any]]]:
+        """Buffer `entry` and yield any transactions released by it."""
+        buf = self._buffers.get(rid)
+        if buf is None:
+            buf = self._buffers[rid] = []
+        buf.append(entry)
+
+        if self.max_bytes is not None:
+            size = self._entry_size(entry)
+            self._sizes[rid] = self._sizes.get(rid, 0) + size
+            self._total_bytes += size
+        if self.max_age is not None:
+            ts = event_time_ns(entry, self.time_key)
+            if ts is not None and (self._latest is None or ts > self._latest):
+                self._latest = ts
+            if rid not in self._started:
+                start = ts if ts is not None else self._latest
+                if start is not None:
+                    self._started[rid] = start
+
+        if self.is_final(entry):
+            self._ready.append(rid)
+
+        while self._ready:
+            rid_to_yield = self._ready.popleft()
+            entries = self._pop(rid_to_yield)
+            if rid_to_yield in self._spilled:
+                entries = self._unspill(rid_to_yield) + entries
+            if entries:
+                yield rid_to_yield, entries
+
+        yield from self._enforce_limits()
+
+    def drain(self) -> Iterator[Tuple[str, List[Any]]]:
+        """Yield every remaining transaction (buffered or spilled) as incomplete."""
+        for rid in list(self._buffers):
+            entries = self._pop(rid)
+            if rid in self._spilled:
+                entries = self._unspill(rid) + entries
+            if entries:
+                yield rid, IncompleteTransaction(entries, "eof")
+        for rid in list(self._spilled):
+            entries = self._unspill(rid)
+            if entries:
+                yield rid, IncompleteTransaction(entries, "eof")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Picklable state of the open transactions (requires `spill_path`).
+
+        Spilled entries are not copied: the snapshot names the spill file,
+        its length and the index into it. Call `snapshot_saved()` once the
+        snapshot is stored.
+        """
+        assert self.spill_path is not None
+        if self._spill is not None:
+            self._spill.flush()
+        return {
+            "open": [(rid, list(entries)) for rid, entries in self._buffers.items()],
+            "started": dict(self._started),
+            "latest": self._latest,
+            "spilled": list(self._spilled.items()),
+            "spill_started": dict(self._spill_started),
+            "spill_file": self._spill_name and os.path.basename(self._spill_name),
+            "spill_size": self._spill_size,
+        }
+
+    def snapshot_saved(self) -> None:
+        """Remove spill files that no stored snapshot refers to any more."""
+        self._saved_spill = self._spill_name
+        while self._stale_spills:
+            _remove(self._stale_spills.pop())
+
+    def restore(self, state: Optional[Dict[str, Any]]) -> None:
+        """Load a `snapshot()` into this (empty) buffer, or start fresh.
+
+        The snapshot's spill file is reattached and cut back to its saved
+        length; other spill files under `spill_path` are removed. Limits
+        apply again from the next `add`.
+        """
+        assert self.spill_path is not None
+        name = None
+        if state is not None and state["spill_file"] is not None:
+            name = os.path.join(os.path.dirname(self.spill_path), state["spill_file"])
+        for path in glob.glob(glob.escape(self.spill_path) + ".*"):
+            if path != name:
+                _remove(path)
+        if state is None:
+            return
+        for rid, entries in state["open"]:
+            self._buffers[rid] = list(entries)
+            if self.max_bytes is not None:
+                size = sum(map(self._entry_size, entries))
+                self._sizes[rid] = size
+                self._total_bytes += size
+        self._started.update(state["started"])
+        self._latest = state["latest"]
+        self._spilled.update(state["spilled"])
+        self._spill_started.update(state["spill_started"])
+        if name is not None:
+            self._spill = open(name, "r+b")
+            self._spill.truncate(state["spill_size"])
+            self._spill_name = self._saved_spill = name
+            self._spill_gen = int(name.rsplit(".", 1)[1])
+            self._spill_size = state["spill_size"]
+            self._spill_live = sum(
+                length
+                for locations in self._spilled.values()
+                for _offset, length, _kind in locations
+            )
+
+    def close(self) -> None:
+        """Close the spill file; named spill files stay for a resume."""
+        if self._spill is not None:
+            try:
+                self._spill.close()
+            except Exception:
+                pass
+            self._spill = None
+
+    def _entry_size(self, entry: Any) -> int:
+        if type(entry) is CompactEvent:
+            return len(entry.raw)
+        if type(entry) is RawEvent and entry.raw is not None:
+            return len(entry.raw)
+        return len(self._codec.dumps(entry))
+
+    def _pop(self, rid: str) -> List[Any]:
+        self._total_bytes -= self._sizes.pop(rid, 0)
+        self._started.pop(rid, None)
+        return self._buffers.pop(rid, [])
+
+    def _enforce_limits(self) -> Iterator[Tuple[str, List[Any]]]:
+        while self._buffers:
+            rid = next(iter(self._buffers))
+            if self.max_open is not None and len(self._buffers) > self.max_open:
+                reason = "max_open"
+            elif self.max_bytes is not None and self._total_bytes > self.max_bytes:
+                reason = "max_bytes"
+            elif self._is_expired(self._started.get(rid)):
+                reason = "max_age"
+            else:
+                break
+            started = self._started.get(rid)
+            entries = self._pop(rid)
+            # an expired transaction would only age out of the spill file
+            if self.on_limit == ON_LIMIT_SPILL and reason != "max_age":
+                self._spill_entries(rid, entries, started)
+                continue
+            if rid in self._spilled:
+                entries = self._unspill(rid) + entries
+            yield rid, IncompleteTransaction(entries, reason)
+
+        while self._spilled:
+            rid = next(iter(self._spilled))
+            if self.max_spilled is not None and len(self._spilled) > self.max_spilled:
+                reason = "max_spilled"
+            elif self._is_expired(self._spill_started.get(rid)):
+                reason = "max_age"
+            else:
+                break
+            entries = self._unspill(rid) + self._pop(rid)
+            yield rid, IncompleteTransaction(entries, reason)
+
+    def _is_expired(self, started: Optional[int]) -> bool:
+        if self._max_age_ns is None or self._latest is None or started is None:
+            return False
+        return started < self._latest - self._max_age_ns
+
+    def _spill_entries(
+        self, rid: str, entries: List[Any], started: Optional[int]
+    ) -> None:
+        if self._spill is None:
+            self._spill = self._new_spill_file()
+        locations = self._spilled.setdefault(rid, [])
+        if started is not None:
+            # keep the start of the part spilled first
+            self._spill_started.setdefault(rid, started)
+        self._spill.seek(self._spill_size)
+        for e in entries:
+            if type(e) is CompactEvent:
+                kind, text = _SPILL_COMPACT, e.raw
+            elif type(e) is RawEvent and e.raw is not None:
+                kind, text = _SPILL_RAW, e.raw
+            else:
+                kind, text = _SPILL_JSON, self._codec.dumps(e)
+            data = text.encode("utf-8")
+            locations.append((self._spill_size, len(data), kind))
+            self._spill.write(data)
+            self._spill_size += len(data)
+            self._spill_live += len(data)
+
+    def _unspill(self, rid: str) -> List[Any]:
+        entries = self._read_spilled(rid)
+        locations = self._spilled.pop(rid, [])
+        self._spill_started.pop(rid, None)
+        self._spill_live -= sum(length for _offset, length, _kind in locations)
+        if self._spill is not None:
+            if not self._spilled and not self._spill_is_saved():
+                self._spill.seek(0)
+                self._spill.truncate()
+                self._spill_size = self._spill_live = 0
+            elif not self._spilled:
+                # a stored snapshot still refers to this file
+                assert self._spill_name is not None
+                self._spill.close()
+                self._stale_spills.append(self._spill_name)
+                self._spill = self._spill_name = None
+                self._spill_size = self._spill_live = 0
+            elif (
+                self._spill_size >= _SPILL_REWRITE_MIN
+                and self._spill_live * 4 < self._spill_size
+            ):
+                self._rewrite_spill()
+        return entries
+
+    def _spill_is_saved(self) -> bool:
+        """True if a stored snapshot refers to the current spill file."""
+        return self._spill_name is not None and self._spill_name == self._saved_spill
+
+    def _new_spill_file(self) -> IO[bytes]:
+        if self.spill_path is None:
+            return tempfile.TemporaryFile(
+                mode="w+b", prefix="vault-tx-spill-", dir=self.spill_dir
+            )
+        self._spill_gen += 1
+        self._spill_name = f"{self.spill_path}.{self._spill_gen}"
+        return open(self._spill_name, "w+b")
+
+    def _rewrite_spill(self) -> None:
+        """Copy the still-spilled entries into a fresh, compact spill file."""
+        old, old_name = self._spill, self._spill_name
+        assert old is not None
+        new = self._new_spill_file()
+        pos = 0
+        for rid, locations in self._spilled.items():
+            moved = []
+            for offset, length, kind in locations:
+                old.seek(offset)
+                new.write(old.read(length))
+                moved.append((pos, length, kind))
+                pos += length
+            self._spilled[rid] = moved
+        old.close()
+        if old_name is not None:
+            if old_name == self._saved_spill:
+                self._stale_spills.append(old_name)
+            else:
+                _remove(old_name)
+        self._spill = new
+        self._spill_size = self._spill_live = pos
+
+    def _read_spilled(self, rid: str) -> List[Any]:
+        locations = self._spilled.get(rid)
+        if not locations or self._spill is None:
+            return []
+        entries = []
+        for offset, length, kind in locations:
+            self._spill.seek(offset)
+            data = self._spill.read(length)
+            if kind == _SPILL_COMPACT:
+                entries.append(CompactEvent(data))
+            elif kind == _SPILL_RAW:
+                entries.append(RawEvent(self._codec.loads(data), data.decode("utf-8")))
+            else:
+                entries.append(self._codec.loads(data))
+        return entries
+
+
 class VaultTransactionReader:
     """Group Vault log entries into transactions by `request.id`.
 
     Parameters
     - source: path string, file-like object, or an iterable yielding entries (e.g., `VaultLogReader`).
+      A directory or glob pattern string reads all matching files merged
+      by time (see `VaultMultiLogReader`).
     - is_final: optional callable `entry -> bool` to mark when an entry completes a transaction.
     - close_on_eof: if True, yield any buffered transactions at EOF.
+    - max_open: maximum number of open (not yet final) transactions.
+    - max_bytes: maximum approximate JSON size of all buffered entries.
+    - max_age: maximum age in seconds of an open transaction, measured in
+      event time (`time_key`) against the newest event seen so far.
+    - on_limit: `"emit"` to yield the oldest open transaction early as an
+      `IncompleteTransaction`, or `"spill"` to move it to a temporary file
+      (in `spill_dir`) until its final event arrives or EOF is reached.
+      Transactions that exceed `max_age` are always yielded, spilled or not.
+    - max_spilled: maximum number of spilled transactions; beyond it the
+      oldest is yielded with reason `"max_spilled"`. None for no limit.
+    - time_key: entry key holding the RFC3339 event time.
+    - follow: when `source` is a path, follow the live file with a
+      `VaultLogFollower` (transactions are yielded as their responses are
+      appended); pass a configured `VaultLogFollower` as `source` for
+      checkpoints and other options.
+    - compact: when `source` is a path read without `follow`, buffer
+      `CompactEvent`s instead of decoded dicts.
+    - keep_raw: likewise, buffer `RawEvent`s.
+    - checkpoint: a `ScanCheckpoint` to save the input offset and the
+      open transactions to every `checkpoint.interval` seconds, and to
+      resume from when it holds a saved state. `source` must be a log
+      file path or a `VaultLogReader` over one. Spilled transactions then
+      go to files next to the checkpoint instead of `spill_dir`.
 
-    Yields tuples `(request_id, entries_list)`.
+    Yields tuples `(request_id, entries_list)`. Transactions released
+    without a final event (by a limit or at EOF) carry an
+    `IncompleteTransaction` list whose `incomplete` attribute is True.
     """
 
     def __init__(
@@ -55,43 +487,138 @@ class VaultTransactionReader:
         source: Iterable[Any],
         is_final: Callable[[Any], bool] = _default_is_final,
         close_on_eof: bool = True,
+        max_open: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        on_limit: str = ON_LIMIT_EMIT,
+        spill_dir: Optional[str] = None,
+        time_key: str = "time",
+        follow: bool = False,
+        compact: bool = False,
+        keep_raw: bool = False,
+        checkpoint: Optional[ScanCheckpoint] = None,
+        max_spilled: Optional[int] = DEFAULT_MAX_SPILLED,
     ) -> None:
-        if isinstance(source, (str, bytes)):
+        if isinstance(source, (str, bytes)) and follow:
+            self.reader = VaultLogFollower(str(source))  # type: ignore[assignment]
+        elif isinstance(source, (str, bytes)) and is_multi_source(str(source)):
+            self.reader = VaultMultiLogReader(  # type: ignore[assignment]
+                str(source), compact=compact, keep_raw=keep_raw
+            )
+        elif isinstance(source, (str, bytes)):
             # allow passing a file path
-            self.reader = VaultLogReader(str(source))
+            self.reader = VaultLogReader(
+                str(source), compact=compact, keep_raw=keep_raw
+            )
         else:
             # assume iterable/generator of entries
             self.reader = source  # type: ignore[assignment]
         self.is_final = is_final
         self.close_on_eof = close_on_eof
+        if on_limit not in (ON_LIMIT_EMIT, ON_LIMIT_SPILL):
+            raise ValueError(f"on_limit must be 'emit' or 'spill', got {on_limit!r}")
+        self.max_open = max_open
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.on_limit = on_limit
+        self.spill_dir = spill_dir
+        self.time_key = time_key
+        self.compact = compact
+        self.keep_raw = keep_raw
+        self.max_spilled = max_spilled
+        self.checkpoint = checkpoint
+        if checkpoint is not None and (
+            not isinstance(self.reader, VaultLogReader)
+            or hasattr(self.reader.file, "read")
+        ):
+            raise ValueError("checkpoint requires a log file path as source")
 
     def __iter__(self) -> Generator[Tuple[str, List[Any]], None, None]:
         yield from self.read()
 
+    def _new_buffer(self) -> _TransactionBuffer:
+        return _TransactionBuffer(
+            self.is_final,
+            max_open=self.max_open,
+            max_bytes=self.max_bytes,
+            max_age=self.max_age,
+            on_limit=self.on_limit,
+            spill_dir=self.spill_dir,
+            time_key=self.time_key,
+            max_spilled=self.max_spilled,
+        )
+
+    def _resume(self, buffer: _TransactionBuffer) -> Callable[[], None]:
+        """Restore `buffer` and the input offset; return the save function."""
+        checkpoint = self.checkpoint
+        reader = self.reader
+        assert checkpoint is not None and isinstance(reader, VaultLogReader)
+        path = str(reader.file)
+        st = os.stat(path)
+        file_id = {"path": path, "dev": st.st_dev, "ino": st.st_ino}
+        offset = 0
+        state = checkpoint.state
+        if state is not None:
+            saved = dict(state["input"])
+            offset = saved.pop("offset")
+            if (saved["dev"], saved["ino"]) != (st.st_dev, st.st_ino):
+                raise ValueError(
+                    f"checkpoint {checkpoint.path} belongs to another input than"
+                    f" {path}; remove it to start over"
+                )
+        buffer.spill_path = checkpoint.spill_path
+        buffer.restore(state["buffer"] if state is not None else None)
+        reader.start_offset = offset
+
+        def save() -> None:
+            checkpoint.save(  # type: ignore[union-attr]
+                {
+                    "input": dict(file_id, offset=reader.offset),
+                    "buffer": buffer.snapshot(),
+                }
+            )
+            buffer.snapshot_saved()
+
+        return save
+
     def read(self) -> Generator[Tuple[str, List[Any]], None, None]:
-        buffers: Dict[str, List[Any]] = defaultdict(list)
-        ready: deque = deque()
+        buffer = self._new_buffer()
+        try:
+            if self.checkpoint is not None:
+                yield from self._read_checkpointed(buffer)
+                return
+            for entry in self.reader:
+                rid = _extract_request_id(entry)
+                if rid is None:
+                    # ignore or treat as a transactionless event; skip
+                    continue
+                yield from buffer.add(rid, entry)
 
-        for entry in self.reader:
-            rid = _extract_request_id(entry)
-            if rid is None:
-                # ignore or treat as a transactionless event; skip
-                continue
-            buffers[rid].append(entry)
-            if self.is_final(entry):
-                ready.append(rid)
+            if self.close_on_eof:
+                # yield any remaining buffered transactions
+                yield from buffer.drain()
+        finally:
+            buffer.close()
 
-            while ready:
-                rid_to_yield = ready.popleft()
-                entries = buffers.pop(rid_to_yield, [])
-                if entries:
-                    yield rid_to_yield, entries
+    def _read_checkpointed(
+        self, buffer: _TransactionBuffer
+    ) -> Generator[Tuple[str, List[Any]], None, None]:
+        """`read()` with checkpoints taken between input lines.
 
+        After `buffer.add` returns, every transaction it released has been
+        handed on, so the offset, the buffer and the consumer's outputs
+        all describe the same point of the input.
+        """
+        save = self._resume(buffer)
+        due = self.checkpoint.due  # type: ignore[union-attr]
+        for entry in self.reader:
+            rid = _extract_request_id(entry)
+            if rid is not None:
+                yield from buffer.add(rid, entry)
+            if due():
+                save()
         if self.close_on_eof:
-            # yield any remaining buffered transactions
-            for rid, entries in list(buffers.items()):
-                if entries:
-                    yield rid, entries
+            yield from buffer.drain()
 
 
-__all__ = ["VaultTransactionReader"]
+__all__ = ["VaultTransactionReader", "IncompleteTransaction"]
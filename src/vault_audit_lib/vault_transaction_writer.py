@@ -3,24 +3,65 @@
 This module provides `VaultTransactionWriter` which accepts transactions
 (`(request_id, entries)`) and writes their constituent log entries to a
 Vault audit log file ensuring global ordering by the `time` field.
+
+Times are compared as parsed epoch nanoseconds (see `vault_time`), so
+RFC3339 values with different fractional precision or UTC offsets order
+correctly; each entry's time is parsed once. Entries without a parsable
+time are written first.
+
+`write_transactions(..., run_size=N)` sorts with bounded memory instead:
+entries are collected into runs of about `N` entries, each run is sorted
+and spooled to a temporary file, and the runs are k-way merged into the
+output, so inputs much larger than RAM can be time-ordered.
 """
 from __future__ import annotations
 
 import heapq
 import itertools
-from typing import IO, Any, Iterable, Tuple, Union
+import os
+import pickle
+import shutil
+import tempfile
+from typing import IO, Any, Iterable, Iterator, List, Optional, Tuple, Union
 
 from .vault_log_writer import VaultLogWriter
-
-
-def _extract_time(entry: Any, time_key: str) -> str:
-    if isinstance(entry, dict):
-        val = entry.get(time_key)
-        if val is None:
-            return ""
-        return str(val)
-    # Non-dict entries: treat as earliest
-    return ""
+from .vault_time import time_sort_key
+
+# Entries per pickled block in a run file.
+RUN_BLOCK = 1024
+# Maximum number of runs merged (and files open) at once.
+DEFAULT_MERGE_FAN_IN = 64
+
+# (time, sequence number, entry); the unique sequence number keeps the
+# sort stable and stops comparisons from ever reaching the entry.
+_Record = Tuple[int, int, Any]
+
+
+def _spool_run(records: Iterable[_Record], run_dir: str) -> str:
+    """Write sorted `records` to a new run file in `run_dir`; return its path."""
+    fd, path = tempfile.mkstemp(prefix="run-", dir=run_dir)
+    with os.fdopen(fd, "wb") as fh:
+        block: List[_Record] = []
+        for rec in records:
+            block.append(rec)
+            if len(block) >= RUN_BLOCK:
+                pickle.dump(block, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                block = []
+        if block:
+            pickle.dump(block, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[_Record]:
+    """Yield the records of a run file, deleting it once exhausted."""
+    with open(path, "rb") as fh:
+        while True:
+            try:
+                block = pickle.load(fh)
+            except EOFError:
+                break
+            yield from block
+    os.remove(path)
 
 
 class VaultTransactionWriter:
@@ -30,22 +71,38 @@ class VaultTransactionWriter:
         writer = VaultTransactionWriter(path)
         writer.write_transaction(request_id, entries)
         writer.write_transactions(iter_of_transactions)
+
+    Extra keyword arguments (e.g. `background=True`, `buffer_size=...`)
+    are passed to the underlying `VaultLogWriter`.
     """
 
-    def __init__(self, file: Union[str, IO], mode: str = "a") -> None:
-        self._writer = VaultLogWriter(file, mode=mode)
+    def __init__(
+        self, file: Union[str, IO], mode: str = "a", **writer_options: Any
+    ) -> None:
+        self._writer = VaultLogWriter(file, mode=mode, **writer_options)
 
     def write_transaction(
         self, request_id: str, entries: Iterable[Any], time_key: str = "time"
     ) -> None:
-        """Write a single transaction's entries in time order."""
-        entries_list = list(entries)
-        entries_list.sort(key=lambda e: _extract_time(e, time_key))
-        for e in entries_list:
-            self._writer.write(e)
+        """Write a single transaction's entries in time order.
+
+        A list already in time order (the usual request-then-response) is
+        written as is, without being copied.
+        """
+        entries_list = entries if isinstance(entries, list) else list(entries)
+        keys = [time_sort_key(e, time_key) for e in entries_list]
+        if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            entries_list = [entries_list[i] for i in order]
+        self._writer.writelines(entries_list)
 
     def write_transactions(
-        self, transactions: Iterable[Tuple[str, Iterable[Any]]], time_key: str = "time"
+        self,
+        transactions: Iterable[Tuple[str, Iterable[Any]]],
+        time_key: str = "time",
+        run_size: Optional[int] = None,
+        tmp_dir: Optional[str] = None,
+        fan_in: int = DEFAULT_MERGE_FAN_IN,
     ) -> None:
         """Write multiple transactions merged by their entry times.
 
@@ -53,51 +110,95 @@ class VaultTransactionWriter:
         Entries within each transaction may be unsorted; this method will
         sort per-transaction entries and then perform an efficient k-way
         merge to produce a globally time-ordered stream of entries.
+
+        With `run_size` set, at most about `run_size` entries (plus one
+        transaction) are held in memory: full runs are sorted and spooled
+        to temporary files under `tmp_dir`, then merged `fan_in` at a time.
+        Entries must be picklable. Entries with equal times are written in
+        transaction order rather than interleaved.
         """
+        if run_size is not None:
+            self._write_external(transactions, time_key, run_size, tmp_dir, fan_in)
+            return
 
-        # Prepare iterators of sorted entries for each transaction
+        # Prepare iterators of (time key, entry) sorted per transaction; each
+        # entry's time is parsed once here and reused by the heap.
         iterators = []
         for _rid, entries in transactions:
-            lst = list(entries)
-            lst.sort(key=lambda e: _extract_time(e, time_key))
-            if lst:
-                iterators.append(iter(lst))
+            keyed = [(time_sort_key(e, time_key), e) for e in entries]
+            keyed.sort(key=lambda te: te[0])
+            if keyed:
+                iterators.append(iter(keyed))
 
         # Build initial heap
         heap = []
         counter = itertools.count()
         for it in iterators:
             try:
-                e = next(it)
+                t, e = next(it)
             except StopIteration:
                 continue
-            t = _extract_time(e, time_key)
             heapq.heappush(heap, (t, next(counter), e, it))
 
         while heap:
             t, _c, e, it = heapq.heappop(heap)
             self._writer.write(e)
             try:
-                nxt = next(it)
+                t, nxt = next(it)
             except StopIteration:
                 continue
-            heapq.heappush(heap, (_extract_time(nxt, time_key), next(counter), nxt, it))
+            heapq.heappush(heap, (t, next(counter), nxt, it))
+
+    def _write_external(
+        self,
+        transactions: Iterable[Tuple[str, Iterable[Any]]],
+        time_key: str,
+        run_size: int,
+        tmp_dir: Optional[str],
+        fan_in: int,
+    ) -> None:
+        run_size = max(1, run_size)
+        fan_in = max(2, fan_in)
+        seq = itertools.count()
+        run_dir = tempfile.mkdtemp(prefix="vault-tx-sort-", dir=tmp_dir)
+        try:
+            runs: List[str] = []
+            buf: List[_Record] = []
+            for _rid, entries in transactions:
+                keyed = [(time_sort_key(e, time_key), e) for e in entries]
+                keyed.sort(key=lambda te: te[0])
+                buf.extend((t, next(seq), e) for t, e in keyed)
+                if len(buf) >= run_size:
+                    buf.sort()
+                    runs.append(_spool_run(buf, run_dir))
+                    buf = []
+            buf.sort()
+
+            # merge passes until the remaining runs fit in one final merge
+            while len(runs) + 1 > fan_in:
+                batch, runs = runs[:fan_in], runs[fan_in:]
+                runs.append(_spool_run(heapq.merge(*map(_read_run, batch)), run_dir))
+
+            merged = heapq.merge(iter(buf), *map(_read_run, runs))
+            self._writer.writelines(rec[2] for rec in merged)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
 
     def flush(self) -> None:
         self._writer.flush()
 
     def close(self) -> None:
-        try:
-            self._writer.close()
-        except Exception:
-            pass
+        # VaultLogWriter.close only raises for errors of a background writer
+        self._writer.close()
 
     def __enter__(self) -> "VaultTransactionWriter":
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
-        self.flush()
-        self.close()
+        try:
+            self.flush()
+        finally:
+            self.close()
 
 
 __all__ = ["VaultTransactionWriter"]
@@ -1,6 +1,13 @@
 import json
+import random
+from datetime import datetime, timedelta
 
-from vault_audit_lib import VaultLogReader
+from vault_audit_lib import (
+    GzipCheckpointIndex,
+    VaultLogReader,
+    VaultLogWriter,
+    parse_time_ns,
+)
 
 
 def test_read_json_and_plain_lines(tmp_path):
@@ -23,3 +30,79 @@ def test_read_json_and_plain_lines(tmp_path):
 
     assert isinstance(entries[2], dict)
     assert entries[2]["type"] == "logout"
+
+
+def test_parallel_read_matches_serial(tmp_path):
+    p = tmp_path / "big.private_log"
+    lines = []
+    for i in range(500):
+        if i % 37 == 0:
+            lines.append(f"plain text line {i}")
+        else:
+            lines.append(json.dumps({"request": {"id": str(i)}, "type": "request"}))
+    p.write_text("\r\n".join(lines) + "\n\n", encoding="utf-8")
+
+    serial = list(VaultLogReader(str(p)))
+    parallel = list(VaultLogReader(str(p), workers=2, chunk_size=256))
+
+    assert parallel == serial
+    assert len(parallel) == 500
+
+
+def test_mmap_and_prefilter(tmp_path):
+    p = tmp_path / "mm.private_log"
+    lines = []
+    for i in range(50):
+        kind = "response" if i % 3 == 0 else "request"
+        lines.append(json.dumps({"request": {"id": str(i)}, "type": kind}))
+    lines.insert(10, "plain text line")
+    p.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+
+    assert list(VaultLogReader(str(p), use_mmap=True)) == list(VaultLogReader(str(p)))
+
+    needle = b'"type": "response"'
+    expected = [e for e in VaultLogReader(str(p)) if isinstance(e, dict)]
+    expected = [e for e in expected if e["type"] == "response"]
+    for kwargs in ({}, {"use_mmap": True}, {"workers": 2, "chunk_size": 128}):
+        got = list(VaultLogReader(str(p), prefilter=needle, **kwargs))
+        assert got == expected
+    # file objects, in binary and text mode
+    for open_mode in ("rb", "r"):
+        with open(p, open_mode) as fh:
+            assert list(VaultLogReader(fh, prefilter=needle)) == expected
+        with open(p, open_mode) as fh:
+            assert list(VaultLogReader(fh, prefilter=needle.decode())) == expected
+
+    empty = tmp_path / "empty.private_log"
+    empty.write_bytes(b"")
+    assert list(VaultLogReader(str(empty), use_mmap=True)) == []
+
+
+def test_read_range_bisects_roughly_sorted_file(tmp_path):
+    rng = random.Random(3)
+    base = datetime(2024, 5, 1, 12)
+    events = []
+    for i in range(6000):
+        # up to one second out of order
+        t = base + timedelta(milliseconds=i * 100 - rng.randrange(1000))
+        ts = t.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        events.append({"time": ts, "request": {"id": str(i)}, "pad": "x" * 40})
+    plain = tmp_path / "audit.log"
+    packed = tmp_path / "audit.log.gz"
+    for path, opts in ((plain, {}), (packed, {"gzip_block_size": 8192})):
+        with VaultLogWriter(str(path), mode="w", **opts) as w:
+            w.writelines(events)
+    GzipCheckpointIndex(str(packed)).build()
+
+    start, end = "2024-05-01T12:04:00Z", "2024-05-01T12:04:30.5Z"
+    lo, hi = parse_time_ns(start), parse_time_ns(end)
+    expected = [e for e in events if lo <= parse_time_ns(e["time"]) < hi]
+    assert len(expected) > 100
+    for path in (plain, packed):
+        reader = VaultLogReader(str(path))
+        assert list(reader.read_range(start, end, slack=1)) == expected
+        projected = VaultLogReader(str(path), fields=["request.id"])
+        got = list(projected.read_range(start, end, slack=1))
+        assert got == [{"request": e["request"]} for e in expected]
+    first = min(events, key=lambda e: parse_time_ns(e["time"]))
+    assert list(VaultLogReader(str(plain)).read_range(end=first["time"])) == []
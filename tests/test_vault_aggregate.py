@@ -0,0 +1,109 @@
+import json
+import pickle
+import random
+
+from vault_audit_lib import (
+    CountMinSketch,
+    HyperLogLog,
+    SpaceSaving,
+    TDigest,
+    TransactionAggregator,
+    VaultTransactionReader,
+    aggregate,
+)
+
+
+def test_sketches_are_accurate_and_mergeable():
+    rng = random.Random(7)
+    values = [f"v{int(rng.paretovariate(1.2))}" for _ in range(20000)]
+    exact = {}
+    for v in values:
+        exact[v] = exact.get(v, 0) + 1
+
+    halves = []
+    for part in (values[:10000], values[10000:]):
+        cms, ss, hll = CountMinSketch(512, 4), SpaceSaving(50), HyperLogLog(12)
+        for v in part:
+            cms.add(v)
+            ss.add(v)
+            hll.add(v)
+        halves.append((cms, ss, hll))
+    (cms, ss, hll), (cms2, ss2, hll2) = halves
+    cms.merge(cms2)
+    ss.merge(pickle.loads(pickle.dumps(ss2)))
+    hll.merge(hll2)
+
+    assert all(exact[v] <= cms.estimate(v) <= exact[v] + 100 for v in exact)
+    heavy = sorted(exact, key=exact.get, reverse=True)[:5]
+    assert [key for key, _c, _e in ss.top(5)] == heavy
+    for key, count, error in ss.top(5):
+        assert count - error <= exact[key] <= count
+    assert abs(hll.count() - len(exact)) <= 0.05 * len(exact)
+
+    big = HyperLogLog()
+    for i in range(50000):
+        big.add(f"token-{i}")
+    assert abs(big.count() - 50000) <= 0.03 * 50000
+
+
+def test_tdigest_quantiles():
+    rng = random.Random(1)
+    data = [rng.uniform(0, 1000) for _ in range(20000)]
+    a, b = TDigest(), TDigest()
+    for i, x in enumerate(data):
+        (a if i % 2 else b).add(x)
+    a.merge(b)
+    ordered = sorted(data)
+    for q in (0.01, 0.5, 0.9, 0.99):
+        assert abs(a.quantile(q) - ordered[int(q * len(data))]) < 10
+    assert a.quantile(0) == ordered[0] and a.quantile(1) == ordered[-1]
+    assert len(a._centroids) < 200
+
+
+def _write_log(path, start, n):
+    with open(path, "w", encoding="utf-8") as fh:
+        for i in range(start, start + n):
+            mount = "kv" if i % 3 else "token"
+            request = {"id": str(i), "path": f"secret/{i % 4}", "mount_type": mount}
+            auth = {"entity_id": f"e{i % 10}", "client_token": f"t{i}"}
+            ms = i % 100
+            events = [
+                {"type": "request", "time": "2024-05-01T12:00:00Z", "request": request},
+                {
+                    "type": "response",
+                    "time": f"2024-05-01T12:00:00.{ms:03d}Z",
+                    "auth": auth,
+                    "request": request,
+                    "error": "denied" if i % 5 == 0 else "",
+                },
+            ]
+            for event in events:
+                fh.write(json.dumps(event) + "\n")
+
+
+def test_transaction_aggregator_and_parallel_merge(tmp_path):
+    paths = []
+    for k in range(3):
+        paths.append(str(tmp_path / f"audit{k}.log"))
+        _write_log(paths[-1], k * 1000, 1000)
+
+    options = {"latency_by": "request.mount_type"}
+    single = TransactionAggregator(**options)
+    for path in paths:
+        single.update(VaultTransactionReader(path))
+    merged = aggregate(paths, workers=2, **options)
+    summary = merged.summary(top=4)
+
+    expected = single.summary(top=4)
+    for key in ("transactions", "errors", "top", "error_top", "distinct"):
+        assert summary[key] == expected[key]
+    assert summary["transactions"] == 3000
+    assert summary["errors"] == 600
+    assert summary["top"]["request.path"] == [(f"secret/{i}", 750, 0) for i in range(4)]
+    assert merged.count("request.mount_type", "token") == 1000
+    assert summary["distinct"]["auth.entity_id"] == 10
+    assert abs(summary["distinct"]["auth.client_token"] - 3000) < 90
+    assert abs(summary["latency_ms"]["p50"] - 50) <= 2
+    assert abs(summary["latency_ms"]["p90"] - expected["latency_ms"]["p90"]) <= 2
+    assert set(summary["latency_ms_by"]) == {"kv", "token"}
+    json.dumps(summary)
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from vault_audit_lib import (
+    AsyncVaultAuditServer,
+    AsyncVaultLogReader,
+    AsyncVaultLogWriter,
+    AsyncVaultTransactionReader,
+    CompactEvent,
+    RawEvent,
+    VaultLogReader,
+)
+
+
+def _events(n):
+    events = []
+    for i in range(n):
+        for kind in ("request", "response"):
+            events.append({"type": kind, "request": {"id": str(i)}})
+    return events
+
+
+def test_async_reader_writer_and_transactions(tmp_path):
+    path = tmp_path / "audit.log.gz"
+    events = _events(500)
+
+    async def run():
+        async with AsyncVaultLogWriter(str(path), mode="w", batch_size=64) as w:
+            await w.writelines(events)
+            await w.write("plain")
+        entries = [e async for e in AsyncVaultLogReader(str(path), batch_size=100)]
+        txs = [tx async for tx in AsyncVaultTransactionReader(str(path))]
+        return entries, txs
+
+    entries, txs = asyncio.run(run())
+    assert entries == events + ["plain"] == list(VaultLogReader(str(path)))
+    assert [rid for rid, _ in txs] == [str(i) for i in range(500)]
+    assert all(len(evs) == 2 for _, evs in txs)
+
+
+def test_async_server_receives_from_many_connections():
+    events = _events(200)
+    payload = "".join(json.dumps(e) + "\n" for e in events).encode()
+
+    async def send(port, data):
+        _reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for i in range(0, len(data), 1000):  # split lines across writes
+            writer.write(data[i : i + 1000])
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def run():
+        async with AsyncVaultAuditServer(queue_size=16) as server:
+            port = server.address[1]
+            senders = [asyncio.create_task(send(port, payload)) for _ in range(3)]
+            received = []
+            async for entry in server:
+                received.append(entry)
+                if len(received) == 3 * len(events):
+                    break
+            await asyncio.gather(*senders)
+        return received, server
+
+    received, server = asyncio.run(run())
+    assert server.connections == 3 and server.events == 3 * len(events)
+    ids = sorted(e["request"]["id"] for e in received)
+    assert ids == sorted(e["request"]["id"] for e in events * 3)
+
+
+def test_async_transaction_reader_compact(tmp_path):
+    path = tmp_path / "audit.log"
+    path.write_text("".join(json.dumps(e) + "\n" for e in _events(20)))
+
+    async def run():
+        return [tx async for tx in AsyncVaultTransactionReader(str(path), compact=True)]
+
+    txs = asyncio.run(run())
+    assert [rid for rid, _ in txs] == [str(i) for i in range(20)]
+    events = [e for _, evs in txs for e in evs]
+    assert all(isinstance(e, CompactEvent) for e in events)
+    assert [e.to_dict() for e in events] == _events(20)
+
+
+def test_async_transaction_reader_keep_raw(tmp_path):
+    path = tmp_path / "audit.log"
+    lines = [json.dumps(e, separators=(",", ":")) for e in _events(20)]
+    path.write_text("".join(line + "\n" for line in lines))
+
+    async def run():
+        reader = AsyncVaultTransactionReader(str(path), keep_raw=True)
+        return [tx async for tx in reader]
+
+    txs = asyncio.run(run())
+    events = [e for _, evs in txs for e in evs]
+    assert all(isinstance(e, RawEvent) for e in events)
+    assert events == _events(20)
+    assert [e.raw for e in events] == lines
@@ -0,0 +1,77 @@
+import datetime
+import io
+
+import pytest
+
+from vault_audit_lib import (
+    VaultEventFilter,
+    VaultLogReader,
+    VaultLogWriter,
+    VaultTransactionReader,
+    VaultTransactionWriter,
+)
+
+
+def _events(n):
+    events = []
+    for i in range(n):
+        for kind in ("request", "response"):
+            events.append(
+                {
+                    "time": f"2024-05-01T12:{i // 60:02d}:{i % 60:02d}Z",
+                    "type": kind,
+                    "auth": {"client_token": f"hmac-sha256:{i % 3:064d}"},
+                    "request": {"id": str(i), "path": f"secret/{i % 4}"},
+                }
+            )
+    return events
+
+
+@pytest.mark.parametrize("name", ["out.vbin", "out.vbin.gz"])
+def test_binary_log_round_trip_and_append(tmp_path, name):
+    path = str(tmp_path / name)
+    events = _events(700)
+    with VaultLogWriter(path, mode="w", block_entries=100) as writer:
+        writer.writelines(events[:1000])
+        writer.write("raw line")
+    # appending keeps the binary format, even with deduplicated blocks
+    with VaultLogWriter(path, dedupe=True) as writer:
+        for event in events[1000:]:
+            writer.write(event)
+
+    expected = events[:1000] + ["raw line"] + events[1000:]
+    assert list(VaultLogReader(path)) == expected
+    assert list(VaultLogReader(path, fields=["request.id"]))[0] == {
+        "request": {"id": "0"}
+    }
+    txs = list(VaultTransactionReader(path))
+    assert len(txs) == 700 and all(len(entries) == 2 for _rid, entries in txs)
+    flt = VaultEventFilter("request.path", "secret/1")
+    assert sum(flt.match(tx) for tx in txs) == 175
+    window = list(VaultLogReader(path).read_range("2024-05-01T12:01:00Z", None))
+    assert len(window) == 2 * (700 - 60)
+    with pytest.raises(ValueError):
+        list(VaultLogReader(path, prefilter=b"secret"))
+
+
+def test_binary_writer_detection_and_options(tmp_path):
+    path = str(tmp_path / "out.log")
+    entry = {"when": datetime.datetime(2024, 5, 1), "n": 1}
+    with VaultTransactionWriter(path, mode="w", binary=True) as writer:
+        writer.write_transaction("1", [entry])
+    # unencodable values are stored as strings, like the JSON writer does
+    assert list(VaultLogReader(path)) == [{"when": "2024-05-01 00:00:00", "n": 1}]
+    with pytest.raises(ValueError):
+        VaultLogWriter(path, binary=False)
+
+    text = str(tmp_path / "text.log")
+    with VaultLogWriter(text) as writer:
+        writer.write({"n": 1})
+    with pytest.raises(ValueError):
+        VaultLogWriter(text, binary=True)
+
+    buf = io.BytesIO()
+    with VaultLogWriter(buf, binary=True) as writer:
+        writer.writelines([{"n": 1}, {"n": 2}])
+    buf.seek(0)
+    assert list(VaultLogReader(io.BufferedReader(buf))) == [{"n": 1}, {"n": 2}]
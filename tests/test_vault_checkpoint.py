@@ -0,0 +1,120 @@
+import json
+import os
+
+import pytest
+
+from vault_audit_lib import (
+    GzipCheckpointIndex,
+    ScanCheckpoint,
+    VaultLogWriter,
+    VaultTransactionReader,
+    VaultTransactionWriter,
+    sanitized_filename,
+    split_by,
+)
+
+
+def _events(n_tx, n_keys):
+    """Requests and responses interleaved, so transactions stay open."""
+    events = []
+    for i in range(n_tx + 3):
+        if i < n_tx:
+            auth = {} if i % 5 == 0 else {"entity_id": f"entity/{i % n_keys}"}
+            events.append({"type": "request", "auth": auth, "request": {"id": str(i)}})
+        if i >= 3:
+            events.append({"type": "response", "request": {"id": str(i - 3)}})
+    return events
+
+
+def _tree(out_dir):
+    return {
+        name: (out_dir / name).read_bytes() for name in sorted(os.listdir(out_dir))
+    }
+
+
+def test_split_resumes_after_crash(tmp_path, monkeypatch):
+    log = tmp_path / "audit.log"
+    log.write_text("".join(json.dumps(e) + "\n" for e in _events(60, 4)))
+    existing = sanitized_filename("entity/1") + ".jsonl"
+    for out in (tmp_path / "clean", tmp_path / "out"):
+        out.mkdir()
+        (out / existing).write_text('{"kept": true}\n')
+    options = {"mode": "a", "max_open": 2, "batch_size": 4}
+
+    expected = split_by(str(log), "auth.entity_id", str(tmp_path / "clean"), **options)
+
+    ckpt = str(tmp_path / "split.ckpt")
+    write_transaction = VaultTransactionWriter.write_transaction
+    written = []
+
+    def crashing(self, request_id, entries):
+        write_transaction(self, request_id, entries)
+        written.append(request_id)
+        if len(written) == 37:
+            raise RuntimeError("crash")
+
+    monkeypatch.setattr(VaultTransactionWriter, "write_transaction", crashing)
+    with pytest.raises(RuntimeError):
+        split_by(
+            str(log),
+            "auth.entity_id",
+            str(tmp_path / "out"),
+            checkpoint_path=ckpt,
+            checkpoint_interval=0,
+            **options,
+        )
+    monkeypatch.undo()
+    assert os.path.exists(ckpt)
+    assert ScanCheckpoint(ckpt).state["input"]["offset"] > 0
+
+    counts = split_by(
+        str(log),
+        "auth.entity_id",
+        str(tmp_path / "out"),
+        checkpoint_path=ckpt,
+        checkpoint_interval=0,
+        **options,
+    )
+    assert counts == expected
+    assert _tree(tmp_path / "out") == _tree(tmp_path / "clean")
+    assert not [p for p in os.listdir(tmp_path) if p.startswith("split.ckpt")]
+
+    with pytest.raises(ValueError):
+        split_by(
+            str(log), "auth.entity_id", str(tmp_path), buckets=2, checkpoint_path=ckpt
+        )
+
+
+def test_transaction_reader_resumes_gzip_with_spill(tmp_path, monkeypatch):
+    import vault_audit_lib.vault_transaction_reader as vtr
+
+    # rewrite the spill file often, so resumes cross spill generations
+    monkeypatch.setattr(vtr, "_SPILL_REWRITE_MIN", 256)
+    log = str(tmp_path / "audit.log.gz")
+    with VaultLogWriter(log, mode="w", gzip_block_size=256) as w:
+        w.writelines(_events(40, 3))
+    assert GzipCheckpointIndex(log, spacing=256).ensure().seekable
+    options = {"max_open": 2, "on_limit": "spill", "max_bytes": 10_000}
+    expected = list(VaultTransactionReader(log, **options))
+
+    for stop in range(1, len(expected)):
+        ckpt = ScanCheckpoint(str(tmp_path / "tx.ckpt"), interval=0)
+        received, saved_at = [], []
+        ckpt.add_hook(lambda state: saved_at.append(len(received)))
+        for tx in VaultTransactionReader(log, checkpoint=ckpt, **options):
+            received.append(tx)
+            if len(received) == stop:
+                break
+        state = ScanCheckpoint(ckpt.path).state
+        # spilled entries stay on disk, only their index is saved
+        assert len(state["buffer"]["open"]) <= 2
+        if state["buffer"]["spilled"]:
+            spill = tmp_path / state["buffer"]["spill_file"]
+            assert spill.stat().st_size >= state["buffer"]["spill_size"]
+
+        # transactions received after the last save are yielded again
+        resumed = ScanCheckpoint(ckpt.path, interval=0)
+        rest = list(VaultTransactionReader(log, checkpoint=resumed, **options))
+        assert received[: saved_at[-1]] + rest == expected
+        resumed.clear()
+        assert sorted(os.listdir(tmp_path)) == ["audit.log.gz", "audit.log.gz.gzi"]
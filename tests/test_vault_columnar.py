@@ -0,0 +1,121 @@
+import io
+from collections import Counter
+
+import pytest
+
+from vault_audit_lib import (
+    VaultColumnReader,
+    VaultColumnWriter,
+    VaultLogReader,
+    VaultLogWriter,
+    parse_time_ns,
+)
+
+
+def _events(n):
+    events = []
+    for i in range(n):
+        events.append(
+            {
+                "time": f"2024-05-01T12:00:{i % 60:02d}.{i:06d}Z",
+                "type": "response" if i % 2 else "request",
+                "request": {
+                    "id": f"req-{i // 2}",
+                    "path": f"secret/data/{i % 5}",
+                    "mount_type": "kv" if i % 3 else None,
+                    "status": i,
+                },
+                "auth": {"entity_id": f"ént-{i % 7}"} if i % 4 else {},
+                "took": i / 4,
+            }
+        )
+    events.append("not an event")
+    return events
+
+
+COLUMNS = [
+    ("time", "time", "time"),
+    ("type", "type", "str"),
+    ("request_id", "request.id", "text"),
+    ("path", "request.path", "str"),
+    ("mount_type", "request.mount_type", "str"),
+    ("entity", "auth.entity_id", "str"),
+    ("status", "request.status", "int"),
+    ("took", "took", "float"),
+]
+
+
+def _expected(event):
+    if not isinstance(event, dict):
+        return dict.fromkeys([name for name, _k, _kind in COLUMNS])
+    request = event["request"]
+    return {
+        "time": parse_time_ns(event["time"]),
+        "type": event["type"],
+        "request_id": request["id"],
+        "path": request["path"],
+        "mount_type": request["mount_type"],
+        "entity": event["auth"].get("entity_id"),
+        "status": request["status"],
+        "took": event["took"],
+    }
+
+
+def test_columnar_round_trip_in_chunks(tmp_path):
+    log, path = tmp_path / "audit.log", str(tmp_path / "audit.vcol")
+    events = _events(1000)
+    with VaultLogWriter(str(log), mode="w") as writer:
+        writer.writelines(events)
+
+    with VaultColumnWriter(path, columns=COLUMNS, chunk_rows=128) as out:
+        out.writelines(VaultLogReader(str(log), fields=out.fields))
+
+    with VaultColumnReader(path) as cols:
+        assert len(cols) == len(events)
+        assert cols.columns == [tuple(c) for c in COLUMNS]
+        assert list(cols) == [_expected(e) for e in events]
+        chunks = list(cols.chunks())
+        assert [c.rows for c in chunks] == [128] * 7 + [105]
+        # dictionary codes are global, so chunks can be counted undecoded
+        paths = cols.dictionary("path")
+        assert len(paths) == 5
+        counts = Counter()
+        for chunk in chunks:
+            counts.update(chunk.values("path"))
+        assert {paths[c]: n for c, n in counts.items() if c >= 0} == {
+            f"secret/data/{i}": 200 for i in range(5)
+        }
+        times = chunks[0].values("time")
+        assert times.format == "q" and times[1] == parse_time_ns(events[1]["time"])
+        del times
+
+
+def test_columnar_file_object_and_validation(tmp_path):
+    buf = io.BytesIO()
+    with VaultColumnWriter(buf, columns=[("t", "type", "str")]) as out:
+        out.write({"type": "request"})
+    path = tmp_path / "x.vcol"
+    path.write_bytes(buf.getvalue())
+    with VaultColumnReader(str(path)) as cols:
+        assert list(cols) == [{"t": "request"}]
+
+    # integers outside int64 are missing values, not an OverflowError
+    wide = str(tmp_path / "wide.vcol")
+    with VaultColumnWriter(
+        wide, columns=[("s", "request.status", "int"), ("t", "time", "time")]
+    ) as out:
+        for status in (2**70, -(2**70), 2**63 - 1):
+            out.write({"request": {"status": status}, "time": 2**70})
+    with VaultColumnReader(wide) as cols:
+        assert [row["s"] for row in cols] == [None, None, 2**63 - 1]
+        assert [row["t"] for row in cols] == [None] * 3
+
+    path.write_bytes(buf.getvalue()[:-4])
+    with pytest.raises(ValueError):
+        VaultColumnReader(str(path))
+    with pytest.raises(ValueError):
+        VaultColumnWriter(io.BytesIO(), columns=[("t", "type", "blob")])
+    # offsets are relative to the start of the file
+    with open(path, "ab") as fh:
+        with pytest.raises(ValueError):
+            VaultColumnWriter(fh, columns=[("t", "type", "str")])
@@ -0,0 +1,116 @@
+import json
+import pickle
+
+import pytest
+
+from vault_audit_lib import (
+    CompactEvent,
+    TransactionAggregator,
+    VaultLogReader,
+    VaultLogWriter,
+    VaultTransactionReader,
+    VaultTransactionWriter,
+    field,
+    time_range,
+)
+from vault_audit_lib.vault_time import parse_time_ns
+
+
+def _line(rid, typ, second, **extra):
+    entry = {
+        "time": f"2024-01-01T00:00:{second:02d}.5Z",
+        "type": typ,
+        "auth": {"client_token": "hmac-sha256:t", "entity_id": "ent-" + rid},
+        "request": {"id": rid, "path": "secret/data/" + rid},
+    }
+    entry.update(extra)
+    # key order and spacing unlike VaultLogWriter's, to detect re-encoding
+    return json.dumps(entry, separators=(",", ":"))
+
+
+def test_compact_event_fields(tmp_path):
+    raw = _line("a", "response", 3, error="permission denied", response={"x": 1})
+    ev = CompactEvent(raw.encode("utf-8") + b"\n")
+
+    assert ev.raw == raw
+    assert ev.request_id == "a"
+    assert ev.type == "response"
+    assert ev.time_ns == parse_time_ns("2024-01-01T00:00:03.5Z")
+    assert ev.entity_id == "ent-a"
+    assert ev.client_token == "hmac-sha256:t"
+    assert ev.path == "secret/data/a"
+    assert ev.error == "permission denied"
+    assert ev.get("response.x") == 1
+    assert ev.get("response.y", "none") == "none"
+    assert ev.get("time") == "2024-01-01T00:00:03.5Z"
+    assert ev.to_dict() == json.loads(raw)
+    assert pickle.loads(pickle.dumps(ev)).request_id == "a"
+    assert pickle.loads(pickle.dumps(ev)) == ev
+
+    assert field("error").exists().match(ev)
+    assert field("response.x").eq(1).match(ev)
+    assert not field("auth.entity_id").eq("ent-b").match(ev)
+    assert time_range("2024-01-01T00:00:03Z", "2024-01-01T00:00:04Z").match(ev)
+
+    with pytest.raises(ValueError):
+        CompactEvent("[1, 2]")
+
+
+def test_compact_round_trip_is_verbatim(tmp_path):
+    lines = [
+        _line("a", "request", 1),
+        _line("b", "request", 2),
+        _line("a", "response", 4),
+        "not json",
+        _line("b", "response", 3, error="boom"),
+    ]
+    src = tmp_path / "in.log"
+    src.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    for options in ({}, {"use_mmap": True}, {"workers": 2, "chunk_size": 64}):
+        events = list(VaultLogReader(str(src), compact=True, **options))
+        assert [type(e) for e in events] == [CompactEvent] * 3 + [str, CompactEvent]
+
+    out = tmp_path / "out.log"
+    with VaultTransactionWriter(str(out), mode="w") as writer:
+        for rid, events in VaultTransactionReader(str(src), compact=True):
+            assert all(isinstance(e, CompactEvent) for e in events)
+            writer.write_transaction(rid, events[::-1])
+    assert out.read_text(encoding="utf-8").splitlines() == [
+        lines[0],
+        lines[2],
+        lines[1],
+        lines[4],
+    ]
+
+    agg = TransactionAggregator(group_by=["auth.entity_id"])
+    agg.update(VaultTransactionReader(str(src), compact=True))
+    summary = agg.summary()
+    assert summary["transactions"] == 2
+    assert summary["errors"] == 1
+    assert summary["latency_ms"]["count"] == 2
+
+    with pytest.raises(ValueError):
+        VaultLogReader(str(src), compact=True, fields=["type"])
+
+
+def test_compact_spill_and_binary(tmp_path):
+    lines = [_line(str(i), "request", i) for i in range(4)]
+    lines += [_line(str(i), "response", 10 + i) for i in range(4)]
+    src = tmp_path / "in.log"
+    src.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    transactions = list(
+        VaultTransactionReader(
+            str(src), compact=True, max_open=1, max_bytes=400, on_limit="spill"
+        )
+    )
+    assert len(transactions) == 4
+    for rid, events in transactions:
+        assert [type(e) for e in events] == [CompactEvent, CompactEvent]
+        assert [e.raw for e in events] == [lines[int(rid)], lines[4 + int(rid)]]
+
+    out = tmp_path / "out.vbin"
+    with VaultLogWriter(str(out), mode="w") as writer:
+        writer.writelines(VaultLogReader(str(src), compact=True))
+    assert list(VaultLogReader(str(out))) == [json.loads(line) for line in lines]
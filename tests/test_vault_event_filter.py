@@ -0,0 +1,53 @@
+import re
+
+from vault_audit_lib import VaultEventFilter, field
+
+RESPONSE = {
+    "type": "response",
+    "request": {"id": "r1", "path": "secret/data/a", "mount_type": "kv"},
+    "response": {"status": 403},
+    "error": "permission denied",
+}
+REQUEST = {"type": "request", "request": {"id": "r2", "path": "sys/health"}}
+
+
+def test_value_kinds():
+    assert VaultEventFilter("type", "response").match(RESPONSE)
+    assert VaultEventFilter("request.id", re.compile("^r")).match(REQUEST)
+    assert VaultEventFilter("error", lambda v: v is None).match(REQUEST)
+    assert VaultEventFilter("error", None).match(REQUEST)
+    assert not VaultEventFilter("error", None).match(RESPONSE)
+    assert not VaultEventFilter("request.id", lambda v: v.startswith("x")).match("raw")
+
+
+def test_composition_short_circuits():
+    calls = []
+
+    def record(v):
+        calls.append(v)
+        return True
+
+    combined = VaultEventFilter("type", "response") & VaultEventFilter("error", record)
+
+    assert not combined.match(REQUEST)
+    assert calls == []
+    assert combined.match(RESPONSE)
+    assert (~combined).match(REQUEST)
+    assert (combined | VaultEventFilter("type", "request")).match(REQUEST)
+
+
+def test_field_predicates():
+    assert field("response.status").ge(400).match(RESPONSE)
+    assert not field("response.status").lt(400).match(RESPONSE)
+    assert not field("response.status").gt("a").match(RESPONSE)
+    assert field("request.mount_type").isin({"kv", "pki"}).match(RESPONSE)
+    assert field("error").exists().match(RESPONSE)
+    assert field("error").missing().match(REQUEST)
+    assert field("request.path").matches("^sys/").match(REQUEST)
+    assert field("type").ne("request").match(RESPONSE)
+
+
+def test_transaction_match():
+    flt = field("error").exists()
+    assert flt.match(("r1", [REQUEST, RESPONSE]))
+    assert not flt.match(("r2", [REQUEST]))
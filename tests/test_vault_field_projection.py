@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from vault_audit_lib import VaultFieldProjection, VaultLogReader
+
+EVENT = {
+    "time": "2024-01-01T00:00:00Z",
+    "type": "response",
+    "auth": {"client_token": "hmac-sha256:abc", "entity_id": "e1"},
+    "request": {"id": "r1", "path": "secret/data/x", "data": {"big": "x" * 100}},
+    "response": {"data": {"big": "y" * 100}},
+}
+FIELDS = ["time", "type", "request.id", "auth.entity_id", "missing.key"]
+EXPECTED = {
+    "time": "2024-01-01T00:00:00Z",
+    "type": "response",
+    "request": {"id": "r1"},
+    "auth": {"entity_id": "e1"},
+}
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_projection_keeps_only_requested_fields(streaming):
+    if streaming:
+        pytest.importorskip("ijson")
+    proj = VaultFieldProjection(FIELDS, streaming=streaming)
+
+    assert proj(json.dumps(EVENT)) == EXPECTED
+    assert proj("not json") == "not json"
+    assert proj("[1, 2]") == [1, 2]
+
+
+def test_reader_with_fields(tmp_path):
+    p = tmp_path / "sample.private_log"
+    p.write_text(json.dumps(EVENT) + "\nplain\n", encoding="utf-8")
+
+    entries = list(VaultLogReader(str(p), fields=FIELDS))
+
+    assert entries == [EXPECTED, "plain"]
@@ -0,0 +1,84 @@
+import gzip
+import json
+
+import pytest
+
+from vault_audit_lib import GzipCheckpointIndex, VaultLogReader, VaultLogWriter
+
+
+def _entries(n):
+    return [
+        {"request": {"id": str(i)}, "type": "request", "pad": "x" * (i % 50)}
+        for i in range(n)
+    ]
+
+
+def test_block_gzip_is_standard_gzip(tmp_path):
+    path = tmp_path / "audit.log.gz"
+    entries = _entries(300)
+    with VaultLogWriter(str(path), mode="w", gzip_block_size=1024) as writer:
+        for e in entries:
+            writer.write(e)
+
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        assert [json.loads(line) for line in fh] == entries
+
+    idx = GzipCheckpointIndex(str(path), spacing=1).build()
+    assert idx.seekable
+    assert all(line_start for _c, _u, line_start in idx.checkpoints)
+
+
+def test_checkpoint_seek_and_parallel_read(tmp_path):
+    path = tmp_path / "audit.log.gz"
+    entries = _entries(300)
+    with VaultLogWriter(str(path), mode="w", gzip_block_size=700) as writer:
+        for e in entries:
+            writer.write(e)
+        writer.write("plain line")
+
+    serial = list(VaultLogReader(str(path)))
+    GzipCheckpointIndex(str(path), spacing=1).build()
+
+    with gzip.open(path, "rb") as fh:
+        data = fh.read()
+    offset = data.index(b'{"request": {"id": "250"}')
+    with GzipCheckpointIndex(str(path)).ensure().open() as fh:
+        fh.seek(offset)
+        assert json.loads(fh.readline())["request"]["id"] == "250"
+
+    parallel = list(VaultLogReader(str(path), workers=2, chunk_size=1500))
+    assert parallel == serial
+
+
+def test_foreign_multi_member_file(tmp_path):
+    path = tmp_path / "audit.log.gz"
+    # members that do not end on a line boundary
+    with open(path, "wb") as fh:
+        fh.write(gzip.compress(b'{"a": 1}\n{"b"'))
+        fh.write(gzip.compress(b': 2}\n{"c": 3}\n'))
+        fh.write(gzip.compress(b'{"d": 4}\n'))
+
+    idx = GzipCheckpointIndex(str(path), spacing=1).build()
+    assert [cp[2] for cp in idx.checkpoints] == [True, False, True]
+    assert list(VaultLogReader(str(path), workers=2, chunk_size=1)) == [
+        {"a": 1},
+        {"b": 2},
+        {"c": 3},
+        {"d": 4},
+    ]
+
+
+def test_single_member_index_without_indexed_gzip_warns(tmp_path, monkeypatch):
+    from vault_audit_lib import vault_gzip
+
+    monkeypatch.setattr(vault_gzip, "indexed_gzip", None)
+    path = tmp_path / "audit.log.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        fh.writelines(json.dumps(e) + "\n" for e in _entries(300))
+
+    with pytest.warns(UserWarning, match="install indexed_gzip"):
+        idx = GzipCheckpointIndex(str(path), spacing=1024).ensure()
+    assert not idx.seekable
+    # a reloaded sidecar still reports it
+    with pytest.warns(UserWarning):
+        GzipCheckpointIndex(str(path), spacing=1024).ensure()
@@ -0,0 +1,53 @@
+import datetime
+import json
+import pickle
+
+import pytest
+
+from vault_audit_lib import VaultLogReader, VaultLogWriter, available_codecs, get_codec
+
+
+def test_codecs_decode_like_stdlib():
+    lines = [
+        '{"a": 1, "b": [1.5, null, true], "c": "\\u00e9\\ud83d\\ude00"}',
+        '{"big": 123456789012345678901234567890}',
+        '{"nan": NaN, "inf": -Infinity}',
+        '{"dup": 1, "dup": 2}',
+    ]
+    for name in available_codecs():
+        codec = get_codec(name)
+        for line in lines:
+            expected = json.loads(line)
+            got = codec.loads(line)
+            if "nan" in expected:
+                assert got["inf"] == expected["inf"] and got["nan"] != got["nan"]
+                continue
+            assert got == expected
+            assert codec.loads(line.encode("utf-8")) == expected
+        with pytest.raises(ValueError):
+            codec.loads("not json")
+
+
+def test_writer_output_is_stable(tmp_path):
+    entries = [
+        {"z": 1, "a": {"y": [1, 2.5]}, "name": "café"},
+        {"when": datetime.datetime(2024, 5, 1, 12, 0), "none": None},
+    ]
+    expected = "".join(json.dumps(e, default=str) + "\n" for e in entries)
+    for name in available_codecs():
+        p = tmp_path / f"{name}.log"
+        with VaultLogWriter(str(p), mode="w", codec=name) as w:
+            w.writelines(entries)
+        assert p.read_text(encoding="utf-8") == expected
+
+
+def test_reader_codec_and_pickle(tmp_path):
+    p = tmp_path / "r.log"
+    p.write_text('{"a": 1}\nplain\n', encoding="utf-8")
+    assert list(VaultLogReader(str(p), codec="json")) == [{"a": 1}, "plain"]
+    assert list(VaultLogReader(str(p))) == [{"a": 1}, "plain"]
+
+    codec = get_codec()
+    assert pickle.loads(pickle.dumps(codec)) is codec
+    with pytest.raises(ValueError):
+        get_codec("nope")
@@ -0,0 +1,57 @@
+import json
+import os
+
+from vault_audit_lib import VaultLogFollower, VaultTransactionReader
+
+
+def _line(n, kind="request"):
+    return json.dumps({"request": {"id": str(n)}, "type": kind}) + "\n"
+
+
+def test_follow_partial_lines_rotation_and_truncation(tmp_path):
+    path = tmp_path / "audit.log"
+    path.write_text(_line(1) + _line(2)[:10], encoding="utf-8")
+    follower = VaultLogFollower(str(path), poll_interval=0.01, idle_timeout=2)
+    gen = follower.read()
+    assert next(gen)["request"]["id"] == "1"
+
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(_line(2)[10:] + _line(3))
+    assert [next(gen)["request"]["id"] for _ in range(2)] == ["2", "3"]
+
+    # rotation: the rest of the old file comes first, then the new file
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(_line(4))
+    os.rename(path, str(path) + ".1")
+    path.write_text(_line(5), encoding="utf-8")
+    assert [next(gen)["request"]["id"] for _ in range(2)] == ["4", "5"]
+
+    # truncation in place
+    path.write_text("", encoding="utf-8")
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write("x\n")
+    assert next(gen) == "x"
+    gen.close()
+
+
+def test_follow_checkpoint_resume_and_transactions(tmp_path):
+    path = tmp_path / "audit.log"
+    ckpt = str(tmp_path / "audit.pos")
+    path.write_text(_line(1) + _line(1, "response"), encoding="utf-8")
+
+    def follower():
+        return VaultLogFollower(
+            str(path),
+            checkpoint_path=ckpt,
+            poll_interval=0.01,
+            idle_timeout=0.1,
+            use_inotify=False,
+        )
+
+    txs = list(VaultTransactionReader(follower()))
+    assert [(rid, len(events)) for rid, events in txs] == [("1", 2)]
+
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(_line(2) + _line(2, "response"))
+    txs = list(VaultTransactionReader(follower()))
+    assert [(rid, len(events)) for rid, events in txs] == [("2", 2)]
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import pytest
+
+from vault_audit_lib import VaultLogIndex, VaultLogReader, VaultTransactionReader
+
+
+def _events():
+    return [
+        {
+            "time": "2024-01-01T00:00:01Z",
+            "type": "request",
+            "auth": {"client_token": "tok-a", "entity_id": "e1"},
+            "request": {"id": "r1", "path": "secret/a"},
+        },
+        {
+            "time": "2024-01-01T00:01:02Z",
+            "type": "request",
+            "auth": {"client_token": "tok-b"},
+            "request": {"id": "r2", "path": "sys/health"},
+        },
+        "not json",
+        {
+            "time": "2024-01-01T00:02:03Z",
+            "type": "response",
+            "request": {"id": "r1", "path": "secret/a"},
+        },
+    ]
+
+
+def _write(path, compress=False):
+    text = "".join(
+        (e if isinstance(e, str) else json.dumps(e)) + "\n" for e in _events()
+    )
+    if compress:
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        path.write_text(text, encoding="utf-8")
+
+
+@pytest.mark.parametrize("name", ["audit.log", "audit.log.gz"])
+def test_index_lookup_and_seek(tmp_path, name):
+    log = tmp_path / name
+    _write(log, compress=name.endswith(".gz"))
+
+    idx = VaultLogIndex(str(log)).ensure()
+    assert idx.is_current()
+
+    offsets = idx.offsets("auth.client_token", "tok-b")
+    assert [e["request"]["id"] for e in VaultLogReader(str(log), offsets=offsets)] == [
+        "r2"
+    ]
+
+    # the response for r1 carries no token but belongs to the transaction
+    offsets = idx.transaction_offsets("auth.client_token", "tok-a")
+    txs = list(VaultTransactionReader(VaultLogReader(str(log), offsets=offsets)))
+    assert [(rid, len(evs)) for rid, evs in txs] == [("r1", 2)]
+
+    assert len(idx.time_offsets("2024-01-01T00:01:00Z", "2024-01-01T00:02:59Z")) == 2
+    assert idx.values("request.path") == ["secret/a", "sys/health"]
+
+
+def test_index_is_stale_after_append(tmp_path):
+    log = tmp_path / "audit.log"
+    _write(log)
+    idx = VaultLogIndex(str(log)).build()
+    with open(log, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps({"request": {"id": "r3"}}) + "\n")
+
+    assert not idx.is_current()
+    assert idx.ensure().offsets("request.id", "r3")
@@ -2,6 +2,8 @@ import gzip
 import io
 import json
 
+import pytest
+
 from vault_audit_lib import VaultLogWriter
 
 
@@ -39,3 +41,53 @@ def test_write_file_like():
     lines = [line for line in value.splitlines() if line.strip()]
     assert json.loads(lines[0])["a"] == 1
     assert lines[1] == "raw"
+
+
+def test_buffered_writes(tmp_path):
+    file_path = tmp_path / "buffered.log"
+    writer = VaultLogWriter(str(file_path), buffer_entries=3)
+    writer.write({"n": 1})
+    writer.write({"n": 2})
+    writer._file.flush()
+    assert file_path.read_text(encoding="utf-8") == ""
+    writer.write({"n": 3})
+    writer._file.flush()
+    assert len(file_path.read_text(encoding="utf-8").splitlines()) == 3
+    writer.write("tail")
+    writer.close()
+    lines = file_path.read_text(encoding="utf-8").splitlines()
+    assert lines[-1] == "tail" and len(lines) == 4
+
+
+def test_writelines_and_compresslevel(tmp_path):
+    entries = [{"request": {"id": str(i)}, "pad": "x" * 50} for i in range(3000)]
+    expected = "".join(json.dumps(e) + "\n" for e in entries)
+    options = ({}, {"buffer_size": 4096}, {"compresslevel": 1})
+    for i, kwargs in enumerate(options):
+        file_path = tmp_path / f"out{i}.log.gz"
+        with VaultLogWriter(str(file_path), mode="w", **kwargs) as writer:
+            writer.writelines(entries)
+        with gzip.open(file_path, "rt", encoding="utf-8") as fh:
+            assert fh.read() == expected
+
+
+def test_background_writer_order_and_errors(tmp_path):
+    file_path = tmp_path / "bg.log.gz"
+    entries = [{"request": {"id": str(i)}} for i in range(2000)]
+    with VaultLogWriter(str(file_path), mode="w", background=True, queue_size=8) as w:
+        for e in entries[:1000]:
+            w.write(e)
+        w.writelines(entries[1000:])
+        w.flush()
+    with gzip.open(file_path, "rt", encoding="utf-8") as fh:
+        assert [json.loads(line) for line in fh] == entries
+
+    class Broken(io.StringIO):
+        def write(self, s):
+            raise OSError("disk full")
+
+    writer = VaultLogWriter(Broken(), background=True)
+    writer.write({"a": 1})
+    with pytest.raises(OSError, match="disk full"):
+        writer.flush()
+    writer.close()
@@ -0,0 +1,96 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from vault_audit_lib import (
+    GzipCheckpointIndex,
+    VaultLogWriter,
+    VaultMultiLogReader,
+    VaultTransactionReader,
+    expand_log_paths,
+)
+
+
+def _event(rid, typ, second, node):
+    return {
+        "time": f"2024-01-01T00:{second // 60:02d}:{second % 60:02d}Z",
+        "type": typ,
+        "node": node,
+        "request": {"id": rid},
+    }
+
+
+def _write(path, events):
+    data = "".join(json.dumps(e) + "\n" for e in events)
+    if path.endswith(".gz"):
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            fh.write(data)
+    else:
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(data)
+
+
+def _cluster(tmp_path):
+    """Two nodes; node a rotated mid-transaction into audit.log.1.gz."""
+    a, b = tmp_path / "node-a", tmp_path / "node-b"
+    a.mkdir()
+    b.mkdir()
+    old = [_event(f"a{i}", "request", 2 * i, "a") for i in range(40)]
+    old += [_event(f"a{i}", "response", 2 * i + 1, "a") for i in range(39)]
+    old.sort(key=lambda e: e["time"])
+    _write(str(a / "audit.log.1.gz"), old)
+    _write(str(a / "audit.log"), [_event("a39", "response", 100, "a")])
+    (a / "audit.log.idx").write_bytes(b"not a log")
+    new = []
+    for i in range(30):
+        new.append(_event(f"b{i}", "request", 3 * i, "b"))
+        new.append(_event(f"b{i}", "response", 3 * i + 2, "b"))
+    with VaultLogWriter(str(b / "audit.log.gz"), mode="w", gzip_block_size=512) as w:
+        w.writelines(new)
+    return old + [_event("a39", "response", 100, "a")] + new
+
+
+def test_expand_and_merge(tmp_path):
+    events = _cluster(tmp_path)
+
+    paths = expand_log_paths([str(tmp_path / "node-a"), str(tmp_path / "*/*.gz")])
+    assert [os.path.relpath(p, tmp_path) for p in paths] == [
+        os.path.join("node-a", "audit.log"),
+        os.path.join("node-a", "audit.log.1.gz"),
+        os.path.join("node-b", "audit.log.gz"),
+    ]
+    with pytest.raises(FileNotFoundError):
+        expand_log_paths(str(tmp_path / "*.nothing"))
+
+    merged = list(VaultMultiLogReader(str(tmp_path), recursive=True))
+    assert len(merged) == len(events)
+    times = [e["time"] for e in merged]
+    assert times == sorted(times)
+    assert sorted(map(json.dumps, merged)) == sorted(map(json.dumps, events))
+
+    projected = list(VaultMultiLogReader(str(tmp_path / "node-*"), fields=["node"]))
+    assert [e["node"] for e in projected] == [e["node"] for e in merged]
+
+    # the transaction split by rotation is stitched back together
+    transactions = dict(VaultTransactionReader(str(tmp_path / "node-*")))
+    assert len(transactions) == 70
+    assert [e["type"] for e in transactions["a39"]] == ["request", "response"]
+    assert not any(getattr(tx, "incomplete", False) for tx in transactions.values())
+
+
+def test_parallel_matches_serial(tmp_path):
+    _cluster(tmp_path)
+    GzipCheckpointIndex(str(tmp_path / "node-b" / "audit.log.gz")).ensure()
+
+    source = str(tmp_path / "node-*")
+    serial = list(VaultMultiLogReader(source))
+    parallel = list(
+        VaultMultiLogReader(source, workers=2, chunk_size=256, tmp_dir=str(tmp_path))
+    )
+    assert parallel == serial
+    assert not [p for p in os.listdir(tmp_path) if p.startswith("vault-multi-")]
+
+    ordered = list(VaultMultiLogReader(source, merge=False, workers=2))
+    assert sorted(map(json.dumps, ordered)) == sorted(map(json.dumps, serial))
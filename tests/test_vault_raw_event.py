@@ -0,0 +1,86 @@
+import json
+import pickle
+
+import pytest
+
+from vault_audit_lib import (
+    RawEvent,
+    VaultEventFilter,
+    VaultLogReader,
+    VaultLogWriter,
+    VaultTransactionReader,
+    VaultTransactionWriter,
+)
+
+
+def _line(rid, typ, second, **extra):
+    entry = {
+        "time": f"2024-01-01T00:00:{second:02d}Z",
+        "type": typ,
+        "request": {"id": rid, "path": "secret/café"},
+    }
+    entry.update(extra)
+    # compact separators and raw UTF-8, unlike VaultLogWriter's output
+    return json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+
+
+def test_raw_event_tracks_top_level_changes():
+    ev = RawEvent({"a": 1, "b": {"c": 2}}, '{"a":1,"b":{"c":2}}')
+    assert ev == {"a": 1, "b": {"c": 2}}
+    assert isinstance(ev, dict)
+
+    copied = pickle.loads(pickle.dumps(ev))
+    assert copied == ev and copied.raw == ev.raw
+    assert ev.copy().raw == ev.raw
+
+    ev.setdefault("a", 5)
+    assert ev.raw is not None
+    for change in (
+        lambda e: e.__setitem__("a", 2),
+        lambda e: e.__delitem__("a"),
+        lambda e: e.pop("a"),
+        lambda e: e.update(d=4),
+        lambda e: e.setdefault("d", 4),
+        lambda e: e.clear(),
+    ):
+        ev = RawEvent({"a": 1}, '{"a":1}')
+        change(ev)
+        assert ev.raw is None
+
+
+def test_keep_raw_copies_lines_verbatim(tmp_path):
+    lines = [
+        _line("a", "request", 1),
+        _line("b", "request", 2),
+        _line("b", "response", 3, error="denied"),
+        _line("a", "response", 4),
+    ]
+    src = tmp_path / "in.log"
+    src.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    for options in ({}, {"use_mmap": True}, {"workers": 2, "chunk_size": 64}):
+        events = list(VaultLogReader(str(src), keep_raw=True, **options))
+        assert [e.raw for e in events] == lines
+        assert events == [json.loads(line) for line in lines]
+
+    keep = VaultEventFilter("error", lambda v: v is not None)
+    out = tmp_path / "out.log"
+    with VaultTransactionWriter(str(out), mode="w") as writer:
+        for rid, events in VaultTransactionReader(
+            str(src), keep_raw=True, max_open=1, on_limit="spill"
+        ):
+            if keep.match(events):
+                writer.write_transaction(rid, events)
+    assert out.read_bytes() == "\n".join(lines[1:3]).encode("utf-8") + b"\n"
+
+    # a modified event is serialized again
+    ev = next(iter(VaultLogReader(str(src), keep_raw=True)))
+    ev["type"] = "changed"
+    with VaultLogWriter(str(out), mode="w") as writer:
+        writer.write(ev)
+    assert json.loads(out.read_text(encoding="utf-8"))["type"] == "changed"
+
+    with pytest.raises(ValueError):
+        VaultLogReader(str(src), keep_raw=True, compact=True)
+    with pytest.raises(ValueError):
+        VaultLogReader(str(src), keep_raw=True, fields=["type"])
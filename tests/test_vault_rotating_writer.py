@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+from vault_audit_lib import (
+    VaultLogReader,
+    VaultMultiLogReader,
+    VaultRotatingWriter,
+    load_manifest,
+    manifest_paths,
+)
+from vault_audit_lib.vault_time import parse_time_ns
+
+
+def _event(minute, second=0):
+    return {
+        "time": f"2024-01-01T00:{minute:02d}:{second:02d}Z",
+        "type": "response",
+        "request": {"id": f"{minute}-{second}"},
+    }
+
+
+def test_rotate_by_time_window(tmp_path):
+    base = str(tmp_path / "out" / "reduced.log")
+    os.mkdir(tmp_path / "out")
+    events = [_event(m, s) for m in range(0, 30, 3) for s in (0, 30)]
+    events.insert(5, _event(2, 59))  # late event of the previous window
+    events.insert(7, "raw line")
+
+    with VaultRotatingWriter(base, mode="w", window=600) as out:
+        out.writelines(events)
+
+    manifest = load_manifest(base + ".manifest.json")
+    segments = manifest["segments"]
+    assert [s["path"] for s in segments] == [
+        "reduced.00000.log.gz",
+        "reduced.00001.log.gz",
+        "reduced.00002.log.gz",
+    ]
+    assert sorted(os.listdir(tmp_path / "out")) == sorted(
+        [s["path"] for s in segments] + ["reduced.log.manifest.json"]
+    )
+    assert [s["count"] for s in segments] == [10, 6, 6]
+    assert segments[0]["min_time_ns"] == parse_time_ns("2024-01-01T00:00:00Z")
+    assert segments[0]["max_time_ns"] == parse_time_ns("2024-01-01T00:09:30Z")
+    assert segments[0]["untimed"] == 1
+    assert all(s["compressed"] for s in segments)
+
+    paths = manifest_paths(base + ".manifest.json")
+    assert list(VaultMultiLogReader(paths, merge=False)) == events
+
+    # the first segment also holds an untimed line, so it is always read
+    window = manifest_paths(
+        base + ".manifest.json", "2024-01-01T00:21:00Z", "2024-01-01T00:22:00Z"
+    )
+    assert [os.path.basename(p) for p in window] == [
+        "reduced.00000.log.gz",
+        "reduced.00002.log.gz",
+    ]
+
+    # appending continues the numbering
+    with VaultRotatingWriter(base, window=600) as out:
+        out.write(_event(45))
+    segments = load_manifest(base + ".manifest.json")["segments"]
+    assert [s["index"] for s in segments] == [0, 1, 2, 3]
+    assert list(VaultLogReader(str(tmp_path / "out" / segments[3]["path"]))) == [
+        _event(45)
+    ]
+
+
+def test_rotate_by_size_and_count(tmp_path):
+    base = str(tmp_path / "split.log")
+    line_size = len(json.dumps(_event(0))) + 1
+    with VaultRotatingWriter(
+        base, mode="w", max_bytes=3 * line_size, compress=False
+    ) as out:
+        out.writelines(_event(0, s) for s in range(7))
+    segments = load_manifest(base + ".manifest.json")["segments"]
+    assert [s["count"] for s in segments] == [3, 3, 1]
+    assert [s["bytes"] for s in segments] == [3 * line_size, 3 * line_size, line_size]
+    assert not any(s["compressed"] for s in segments)
+
+    base = str(tmp_path / "stage.vbin")
+    with VaultRotatingWriter(base, mode="w", max_entries=4) as out:
+        out.writelines(_event(1, s) for s in range(10))
+    paths = manifest_paths(base + ".manifest.json")
+    assert [os.path.basename(p) for p in paths] == [
+        "stage.00000.vbin.gz",
+        "stage.00001.vbin.gz",
+        "stage.00002.vbin.gz",
+    ]
+    assert list(VaultMultiLogReader(paths)) == [_event(1, s) for s in range(10)]
+
+    with pytest.raises(ValueError):
+        VaultRotatingWriter(base, max_bytes=100)
@@ -0,0 +1,106 @@
+import json
+import socket
+import threading
+
+from vault_audit_lib import (
+    VaultLogReader,
+    VaultLogWriter,
+    VaultSocketReceiver,
+    VaultTransactionReader,
+    field,
+    replay_log,
+)
+
+
+def _events(n):
+    events = []
+    for i in range(n):
+        for kind in ("request", "response"):
+            event = {"type": kind, "request": {"id": str(i)}}
+            if kind == "response" and i % 10 == 0:
+                event["error"] = "permission denied"
+            events.append(event)
+    return events
+
+
+def _write_log(path, events):
+    with open(path, "w", encoding="utf-8") as fh:
+        for event in events:
+            fh.write(json.dumps(event) + "\n")
+
+
+def _take(receiver, count):
+    received = []
+    for entry in receiver:
+        received.append(entry)
+        if len(received) == count:
+            break
+    return received
+
+
+def test_tcp_receiver_feeds_transaction_pipeline(tmp_path):
+    log, out = tmp_path / "audit.log", tmp_path / "errors.log"
+    events = _events(300)
+    _write_log(log, events)
+    keep = field("error").exists()
+
+    with VaultSocketReceiver(queue_size=8) as receiver:
+        port = receiver.address[1]
+        sender = threading.Thread(
+            target=replay_log, args=(str(log),), kwargs={"port": port, "batch": 7}
+        )
+        sender.start()
+        # small queue: the sender is throttled while transactions are grouped
+        with VaultLogWriter(str(out), mode="w") as writer:
+            txs = 0
+            for request_id, entries in VaultTransactionReader(receiver):
+                assert len(entries) == 2
+                if keep.match(entries):
+                    writer.writelines(entries)
+                txs += 1
+                if txs == 300:
+                    break
+        sender.join()
+        stats = receiver.stats()
+
+    assert stats["connections"] == 1
+    assert stats["events"] == len(events)
+    assert stats["backpressure_waits"] > 0
+    written = list(VaultLogReader(str(out)))
+    assert {e["request"]["id"] for e in written} == {str(i) for i in range(0, 300, 10)}
+
+
+def test_stream_framing_and_oversized_lines():
+    with VaultSocketReceiver(max_line=100, prefilter=b'"type"') as receiver:
+        conn = socket.create_connection(receiver.address)
+        conn.sendall(b'{"type": "req')
+        conn.sendall(b'uest"}\n' + b'{"type": "' + b"x" * 200)
+        conn.sendall(b'"}\n{"other": 1}\nnot json "type"\n{"type": "last"}')
+        conn.close()
+        received = _take(receiver, 3)
+        stats = receiver.stats()
+
+    assert received == [{"type": "request"}, 'not json "type"', {"type": "last"}]
+    assert stats["oversized"] == 1
+    assert stats["filtered"] == 1
+    assert stats["raw_lines"] == 1
+
+
+def test_udp_and_unix_receivers(tmp_path):
+    log = tmp_path / "audit.log"
+    events = _events(20)
+    _write_log(log, events)
+
+    with VaultSocketReceiver(protocol="udp") as receiver:
+        sent = replay_log(str(log), port=receiver.address[1], protocol="udp")
+        received = _take(receiver, sent)
+    assert sent == len(events)
+    assert received == events
+    assert receiver.stats()["datagrams"] == len(events)
+
+    path = str(tmp_path / "vault.sock")
+    with VaultSocketReceiver(path=path, protocol="unix") as receiver:
+        replay_log(str(log), path=path, protocol="unix", rate=2000, batch=5)
+        received = _take(receiver, len(events))
+    assert received == events
+    assert not (tmp_path / "vault.sock").exists()
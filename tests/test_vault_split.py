@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+from vault_audit_lib import (
+    VaultLogReader,
+    VaultTransactionReader,
+    sanitized_filename,
+    split_by,
+)
+
+
+def _write_log(path, n_tx, n_keys):
+    with open(path, "w", encoding="utf-8") as fh:
+        for i in range(n_tx):
+            auth = {} if i % 7 == 0 else {"entity_id": f"entity/{i % n_keys}"}
+            for second, kind in ((1, "request"), (0, "response")):
+                event = {
+                    "type": kind,
+                    "time": f"2024-05-01T12:00:{second:02d}.{i:06d}Z",
+                    "auth": auth,
+                    "request": {"id": str(i)},
+                }
+                fh.write(json.dumps(event) + "\n")
+
+
+def _outputs(out_dir):
+    return {
+        name: [e["request"]["id"] for e in VaultLogReader(str(out_dir / name))]
+        for name in sorted(os.listdir(out_dir))
+    }
+
+
+def test_split_by_with_small_writer_pool(tmp_path):
+    log, out = tmp_path / "audit.log", tmp_path / "out"
+    _write_log(log, 400, 25)
+    counts = split_by(str(log), "auth.entity_id", str(out), mode="w", max_open=3)
+
+    assert counts[None] == len(range(0, 400, 7))
+    assert sum(counts.values()) == 400
+    files = _outputs(out)
+    assert len(files) == 26
+    # each transaction written once, response sorted before its request
+    ids = files[sanitized_filename("entity/3") + ".jsonl"]
+    expected = [str(i) for i in range(400) if i % 25 == 3 and i % 7]
+    assert ids == [rid for rid in expected for _ in range(2)]
+    assert len(files["error_no_entity_id.json"]) == 2 * counts[None]
+
+    # evicted files were reopened in append mode, so "w" applies per run only
+    split_by(str(log), "auth.entity_id", str(out), mode="w", max_open=3)
+    assert _outputs(out) == files
+
+
+@pytest.mark.parametrize("workers,buckets", [(1, 4), (2, None)])
+def test_split_by_two_pass_matches_single_pass(tmp_path, workers, buckets):
+    log = tmp_path / "audit.log"
+    _write_log(log, 300, 40)
+    single = split_by(str(log), "auth.entity_id", str(tmp_path / "a"))
+    sharded = split_by(
+        str(log),
+        "auth.entity_id",
+        str(tmp_path / "b"),
+        max_open=4,
+        workers=workers,
+        buckets=buckets,
+        tmp_dir=str(tmp_path),
+    )
+    assert sharded == single
+    assert _outputs(tmp_path / "b") == _outputs(tmp_path / "a")
+    # bucket files are removed
+    assert sorted(os.listdir(tmp_path)) == ["a", "audit.log", "b"]
+
+
+@pytest.mark.parametrize("option", ["compact", "keep_raw"])
+@pytest.mark.parametrize("workers,buckets", [(1, 3), (2, None)])
+def test_split_by_two_pass_keeps_original_lines(tmp_path, option, workers, buckets):
+    log = tmp_path / "audit.log"
+    _write_log(log, 120, 9)
+    # non-default separators: only events that kept their line match them
+    lines = [
+        json.dumps(json.loads(line), separators=(",", ":")) + "\n"
+        for line in log.read_text().splitlines()
+    ]
+    log.write_text("".join(lines))
+
+    def source():
+        return VaultTransactionReader(VaultLogReader(str(log), **{option: True}))
+
+    single = split_by(source(), "auth.entity_id", str(tmp_path / "a"))
+    sharded = split_by(
+        source(),
+        "auth.entity_id",
+        str(tmp_path / "b"),
+        workers=workers,
+        buckets=buckets,
+        tmp_dir=str(tmp_path),
+    )
+    assert sharded == single
+    for name in os.listdir(tmp_path / "a"):
+        written = (tmp_path / "b" / name).read_text()
+        assert written == (tmp_path / "a" / name).read_text()
+        assert set(written.splitlines(keepends=True)) <= set(lines)
+    assert sorted(os.listdir(tmp_path)) == ["a", "audit.log", "b"]
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from vault_audit_lib import (
+    VaultTransactionWriter,
+    parse_time_ns,
+    parse_times_ns,
+    time_range,
+)
+
+
+def test_parse_time_ns():
+    base = parse_time_ns("2024-05-01T12:00:00Z")
+    dt = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    assert base == int(dt.timestamp()) * 10**9
+    assert parse_time_ns(dt) == base
+    assert parse_time_ns("2024-05-01T12:00:00.5Z") == base + 500_000_000
+    assert parse_time_ns("2024-05-01T14:00:00.5+02:00") == base + 500_000_000
+    assert parse_time_ns("2024-05-01T11:30:00-0030") == base
+    assert parse_time_ns("2024-05-01 12:00:00.123456789123") == base + 123_456_789
+    assert parse_time_ns(dt - timedelta(days=20000)) < 0
+    for bad in ("", "yesterday", "2024-13-01T00:00:00Z", "2024-05-01T12:00:00+2"):
+        assert parse_time_ns(bad) is None
+    assert parse_times_ns(["2024-05-01T12:00:00Z", None, dt]) == [base, None, base]
+
+
+def test_time_range_and_writer_order(tmp_path):
+    events = [
+        {"time": "2024-05-01T12:00:01.25Z", "n": 2},
+        {"time": "2024-05-01T12:00:01Z", "n": 1},
+        {"time": "2024-05-01T14:00:00.999+02:00", "n": 0},
+        {"n": -1},
+    ]
+    flt = time_range("2024-05-01T12:00:01Z", "2024-05-01T12:00:01.250Z")
+    assert [e["n"] for e in events if flt.match(e)] == [1]
+
+    path = tmp_path / "out.log"
+    with VaultTransactionWriter(str(path), mode="w") as w:
+        w.write_transactions([("a", events[:2]), ("b", events[2:])])
+    with VaultTransactionWriter(str(path), mode="a") as w:
+        w.write_transactions([("a", events[:2]), ("b", events[2:])], run_size=2)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    order = [int(line.split('"n": ')[1].rstrip("}")) for line in lines]
+    assert order == [-1, 0, 1, 2] * 2
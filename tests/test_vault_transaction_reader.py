@@ -23,3 +23,95 @@ def test_group_by_request_id():
 
     assert rid1 == "b"
     assert len(entries1) == 2
+
+
+def _event(rid, typ, second):
+    return {
+        "request": {"id": rid},
+        "type": typ,
+        "time": f"2024-01-01T00:00:{second:02d}.5Z",
+    }
+
+
+def test_max_open_emits_incomplete():
+    entries = [
+        _event("a", "request", 0),
+        _event("b", "request", 1),
+        _event("c", "request", 2),
+        _event("b", "response", 3),
+    ]
+
+    transactions = list(VaultTransactionReader(entries, max_open=1))
+
+    assert [rid for rid, _ in transactions] == ["a", "b", "b", "c"]
+    assert transactions[0][1].incomplete
+    assert transactions[0][1].reason == "max_open"
+    assert transactions[2][1] == [entries[3]]
+    assert not getattr(transactions[2][1], "incomplete", False)
+    assert transactions[3][1].reason == "eof"
+
+
+def test_max_age_uses_event_time():
+    entries = [
+        _event("a", "request", 0),
+        _event("b", "request", 5),
+        _event("c", "request", 20),
+    ]
+
+    transactions = list(VaultTransactionReader(entries, max_age=10))
+
+    assert transactions[0][0] == "a"
+    assert transactions[0][1].reason == "max_age"
+    assert transactions[1][0] == "b"
+    assert transactions[1][1].reason == "max_age"
+
+
+def test_spill_merges_late_response(tmp_path):
+    entries = [
+        _event("a", "request", 0),
+        _event("b", "request", 1),
+        _event("c", "request", 2),
+        _event("a", "response", 3),
+    ]
+
+    reader = VaultTransactionReader(
+        entries, max_open=1, on_limit="spill", spill_dir=str(tmp_path)
+    )
+    transactions = list(reader)
+
+    assert transactions[0] == ("a", [entries[0], entries[3]])
+    assert [rid for rid, _ in transactions[1:]] == ["c", "b"]
+    assert all(tx.incomplete for _, tx in transactions[1:])
+
+
+def test_spilled_transactions_age_out(tmp_path, monkeypatch):
+    import vault_audit_lib.vault_transaction_reader as vtr
+
+    def orphans():
+        for i in range(2000):
+            yield {
+                "request": {"id": str(i)},
+                "type": "request",
+                "time": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}Z",
+            }
+
+    options = {"max_open": 10, "max_age": 5, "close_on_eof": False}
+    emitted = list(VaultTransactionReader(orphans(), **options))
+    spilled = list(
+        VaultTransactionReader(
+            orphans(), on_limit="spill", spill_dir=str(tmp_path), **options
+        )
+    )
+    assert [rid for rid, _ in spilled] == [rid for rid, _ in emitted]
+    assert len(spilled) == 1994
+    assert {tx.reason for _, tx in spilled} == {"max_age"}
+
+    # without an age limit the spill index is capped instead
+    monkeypatch.setattr(vtr, "_SPILL_REWRITE_MIN", 1024)
+    reader = VaultTransactionReader(
+        orphans(), max_open=10, on_limit="spill", max_spilled=100, close_on_eof=False
+    )
+    capped = list(reader)
+    assert len(capped) == 1890
+    assert capped[0] == ("0", [next(orphans())])
+    assert {tx.reason for _, tx in capped} == {"max_spilled"}
@@ -0,0 +1,42 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+from vault_audit_lib import VaultTransactionWriter
+
+
+def _transactions(count):
+    rng = random.Random(7)
+    txs = []
+    for i in range(count):
+        start = rng.randrange(100_000)
+        events = []
+        for d in (rng.randrange(50), 0, rng.randrange(50, 100)):
+            t = datetime(2024, 5, 1) + timedelta(milliseconds=start + d)
+            ts = t.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            events.append({"time": ts, "request": {"id": str(i)}})
+        rng.shuffle(events)
+        txs.append((str(i), events))
+    return txs
+
+
+def test_external_sort_matches_in_memory(tmp_path):
+    txs = _transactions(300)
+    in_memory = tmp_path / "mem.log"
+    with VaultTransactionWriter(str(in_memory), mode="w") as w:
+        w.write_transactions(txs)
+
+    for run_size, fan_in in ((50, 64), (7, 2)):
+        external = tmp_path / f"ext-{run_size}.log"
+        spool = tmp_path / f"spool-{run_size}"
+        spool.mkdir()
+        with VaultTransactionWriter(str(external), mode="w") as w:
+            w.write_transactions(
+                txs, run_size=run_size, tmp_dir=str(spool), fan_in=fan_in
+            )
+        lines = external.read_text(encoding="utf-8").splitlines()
+        times = [json.loads(line)["time"] for line in lines]
+        assert times == sorted(times)
+        expected = in_memory.read_text(encoding="utf-8").splitlines()
+        assert sorted(lines) == sorted(expected)
+        assert list(spool.iterdir()) == []